@@ -0,0 +1,80 @@
+"""
+Steps per second of B2World (1 robot) as a function of the number of balls,
+for the "objects", "arrays" and "bulk" world state modes. The last column
+gives the steps per second of the Box2D step alone (no drag, no state
+extraction), i.e. the upper bound for the given number of balls.
+
+Usage::
+
+    python benchmarks/ball_count.py
+
+"""
+
+import time
+
+import numpy as np
+
+from roboball2d.physics import B2World
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.ball import BallConfig
+from roboball2d.ball_gun import DefaultBallGun
+
+
+MODES = ("objects","arrays","bulk")
+
+
+def _get_world(nb_balls,mode):
+
+    np.random.seed(0)
+    robot_config = DefaultRobotConfig()
+    ball_config = BallConfig()
+    world = B2World(robot_config,
+                    [ball_config]*nb_balls,
+                    6.0,
+                    world_state_mode=mode)
+    world.reset(DefaultRobotState(robot_config),
+                [DefaultBallGun(ball_config)]*nb_balls)
+    return world
+
+
+def _steps_per_sec(nb_balls,nb_steps,mode):
+
+    world = _get_world(nb_balls,mode or "objects")
+    torques = [0.2,-0.1,0.1]
+
+    if mode is None:
+        # Box2D step only
+        b2world = world._b2world
+        time_step = 1.0/100.0
+        time_start = time.perf_counter()
+        for _ in range(nb_steps):
+            b2world.Step(time_step,10,8)
+    else:
+        time_start = time.perf_counter()
+        for _ in range(nb_steps):
+            world.step(torques,relative_torques=True)
+
+    return nb_steps/(time.perf_counter()-time_start)
+
+
+def run(nb_balls=(10,100,1000,10000),duration=2.0):
+
+    """
+    Prints, for each number of balls, the steps per second achieved
+    by each world state mode (each measure running for about
+    'duration' seconds)
+    """
+
+    print(("{:>8}"+" {:>10}"*(len(MODES)+1)).format("balls",*(MODES+("box2d",))))
+    for nb in nb_balls:
+        # calibration run, to get about 'duration' seconds per measure
+        rate = _steps_per_sec(nb,10,"bulk")
+        nb_steps = max(10,int(rate*duration))
+        rates = [ _steps_per_sec(nb,nb_steps,mode)
+                  for mode in MODES+(None,) ]
+        print(("{:>8}"+" {:>10.1f}"*len(rates)).format(nb,*rates))
+
+
+if __name__ == "__main__":
+    run()
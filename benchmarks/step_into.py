@@ -0,0 +1,74 @@
+"""
+Compares the cost of B2World.step (returning a new WorldState at each call)
+and of B2World.step_into (refilling an ArrayWorldState in place),
+for 1 robot and 1, 10 and 100 balls.
+
+Usage::
+
+    python benchmarks/step_into.py
+
+"""
+
+import time
+
+import numpy as np
+
+from roboball2d.physics import B2World
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.ball import BallConfig
+from roboball2d.ball_gun import DefaultBallGun
+
+
+def _get_world(nb_balls):
+
+    robot_config = DefaultRobotConfig()
+    ball_configs = [BallConfig() for _ in range(nb_balls)]
+    world = B2World(robot_config,
+                    ball_configs,
+                    6.0)
+    world.reset(DefaultRobotState(robot_config),
+                [DefaultBallGun(ball_config)
+                 for ball_config in ball_configs])
+    return world
+
+
+def _steps_per_sec(nb_balls,nb_steps,use_step_into):
+
+    np.random.seed(0)
+    world = _get_world(nb_balls)
+    torques = np.random.uniform(-1.0,1.0,(nb_steps,1,3))
+
+    if use_step_into:
+        out = world.create_array_state()
+        time_start = time.perf_counter()
+        for step in range(nb_steps):
+            world.step_into(torques[step],out,relative_torques=True)
+    else:
+        torques = torques.tolist()
+        time_start = time.perf_counter()
+        for step in range(nb_steps):
+            world.step(torques[step],relative_torques=True)
+
+    return nb_steps/(time.perf_counter()-time_start)
+
+
+def run(nb_balls=(1,10,100),nb_steps=2000):
+
+    """
+    Prints, for each number of balls, the number of steps
+    per second achieved by step and step_into.
+    """
+
+    print("{:>8} {:>14} {:>14} {:>8}".format("balls","step (Hz)",
+                                             "step_into (Hz)","ratio"))
+    for nb in nb_balls:
+        step = _steps_per_sec(nb,nb_steps,False)
+        step_into = _steps_per_sec(nb,nb_steps,True)
+        print("{:>8} {:>14.0f} {:>14.0f} {:>8.2f}".format(nb,step,
+                                                          step_into,
+                                                          step_into/step))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,297 @@
+"""
+Benchmark suite of the physics and rendering hot paths:
+
+- step: steps per second of B2World for various numbers of robots and balls
+- reset: duration of B2World.reset
+- construction: duration of the construction of a B2World
+- pickle: size and duration (dumps + loads) of pickled world states
+- forward_kinematics: duration of the construction of a DefaultRobotState,
+  and of the batched forward kinematics (per robot)
+- render: duration of PygletRenderer.render (headless, skipped
+  if no OpenGL context can be created)
+
+Results are written to a JSON file, and compared against a baseline
+JSON file (if any): the comparison is printed, and the exit code is 1 if a
+result is worse than the baseline by more than the tolerance.
+
+Results are absolute timings, which are only comparable on the same
+machine: the baseline is therefore not part of the repository
+(benchmarks/baseline.json is ignored by git). Generate it locally, from
+the reference revision, before comparing a change::
+
+    git checkout master
+    python benchmarks/suite.py --save-baseline
+    git checkout my-branch
+    python benchmarks/suite.py
+
+Usage::
+
+    python benchmarks/suite.py                  # runs all, compares with benchmarks/baseline.json
+    python benchmarks/suite.py --quick          # shorter measures
+    python benchmarks/suite.py step pickle      # runs only some benchmarks
+    python benchmarks/suite.py --save-baseline  # runs all, and saves as (local) baseline
+
+"""
+
+import argparse,datetime,json,os,pickle,platform,sys,timeit
+
+import numpy as np
+
+import Box2D
+
+# rendering is benchmarked without displaying a window (pyglet headless
+# mode, which requires EGL). Must be set before roboball2d imports pyglet.
+import pyglet
+pyglet.options["headless"] = True
+
+from roboball2d.physics import B2World
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.robot import forward_kinematics
+from roboball2d.ball import BallConfig
+from roboball2d.ball_gun import DefaultBallGun
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),"baseline.json")
+
+# (robots, balls) configurations of the step benchmark
+STEP_CONFIGS = ((1,1),(1,10),(1,100),(2,1),(4,1),(4,100))
+
+# numbers of balls of the reset, construction and pickle benchmarks
+NB_BALLS = (1,10,100)
+
+
+def _get_world(nb_robots,nb_balls,mode="objects",reset=True):
+
+    np.random.seed(0)
+    robot_configs = [DefaultRobotConfig() for _ in range(nb_robots)]
+    for index,robot_config in enumerate(robot_configs):
+        robot_config.position = 1.5+index
+    ball_configs = [BallConfig() for _ in range(nb_balls)]
+    world = B2World(robot_configs,
+                    ball_configs,
+                    6.0,
+                    world_state_mode=mode)
+    ball_guns = [DefaultBallGun(ball_config) for ball_config in ball_configs]
+    robot_states = [DefaultRobotState(robot_config)
+                    for robot_config in robot_configs]
+    if reset:
+        world.reset(robot_states,ball_guns)
+    return world,robot_states,ball_guns
+
+
+def _duration(function,min_time):
+    # duration (in seconds) of a call to function:
+    # best of 3 series of calls lasting each about min_time
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 2
+    return min(timer.repeat(3,number))/number
+
+
+def _result(value,unit,better):
+    return {"value":value,"unit":unit,"better":better}
+
+
+def bench_step(min_time):
+
+    results = {}
+    for nb_robots,nb_balls in STEP_CONFIGS:
+        world,_,_ = _get_world(nb_robots,nb_balls)
+        torques = [[0.2,-0.1,0.1] for _ in range(nb_robots)]
+        duration = _duration(lambda: world.step(torques,relative_torques=True),
+                             min_time)
+        results["step/robots={}/balls={}".format(nb_robots,nb_balls)] = \
+            _result(1.0/duration,"steps/s","higher")
+    return results
+
+
+def bench_reset(min_time):
+
+    results = {}
+    for nb_balls in NB_BALLS:
+        world,robot_states,ball_guns = _get_world(1,nb_balls)
+        duration = _duration(lambda: world.reset(robot_states,ball_guns),
+                             min_time)
+        results["reset/balls={}".format(nb_balls)] = _result(duration*1e6,"us","lower")
+    return results
+
+
+def bench_construction(min_time):
+
+    results = {}
+    for nb_balls in NB_BALLS:
+        duration = _duration(lambda: _get_world(1,nb_balls,reset=False),
+                             min_time)
+        results["construction/balls={}".format(nb_balls)] = _result(duration*1e6,"us","lower")
+    return results
+
+
+def bench_pickle(min_time):
+
+    results = {}
+    for mode in ("objects","arrays"):
+        for nb_balls in NB_BALLS:
+            world,_,_ = _get_world(1,nb_balls,mode=mode)
+            world_state = world.step([0.2,-0.1,0.1],relative_torques=True)
+            name = "pickle/{}/balls={}".format(mode,nb_balls)
+            results[name+"/size"] = _result(len(pickle.dumps(world_state)),"bytes","lower")
+            duration = _duration(lambda: pickle.loads(pickle.dumps(world_state)),
+                                 min_time)
+            results[name+"/time"] = _result(duration*1e6,"us","lower")
+    return results
+
+
+def bench_forward_kinematics(min_time):
+
+    robot_config = DefaultRobotConfig()
+    angles = [0.3,-0.2,0.1]
+    velocities = [0.1,0.2,-0.3]
+    duration = _duration(lambda: DefaultRobotState(robot_config,angles,velocities),
+                         min_time)
+    results = {"forward_kinematics": _result(duration*1e6,"us","lower")}
+    batch = np.random.RandomState(0).uniform(-1.0,1.0,(1000,3))
+    duration = _duration(lambda: forward_kinematics(robot_config,batch,batch),
+                         min_time)
+    results["forward_kinematics/batch=1000"] = _result(duration*1e6/len(batch),
+                                                       "us","lower")
+    return results
+
+
+def bench_render(min_time):
+
+    try:
+        from roboball2d.rendering import PygletRenderer
+        from roboball2d.rendering import RenderingConfig
+        world,_,_ = _get_world(1,10)
+        world_state = world.step([0.2,-0.1,0.1],relative_torques=True)
+        renderer = PygletRenderer(RenderingConfig(6.0,0.05),
+                                  world.robot_configs,
+                                  world.ball_configs)
+        renderer.render(world_state)
+    except Exception as e:
+        print("render benchmark skipped: {}".format(e))
+        return {}
+    duration = _duration(lambda: renderer.render(world_state),min_time)
+    renderer.window.close()
+    return {"render/balls=10": _result(duration*1e6,"us","lower")}
+
+
+BENCHMARKS = {"step":bench_step,
+              "reset":bench_reset,
+              "construction":bench_construction,
+              "pickle":bench_pickle,
+              "forward_kinematics":bench_forward_kinematics,
+              "render":bench_render}
+
+
+def run(names=None,min_time=0.2):
+
+    """
+    Runs the benchmarks (all if names is None), returns a dictionary
+    {"meta": information on the environment, "results": {name: result}},
+    result being a dictionary with keys "value", "unit" and "better"
+    ("higher" or "lower"). Each measure is the best of 3 series of calls
+    lasting each about min_time seconds.
+    """
+
+    if names is None:
+        names = list(BENCHMARKS.keys())
+    results = {}
+    for name in names:
+        print("running {} ...".format(name))
+        results.update(BENCHMARKS[name](min_time))
+    meta = {"date": datetime.datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "box2d": Box2D.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine()}
+    return {"meta":meta,"results":results}
+
+
+def compare(results,baseline,tolerance=0.2):
+
+    """
+    Prints the results, and for the ones also in the baseline, the ratio
+    result/baseline. Returns the names of the results worse than the baseline
+    by more than tolerance (relative).
+    """
+
+    regressions = []
+    print("{:<36} {:>14} {:>14} {:>8}".format("benchmark","value","baseline","ratio"))
+    for name,result in results["results"].items():
+        value = result["value"]
+        line = "{:<36} {:>14.6g}".format(name,value)
+        base = baseline["results"].get(name) if baseline else None
+        if base is not None and base["value"]:
+            ratio = value/base["value"]
+            if result["better"] == "higher":
+                worse = ratio < 1.0-tolerance
+            else:
+                worse = ratio > 1.0+tolerance
+            line += " {:>14.6g} {:>8.2f}{}".format(base["value"],ratio,
+                                                    "  REGRESSION" if worse else "")
+            if worse:
+                regressions.append(name)
+        print(line+" "+result["unit"])
+    return regressions
+
+
+def _main():
+
+    parser = argparse.ArgumentParser(description="roboball2d benchmark suite")
+    parser.add_argument("benchmarks",nargs="*",
+                        help="benchmarks to run (default: all), among: "
+                        +", ".join(BENCHMARKS.keys()))
+    parser.add_argument("--output",default="benchmark_results.json",
+                        help="JSON file the results are written to")
+    parser.add_argument("--baseline",default=BASELINE,
+                        help="JSON file of the results to compare to")
+    parser.add_argument("--save-baseline",action="store_true",
+                        help="write the results to the baseline file")
+    parser.add_argument("--tolerance",type=float,default=0.2,
+                        help="relative difference to the baseline reported as regression")
+    parser.add_argument("--quick",action="store_true",
+                        help="shorter measures (less accurate)")
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark: {}".format(name))
+
+    results = run(args.benchmarks or None,
+                  min_time=0.02 if args.quick else 0.2)
+
+    with open(args.output,"w") as f:
+        json.dump(results,f,indent=2)
+
+    baseline = None
+    if not args.save_baseline:
+        if os.path.isfile(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            for key in ("platform","processor","python"):
+                if baseline["meta"].get(key) != results["meta"][key]:
+                    print("warning: baseline generated with another {} ({}), "
+                          "timings may not be comparable".format(key,baseline["meta"].get(key)))
+        else:
+            print("no baseline ({}), see --save-baseline".format(args.baseline))
+
+    regressions = compare(results,baseline,args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline,"w") as f:
+            json.dump(results,f,indent=2)
+        print("baseline saved in {}".format(args.baseline))
+
+    if regressions:
+        print("{} regression(s) (tolerance {})".format(len(regressions),args.tolerance))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    _main()
@@ -3,3 +3,4 @@ from roboball2d.ball.ball_config import BallConfig
 """
 Specifying the configuration of balls for dynamic simulation and rendering.
 """
+from roboball2d.ball.ball_flight import BallFlightPredictor
@@ -0,0 +1,298 @@
+import math
+
+import numpy as np
+
+
+# Box2D constants (see b2Settings.h) used to mimic
+# its contact handling between the balls and the floor
+_LINEAR_SLOP = 0.005
+# skin of polygon shapes (i.e. of the ground)
+_POLYGON_RADIUS = 2.0*_LINEAR_SLOP
+# below this normal speed, contacts are inelastic
+_VELOCITY_THRESHOLD = 1.0
+# tolerance of the time of impact computation
+_TOI_TOLERANCE = 0.25*_LINEAR_SLOP
+
+
+class BallFlightPrediction:
+
+    """
+    Predicted flights of N balls, as returned by
+    :py:meth:`roboball2d.ball.ball_flight.BallFlightPredictor.predict`
+    (K query times).
+
+    Attributes
+    ----------
+
+    times: (K,) array
+        query times (in seconds, relative to the time of the initial states)
+
+    positions: (N,K,2) array
+        positions of the balls at the query times
+
+    linear_velocities: (N,K,2) array
+        linear velocities of the balls at the query times
+
+    hits_floor: (N,) array
+        x position of each ball when it first hit the floor, i.e.
+        the value :py:class:`roboball2d.physics.world_state.WorldState` would
+        give as balls_hits_floor (nan if the ball did not hit the floor
+        before the last query time)
+
+    hits_floor_time: (N,) array
+        time of the end of the step during which each ball first hit the floor
+        (i.e. the time of the world state reporting the hit), nan if the ball
+        did not hit the floor
+
+    """
+
+    __slots__=["times","positions","linear_velocities",
+               "hits_floor","hits_floor_time"]
+
+    def __init__(self, times, positions, linear_velocities,
+                 hits_floor, hits_floor_time):
+        self.times = times
+        self.positions = positions
+        self.linear_velocities = linear_velocities
+        self.hits_floor = hits_floor
+        self.hits_floor_time = hits_floor_time
+
+    def __str__(self):
+        return ("ball flight prediction ("+str(len(self.positions))+" balls, "+
+                str(len(self.times))+" times):\n\thits floor: "+str(self.hits_floor))
+
+
+class BallFlightPredictor:
+
+    """
+    Predicts the flight of N balls at once (numpy, vectorized over the balls),
+    without a Box2D world. The motion is integrated as
+    :py:class:`roboball2d.physics.b2_world.B2World` does: same time step,
+    gravity and aerodynamic drag (-ball_drag*|v|*v), semi implicit Euler
+    integration, and bounces on the floor using the ball restitution and
+    the Box2D friction (with continuous collision detection, i.e. bounces
+    occur at the time of impact, not at the end of the step).
+
+    Other bodies (robots, other balls) are ignored: predictions are valid
+    until the ball hits a racket.
+
+    Predictions match B2World up to float32 rounding during free flight.
+    Bounces follow the Box2D contact model (restitution above 1 m/s of
+    normal speed, Coulomb friction, contact skin), up to the position
+    correction performed by the Box2D solver (about a millimeter).
+    """
+
+    __slots__=["_radius","_restitution","_mass","_inverse_inertia",
+               "_drag","_gravity","_time_step","_friction",
+               "_floor_x_min","_floor_x_max"]
+
+    def __init__(self,
+                 ball_configs,
+                 gravitational_acceleration=-8.0,
+                 steps_per_sec=100.0,
+                 visible_area_width=None,
+                 friction=0.2):
+
+        """
+        Parameters
+        ----------
+
+        ball_configs :
+            instance of :py:class:`roboball2d.ball.ball_config.BallConfig`
+            (shared by all balls), or list of N instances
+
+        gravitational_acceleration, steps_per_sec :
+            as passed to :py:class:`roboball2d.physics.b2_world.B2World`
+
+        visible_area_width : `float`
+            as passed to :py:class:`roboball2d.physics.b2_world.B2World`,
+            used to compute the extent of the floor. If None, the floor
+            is infinite.
+
+        friction : `float`
+            friction coefficient between the balls and the floor
+            (Box2D default)
+        """
+
+        if isinstance(ball_configs,(list,tuple)):
+            configs = ball_configs
+        else:
+            configs = [ball_configs]
+        self._radius = np.array([config.radius for config in configs])
+        self._restitution = np.array([config.restitution for config in configs])
+        # Box2D mass and rotational inertia of a disk
+        self._mass = np.array([config.density*math.pi*config.radius**2
+                               for config in configs])
+        self._inverse_inertia = 1.0/(0.5*self._mass*self._radius**2)
+        self._drag = np.array([config.ball_drag for config in configs])
+        self._gravity = gravitational_acceleration
+        self._time_step = 1.0/steps_per_sec
+        self._friction = friction
+        if visible_area_width is None:
+            self._floor_x_min,self._floor_x_max = -np.inf,np.inf
+        else:
+            # ground of B2World: box of half width 2*visible_area_width
+            self._floor_x_min = visible_area_width/2.0 - 2.0*visible_area_width
+            self._floor_x_max = visible_area_width/2.0 + 2.0*visible_area_width
+
+    def _bounce(self, mask, y, vx, vy, w, balls):
+
+        # contact impulses (normal and friction) of the balls in mask,
+        # velocities updated in place. balls: (restitution, mass,
+        # radius, inverse inertia) arrays of all balls
+
+        restitution,mass,radius,inverse_inertia = [ values[mask] for values in balls ]
+        # Box2D contact point: midway between the bottom of the
+        # ball and the surface of the ground skin
+        arm = 0.5*(y[mask] + radius - _POLYGON_RADIUS)
+
+        vn = vy[mask]
+        new_vn = np.where(vn < -_VELOCITY_THRESHOLD,-restitution*vn,0.0)
+        new_vn = np.where(vn < 0.0,new_vn,vn)
+        vy[mask] = new_vn
+        normal_impulse = mass*(new_vn-vn)
+
+        # Coulomb friction at the contact point (0,-arm)
+        vt = vx[mask] + w[mask]*arm
+        tangent_mass = 1.0/(1.0/mass + arm*arm*inverse_inertia)
+        max_friction = self._friction*normal_impulse
+        friction_impulse = np.clip(-tangent_mass*vt,-max_friction,max_friction)
+        vx[mask] += friction_impulse/mass
+        w[mask] += arm*friction_impulse*inverse_inertia
+
+    def predict(self,
+                positions,
+                linear_velocities,
+                times,
+                angular_velocities=None):
+
+        """
+        Predicts the flight of the balls.
+
+        Parameters
+        ----------
+
+        positions : (N,2) array
+            initial positions of the balls
+
+        linear_velocities : (N,2) array
+            initial linear velocities of the balls
+
+        times : (K,) array
+            increasing query times (in seconds, relative to the initial states).
+            Times between two steps are linearly interpolated.
+
+        angular_velocities : (N,) array
+            initial spins of the balls (zero if None)
+
+        Returns
+        -------
+
+        instance of :py:class:`roboball2d.ball.ball_flight.BallFlightPrediction`
+        """
+
+        positions = np.asarray(positions,dtype=float).reshape(-1,2)
+        linear_velocities = np.asarray(linear_velocities,dtype=float).reshape(-1,2)
+        times = np.atleast_1d(np.asarray(times,dtype=float))
+        nb_balls = positions.shape[0]
+        if self._radius.size not in (1,nb_balls):
+            raise Exception("BallFlightPredictor:",self._radius.size,
+                            "ball configurations but",nb_balls,"balls")
+
+        x = positions[:,0].copy()
+        y = positions[:,1].copy()
+        vx = linear_velocities[:,0].copy()
+        vy = linear_velocities[:,1].copy()
+        if angular_velocities is None:
+            w = np.zeros(nb_balls)
+        else:
+            w = np.array(angular_velocities,dtype=float).reshape(nb_balls)
+
+        def _per_ball(values):
+            return np.broadcast_to(values,(nb_balls,))
+        balls = [ _per_ball(values) for values in (self._restitution,self._mass,
+                                                   self._radius,self._inverse_inertia) ]
+        radius = balls[2]
+        drag = _per_ball(self._drag/self._mass)
+        dt = self._time_step
+        gravity = self._gravity
+        # heights of the center of a ball: in contact (within the
+        # ground skin), at the target separation of the time of impact, and
+        # after resolution of the time of impact (Box2D moves the ball back
+        # up to the target separation of its position solver)
+        skin_height = radius + _POLYGON_RADIUS
+        impact_height = radius + _POLYGON_RADIUS - 3.0*_LINEAR_SLOP
+        resolved_height = radius + _POLYGON_RADIUS - _LINEAR_SLOP
+
+        nb_steps = int(math.ceil(times[-1]/dt - 1e-9)) if len(times) else 0
+        nb_steps = max(nb_steps,0)
+
+        # states after each step (row 0: initial state)
+        states = np.empty((nb_steps+1,4,nb_balls))
+        states[0] = (x,y,vx,vy)
+
+        hits_floor = np.full(nb_balls,np.nan)
+        hits_floor_time = np.full(nb_balls,np.nan)
+
+        for step in range(nb_steps):
+
+            over_floor = (x >= self._floor_x_min) & (x <= self._floor_x_max)
+
+            # contacts updated at the start of the step
+            touching = over_floor & (y <= skin_height)
+            began = touching & np.isnan(hits_floor)
+            if began.any():
+                hits_floor[began] = x[began]
+                hits_floor_time[began] = (step+1)*dt
+
+            # velocities: gravity and drag
+            speed = np.hypot(vx,vy)
+            vx -= dt*drag*speed*vx
+            vy += dt*(gravity - drag*speed*vy)
+
+            # discrete contact
+            if touching.any():
+                self._bounce(touching,y,vx,vy,w,balls)
+
+            # positions. Balls starting the step closer to the floor than the
+            # target separation of the time of impact: Box2D resolves an impact
+            # at the start of the step, i.e. the ball is moved back up. Balls
+            # crossing the floor during the step: bounce at the time of impact
+            lifted = touching & (y < impact_height+_TOI_TOLERANCE)
+            new_y = y + dt*vy
+            impact = ( ~touching & over_floor & (vy < 0.0)
+                       & (new_y < impact_height-_TOI_TOLERANCE) )
+            x += dt*vx
+            y = new_y
+            if lifted.any():
+                y[lifted] = resolved_height[lifted] + dt*vy[lifted]
+            if impact.any():
+                # fraction of the step before the impact
+                ratio = (y[impact] - dt*vy[impact] - impact_height[impact])/(-dt*vy[impact])
+                ratio = np.clip(ratio,0.0,1.0)
+                x_impact = x[impact] - (1.0-ratio)*dt*vx[impact]
+                new_hits = np.isnan(hits_floor[impact])
+                indexes = np.flatnonzero(impact)[new_hits]
+                hits_floor[indexes] = x_impact[new_hits]
+                hits_floor_time[indexes] = (step+1)*dt
+                y[impact] = resolved_height[impact]
+                self._bounce(impact,y,vx,vy,w,balls)
+                remaining = (1.0-ratio)*dt
+                x[impact] = x_impact + remaining*vx[impact]
+                y[impact] += remaining*vy[impact]
+
+            states[step+1] = (x,y,vx,vy)
+
+        # interpolation at the query times
+        steps = times/dt
+        previous = np.clip(np.floor(steps+1e-9).astype(int),0,nb_steps)
+        following = np.minimum(previous+1,nb_steps)
+        weights = np.clip(steps-previous,0.0,1.0)[:,None,None]
+        values = (1.0-weights)*states[previous] + weights*states[following]
+        # (K,4,N) -> (N,K,2)
+        values = values.transpose(2,0,1)
+
+        return BallFlightPrediction(times,
+                                    values[:,:,0:2].copy(),
+                                    values[:,:,2:4].copy(),
+                                    hits_floor,hits_floor_time)
@@ -1,2 +1,3 @@
 from roboball2d.ball_gun.default_ball_gun import DefaultBallGun
 from roboball2d.ball_gun.drop_ball_gun import DropBallGun
+from roboball2d.ball_gun.bounce_table import BounceTable
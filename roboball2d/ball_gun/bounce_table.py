@@ -0,0 +1,344 @@
+import itertools,json,math,os
+
+import numpy as np
+
+
+# values stored for each shot of the table
+CHANNELS = ("landing_x","landing_time","crossing_y","crossing_time")
+
+
+class _Shot:
+
+    # ball gun always shooting the same ball
+
+    __slots__=["_values"]
+
+    def __init__(self, position, linear_velocity, angular_velocity):
+        self._values = (position,0.0,linear_velocity,angular_velocity)
+
+    def shoot(self):
+        return self._values
+
+
+def _locate(axis, values):
+
+    # index of the lower grid point and interpolation weight
+    # of each value (values out of the axis range are clipped)
+
+    if len(axis) == 1:
+        return np.zeros(len(values),dtype=int),np.zeros(len(values))
+    index = np.clip(np.searchsorted(axis,values)-1,0,len(axis)-2)
+    weight = (values-axis[index])/(axis[index+1]-axis[index])
+    return index,np.clip(weight,0.0,1.0)
+
+
+class BounceTable:
+
+    """
+    Lookup table of the flights of balls shot from a fixed horizontal position
+    (e.g. by :py:class:`roboball2d.ball_gun.default_ball_gun.DefaultBallGun`),
+    precomputed over a grid of initial heights, speeds, angles (phi) and spins
+    using :py:class:`roboball2d.physics.b2_world.B2World` (ball only simulation,
+    see :py:meth:`build`), so that questions such as "where will this shot land"
+    are answered by an interpolation in the table rather than by a simulation.
+
+    As for DefaultBallGun, a shot of speed s and angle phi has the initial
+    linear velocity (-s*cos(phi),s*sin(phi)).
+
+    For each shot, the table stores (see CHANNELS):
+
+    - landing_x, landing_time: x position and time at which the ball
+      first hits the floor
+    - crossing_y, crossing_time: height and time at which the ball first
+      crosses the vertical line x = crossing_x (e.g. the position of the robot)
+
+    (nan if the event did not occur during the simulated duration). Times are
+    relative to the shot.
+
+    e.g., table of the default ball gun::
+
+        ball_config = BallConfig()
+        grid = BounceTable.grid(DefaultBallGun(ball_config))
+        table = BounceTable.build("table.npy",ball_config,grid)
+        landing_x,landing_time = table.landing(1.2,5.4,0.1,0.0)
+
+    Tables are stored as .npy files (values, of shape (H,S,P,W,4)), which are
+    memory mapped when loaded, along with a .json file (grid and parameters).
+
+    Attributes
+    ----------
+
+    values: (H,S,P,W,4) array
+        values of the table (memory mapped, read only)
+
+    heights, speeds, phis, spins: 1d arrays
+        grid of the table
+
+    initial_pos_x: `float`
+        horizontal position of the shots
+
+    crossing_x: `float`
+        x position of the vertical line used for the crossing values
+
+    """
+
+    __slots__=["values","heights","speeds","phis","spins",
+               "initial_pos_x","crossing_x"]
+
+    def __init__(self, path):
+
+        """
+        Loads a table created by :py:meth:`build`
+
+        Parameters
+        ----------
+
+        path: `str`
+            path to the .npy file of the table
+        """
+
+        self.values = np.load(path,mmap_mode="r")
+        with open(self._meta_path(path)) as f:
+            meta = json.load(f)
+        self.heights = np.array(meta["heights"])
+        self.speeds = np.array(meta["speeds"])
+        self.phis = np.array(meta["phis"])
+        self.spins = np.array(meta["spins"])
+        self.initial_pos_x = meta["initial_pos_x"]
+        self.crossing_x = meta["crossing_x"]
+
+    @staticmethod
+    def _meta_path(path):
+        return os.path.splitext(path)[0]+".json"
+
+    @staticmethod
+    def grid(ball_gun, shape=(5,5,9,7), nb_std=2.0):
+
+        """
+        Returns a grid (heights, speeds, phis, spins) covering the
+        distributions of an instance of
+        :py:class:`roboball2d.ball_gun.default_ball_gun.DefaultBallGun`
+        (mean +/- nb_std standard deviations, and the range of angles)
+
+        Parameters
+        ----------
+
+        ball_gun:
+            instance of DefaultBallGun
+
+        shape: `tuple`
+            number of values of each axis
+
+        nb_std: `float`
+            extent of the normal distributions, in standard deviations
+        """
+
+        def _normal(mean,std,nb):
+            return np.linspace(mean-nb_std*std,mean+nb_std*std,nb)
+
+        nb_heights,nb_speeds,nb_phis,nb_spins = shape
+        heights = _normal(ball_gun.initial_height_mean,
+                          ball_gun.initial_height_std,nb_heights)
+        # (the ball gun does not shoot below 4 radius)
+        heights = np.unique(np.maximum(heights,4.0*ball_gun.radius))
+        speeds = _normal(ball_gun.speed_mean,ball_gun.speed_std,nb_speeds)
+        phis = np.linspace(ball_gun.vel_angle_min,ball_gun.vel_angle_max,nb_phis)
+        spins = _normal(0.0,ball_gun.spin_std,nb_spins)
+        return heights,speeds,phis,spins
+
+    @classmethod
+    def build(cls,
+              path,
+              ball_config,
+              grid,
+              initial_pos_x=6.0,
+              crossing_x=1.0,
+              visible_area_width=6.0,
+              steps_per_sec=100.0,
+              gravitational_acceleration=-8.0,
+              duration=3.0,
+              batch_size=1000):
+
+        """
+        Simulates the shots of the grid and saves the table.
+        Shots are simulated in batches, as balls of a same
+        B2World do not collide with each other.
+
+        Parameters
+        ----------
+
+        path: `str`
+            path of the .npy file to create (the .json file is created
+            in the same folder, with the same name)
+
+        ball_config:
+            instance of :py:class:`roboball2d.ball.ball_config.BallConfig`
+
+        grid:
+            (heights, speeds, phis, spins), 1d increasing arrays,
+            see for example :py:meth:`grid`
+
+        initial_pos_x: `float`
+            horizontal position of the shots
+
+        crossing_x: `float`
+            see :py:class:`BounceTable`, e.g. the position of the robot
+            (see :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`)
+
+        visible_area_width, steps_per_sec, gravitational_acceleration:
+            see :py:class:`roboball2d.physics.b2_world.B2World`
+
+        duration: `float`
+            max duration (in seconds) of the simulation of a shot
+
+        batch_size: `int`
+            number of shots simulated by the same B2World
+
+        Returns
+        -------
+
+        the table (instance of :py:class:`BounceTable`)
+        """
+
+        # import here to avoid circular import
+        from ..physics.b2_world import B2World
+
+        grid = [ np.asarray(axis,dtype=float) for axis in grid ]
+        shape = tuple([len(axis) for axis in grid])
+        values = np.lib.format.open_memmap(path,mode="w+",dtype=np.float64,
+                                           shape=shape+(len(CHANNELS),))
+        flat_values = values.reshape(-1,len(CHANNELS))
+        shots = np.array(list(itertools.product(*grid)))
+        nb_steps = int(math.ceil(duration*steps_per_sec))
+        time_step = 1.0/steps_per_sec
+
+        for start in range(0,len(shots),batch_size):
+
+            batch = shots[start:start+batch_size]
+            nb_balls = len(batch)
+            world = B2World([],[ball_config]*nb_balls,
+                            visible_area_width,
+                            steps_per_sec=steps_per_sec,
+                            gravitational_acceleration=gravitational_acceleration,
+                            world_state_mode="bulk")
+            ball_guns = [ _Shot([initial_pos_x,height],
+                                [-speed*math.cos(phi),speed*math.sin(phi)],
+                                spin)
+                          for height,speed,phi,spin in batch ]
+            state = world.reset(None,ball_guns)
+
+            results = np.full((nb_balls,len(CHANNELS)),np.nan)
+            previous = state.balls.position.copy()
+            for _ in range(nb_steps):
+                state = world.step(None)
+                balls = state.balls
+                landed = np.isnan(results[:,0]) & ~np.isnan(balls.hits_floor)
+                results[landed,0] = balls.hits_floor[landed]
+                results[landed,1] = state.t
+                x = balls.position[:,0]
+                crossed = ( np.isnan(results[:,3])
+                            & ((previous[:,0]-crossing_x)*(x-crossing_x) <= 0.0)
+                            & (previous[:,0] != x) )
+                if crossed.any():
+                    ratio = (crossing_x-previous[crossed,0])/(x[crossed]-previous[crossed,0])
+                    results[crossed,2] = ( previous[crossed,1]
+                                           + ratio*(balls.position[crossed,1]-previous[crossed,1]) )
+                    results[crossed,3] = state.t - (1.0-ratio)*time_step
+                previous[:] = balls.position
+                if not np.isnan(results[:,(0,3)]).any():
+                    break
+
+            flat_values[start:start+nb_balls] = results
+
+        values.flush()
+        del values
+
+        meta = {"heights":grid[0].tolist(),
+                "speeds":grid[1].tolist(),
+                "phis":grid[2].tolist(),
+                "spins":grid[3].tolist(),
+                "initial_pos_x":initial_pos_x,
+                "crossing_x":crossing_x}
+        with open(cls._meta_path(path),"w") as f:
+            json.dump(meta,f)
+
+        return cls(path)
+
+    def interpolate(self, heights, speeds, phis, spins):
+
+        """
+        Returns the values (array of shape (Q,4), see CHANNELS) of Q shots,
+        interpolated (multilinear) in the table. Shots out of the grid are
+        clipped to the grid.
+
+        Parameters
+        ----------
+
+        heights, speeds, phis, spins:
+            arrays of shape (Q,) (or floats)
+        """
+
+        queries = np.broadcast_arrays(*[ np.atleast_1d(np.asarray(values,dtype=float))
+                                         for values in (heights,speeds,phis,spins) ])
+        located = [ _locate(axis,values)
+                    for axis,values in zip((self.heights,self.speeds,
+                                            self.phis,self.spins),queries) ]
+        sizes = self.values.shape[:4]
+
+        result = np.zeros((len(queries[0]),len(CHANNELS)))
+        # sum over the 16 corners of the cells
+        for corner in itertools.product((0,1),repeat=4):
+            weight = np.ones(len(queries[0]))
+            indexes = []
+            for upper,(index,axis_weight),size in zip(corner,located,sizes):
+                if upper:
+                    weight = weight*axis_weight
+                    indexes.append(np.minimum(index+1,size-1))
+                else:
+                    weight = weight*(1.0-axis_weight)
+                    indexes.append(index)
+            values = self.values[tuple(indexes)]
+            # (corners of weight 0 may be nan)
+            result += np.where(weight[:,None] > 0.0,weight[:,None]*values,0.0)
+        return result
+
+    def landing(self, heights, speeds, phis, spins):
+
+        """
+        Returns the (interpolated) x positions and times at which
+        the balls first hit the floor, see :py:meth:`interpolate`
+        """
+
+        values = self.interpolate(heights,speeds,phis,spins)
+        return values[:,0],values[:,1]
+
+    def crossing(self, heights, speeds, phis, spins):
+
+        """
+        Returns the (interpolated) heights and times at which the balls
+        first cross the line x = crossing_x, see :py:meth:`interpolate`
+        """
+
+        values = self.interpolate(heights,speeds,phis,spins)
+        return values[:,2],values[:,3]
+
+    def lookup_shots(self, positions, linear_velocities, angular_velocities):
+
+        """
+        Returns the values (array of shape (Q,4), see CHANNELS) of shots given
+        as returned by the ball guns (see :py:meth:`roboball2d.ball_gun.default_ball_gun.DefaultBallGun.shoot`),
+        i.e. positions (Q,2), linear velocities (Q,2) and angular velocities (Q,).
+        The positions are expected to be at x = initial_pos_x.
+        """
+
+        positions = np.asarray(positions,dtype=float).reshape(-1,2)
+        linear_velocities = np.asarray(linear_velocities,dtype=float).reshape(-1,2)
+        speeds = np.hypot(linear_velocities[:,0],linear_velocities[:,1])
+        phis = np.arctan2(linear_velocities[:,1],-linear_velocities[:,0])
+        return self.interpolate(positions[:,1],speeds,phis,angular_velocities)
+
+    def __str__(self):
+        return ("bounce table "+str(self.values.shape[:4])+
+                " (initial x: "+str(self.initial_pos_x)+
+                ", crossing x: "+str(self.crossing_x)+")")
+
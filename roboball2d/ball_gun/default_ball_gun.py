@@ -1,3 +1,5 @@
+import copy
+
 import numpy as np
 
 class DefaultBallGun:
@@ -14,6 +16,16 @@ class DefaultBallGun:
     User code may change the values of the attributes after construction
     to match his/her need
 
+    :py:meth:`shoot_batch` samples a generator (numpy.random.Generator)
+    specific to the ball gun, seeded at construction (see :py:meth:`seed`).
+    If a seed was given (and for ball guns obtained via :py:meth:`spawn`),
+    :py:meth:`shoot` samples this generator as well, so that worlds reset
+    with the ball gun are reproducible. Otherwise, :py:meth:`shoot` samples
+    the global numpy random generator (i.e. np.random.seed applies).
+    For parallel workers, independent ball guns can be obtained via
+    :py:meth:`spawn` (as done by
+    :py:class:`roboball2d.physics.subprocess_b2_world.SubprocessB2World`).
+
     Attributes
     ----------
     
@@ -40,26 +52,43 @@ class DefaultBallGun:
 
     vel_angle_max : `float`
         in radians per second
+
+    radius : `float`
+        radius of the shot balls (read only, balls are not shot
+        below 4 radius)
+
+    rng : `numpy.random.Generator`
+        generator sampled by shoot_batch (read only, created
+        at first use)
+
+    seeded : `bool`
+        True if shoot samples rng rather than the global numpy
+        random generator (read only, see :py:meth:`seed`)
    
     """
     
     __slots__=["_radius","initial_pos_x","initial_height_mean",
                "initial_height_std","speed_mean","speed_std",
-               "spin_std","vel_angle_min","vel_angle_max"]
+               "spin_std","vel_angle_min","vel_angle_max",
+               "_rng","_seed_sequence","_seeded"]
     
     
     def __init__(self,
-                 ball_config):
+                 ball_config,
+                 seed=None):
 
         """
         Creates an instance of ball gun setting default values to all 
         attributes.
 
-        Args
-        ----
+        Parameters
+        ----------
 
         ball_config : :py:class:`roboball2d.ball.BallConfig`
             used to set the radius of the ball that will be shot
+
+        seed : `int` or `numpy.random.SeedSequence`
+            seed of the generator of the ball gun (see :py:meth:`seed`)
         """
         
         self._radius = ball_config.radius
@@ -72,6 +101,68 @@ class DefaultBallGun:
         self.spin_std = 5.0
         self.vel_angle_min = -np.pi*0.1
         self.vel_angle_max = np.pi*0.1
+
+        self.seed(seed)
+
+    def seed(self, seed=None):
+
+        """
+        (Re)creates the generator used by :py:meth:`shoot_batch`
+        (and by :py:meth:`shoot`, if seed is not None)
+
+        Parameters
+        ----------
+
+        seed : `int` or `numpy.random.SeedSequence`
+            if None, fresh entropy is used, and :py:meth:`shoot`
+            samples the global numpy random generator
+        """
+
+        # the generator is created at first use, as creating it
+        # costs more than the construction of the ball gun
+        self._seed_sequence = seed
+        self._seeded = seed is not None
+        self._rng = None
+
+    def _get_seed_sequence(self):
+        if not isinstance(self._seed_sequence,np.random.SeedSequence):
+            self._seed_sequence = np.random.SeedSequence(self._seed_sequence)
+        return self._seed_sequence
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @property
+    def seeded(self):
+        return self._seeded
+
+    @property
+    def rng(self):
+        if self._rng is None:
+            self._rng = np.random.default_rng(self._get_seed_sequence())
+        return self._rng
+
+    def spawn(self, nb_ball_guns):
+
+        """
+        Returns a list of nb_ball_guns new ball guns, with the same
+        attributes as this ball gun, but each with its own generator,
+        statistically independent from the others (child streams of
+        the seed of this ball gun, see numpy.random.SeedSequence.spawn).
+        Spawning is reproducible: ball guns spawned by ball guns created with
+        the same seed shoot the same balls. Spawned ball guns are seeded (i.e.
+        their method shoot samples their own generator), and of the same
+        class as this ball gun.
+        """
+
+        ball_guns = []
+        for seed_sequence in self._get_seed_sequence().spawn(nb_ball_guns):
+            # (copy: same class and attributes, including subclasses')
+            ball_gun = copy.copy(self)
+            ball_gun.seed(seed_sequence)
+            ball_guns.append(ball_gun)
+        return ball_guns
         
 
     def shoot(self):
@@ -81,26 +172,58 @@ class DefaultBallGun:
         -------
         a list: position (x,y),angle (radian), 
                 linear_velocity (vx,vy), angular_velocity (or spin, radian per second). 
-                These values are created by sampling the normal distributions.
+                These values are created by sampling the normal distributions
+                (of the generator of the ball gun if seeded, of the global numpy
+                random generator otherwise).
         
         """
 
+        random = self.rng if self._seeded else np.random
+
         position = [self.initial_pos_x,
-                    max(np.random.normal(
+                    max(random.normal(
                         self.initial_height_mean,
                         self.initial_height_std),
                         4.0*self._radius)]
         
         angle = 0.
     
-        speed = np.random.normal(self.speed_mean,
-                                      self.speed_std)
-        phi = np.random.uniform(self.vel_angle_min,
-                                     self.vel_angle_max)
+        speed = random.normal(self.speed_mean,
+                              self.speed_std)
+        phi = random.uniform(self.vel_angle_min,
+                             self.vel_angle_max)
 
         linear_velocity = [-speed*np.cos(phi),
                            speed*np.sin(phi)]
-        angular_velocity = np.random.normal(0.0,
-                                            self.spin_std)
+        angular_velocity = random.normal(0.0,
+                                         self.spin_std)
         
         return position,angle,linear_velocity,angular_velocity
+
+    def shoot_batch(self, nb_balls):
+
+        """
+        Samples nb_balls shots at once, using the generator of the
+        ball gun (see :py:meth:`seed`), with the same distributions
+        as :py:meth:`shoot`.
+
+        Returns
+        -------
+        an array of shape (nb_balls,6), each row being a shot:
+        x, y, angle, vx, vy, angular velocity
+        """
+
+        rng = self.rng
+        shots = np.empty((nb_balls,6))
+        shots[:,0] = self.initial_pos_x
+        shots[:,1] = np.maximum(rng.normal(self.initial_height_mean,
+                                           self.initial_height_std,
+                                           nb_balls),
+                                4.0*self._radius)
+        shots[:,2] = 0.
+        speed = rng.normal(self.speed_mean,self.speed_std,nb_balls)
+        phi = rng.uniform(self.vel_angle_min,self.vel_angle_max,nb_balls)
+        shots[:,3] = -speed*np.cos(phi)
+        shots[:,4] = speed*np.sin(phi)
+        shots[:,5] = rng.normal(0.0,self.spin_std,nb_balls)
+        return shots
@@ -50,4 +50,31 @@ class DropBallGun:
         """
 
         return [self._x,self._y],0.0,[0.0,0.0],0.0
-        
+
+    def shoot_batch(self, nb_balls):
+
+        """
+        Same as :py:meth:`shoot`, for nb_balls balls at once
+        (see :py:meth:`roboball2d.ball_gun.default_ball_gun.DefaultBallGun.shoot_batch`)
+
+        Returns
+        -------
+        an array of shape (nb_balls,6), each row being a shot:
+        x, y, angle, vx, vy, angular velocity (all zeros but x and y)
+        """
+
+        shots = np.zeros((nb_balls,6))
+        shots[:,0] = self._x
+        shots[:,1] = self._y
+        return shots
+
+    def spawn(self, nb_ball_guns):
+
+        """
+        Returns a list of nb_ball_guns copies of this ball gun (for
+        compatibility with
+        :py:meth:`roboball2d.ball_gun.default_ball_gun.DefaultBallGun.spawn`,
+        drop ball guns are deterministic)
+        """
+
+        return [ DropBallGun(self._x,self._y) for _ in range(nb_ball_guns) ]
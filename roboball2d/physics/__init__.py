@@ -1,4 +1,18 @@
 from roboball2d.physics.world_state import WorldState
+from roboball2d.physics.world_state import ArrayWorldState
+from roboball2d.physics.lazy_world_state import LazyWorldState
 from roboball2d.physics.b2_world import B2World
+from roboball2d.physics.b2_world import B2WorldSnapshot
 from roboball2d.physics.b2_robot import B2Robot
 from roboball2d.physics.default_b2_robot import DefaultB2Robot
+from roboball2d.physics.batched_b2_world import BatchedB2World
+from roboball2d.physics.batched_b2_world import BatchedWorldState
+from roboball2d.physics.subprocess_b2_world import SubprocessB2World
+from roboball2d.physics.contact_events import ContactEvents
+from roboball2d.physics.play_area import PlayArea
+from roboball2d.physics.real_time_runner import RealTimeRunner
+from roboball2d.physics.async_b2_world import AsyncB2World
+from roboball2d.physics.step_profiler import StepProfiler
+from roboball2d.physics.simulation_record import SimulationRecord
+from roboball2d.physics.rollout import Rollout
+from roboball2d.physics.rollout import rollout
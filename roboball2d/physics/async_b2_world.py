@@ -0,0 +1,296 @@
+import asyncio,functools,multiprocessing,traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from .b2_world import B2World
+
+
+class _ThreadBackend:
+
+    # calls the methods of a world on an executor (by default
+    # a dedicated single thread executor)
+
+    def __init__(self, world, executor):
+        self._world = world
+        # call cancelled while running in the executor
+        self._cancelled = None
+        if executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+            self._own_executor = True
+        else:
+            self._executor = executor
+            self._own_executor = False
+
+    async def call(self, method, args, kwargs):
+        loop = asyncio.get_running_loop()
+        if self._cancelled is not None:
+            # (the world must not be used by two threads at once)
+            await asyncio.wait([self._cancelled])
+            self._cancelled = None
+        future = loop.run_in_executor(self._executor,
+                                      functools.partial(getattr(self._world,method),
+                                                        *args,**kwargs))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self._cancelled = future
+            raise
+
+    def close(self):
+        if self._own_executor:
+            self._executor.shutdown()
+
+
+def _worker(pipe, world_args, world_kwargs):
+
+    # runs in its own process: creates a world and
+    # calls its methods as requested via the pipe
+
+    try:
+        world = B2World(*world_args,**world_kwargs)
+        pipe.send((True,None))
+    except Exception:
+        pipe.send((False,traceback.format_exc()))
+        pipe.close()
+        return
+
+    while True:
+        method,args,kwargs = pipe.recv()
+        if method == "close":
+            break
+        try:
+            pipe.send((True,getattr(world,method)(*args,**kwargs)))
+        except Exception:
+            pipe.send((False,traceback.format_exc()))
+
+    pipe.close()
+
+
+class _ProcessBackend:
+
+    # calls the methods of a world living in a worker process.
+    # Replies are awaited by watching the pipe file descriptor
+    # from the event loop (no thread per pending call). Calls are
+    # serialized, and the replies of cancelled calls are discarded
+    # before the next call (the worker still sends them)
+
+    def __init__(self, world_args, world_kwargs, start_method):
+        context = multiprocessing.get_context(start_method)
+        self._pipe,child_pipe = context.Pipe()
+        self._process = context.Process(target=_worker,
+                                         args=(child_pipe,world_args,world_kwargs),
+                                         daemon=True)
+        self._process.start()
+        child_pipe.close()
+        self._lock = None
+        # number of replies of cancelled calls not read yet
+        self._stale_replies = 0
+        success,error = self._pipe.recv()
+        if not success:
+            self._process.join()
+            raise Exception("AsyncB2World, worker error:\n"+error)
+
+    async def _receive(self):
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        fd = self._pipe.fileno()
+
+        def _on_reply():
+            # (the reply of a cancelled call is left in the pipe)
+            if future.done():
+                return
+            try:
+                future.set_result(self._pipe.recv())
+            except Exception as e:
+                future.set_exception(e)
+
+        loop.add_reader(fd,_on_reply)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.cancelled() or not future.done():
+                self._stale_replies += 1
+            raise
+        finally:
+            loop.remove_reader(fd)
+
+    async def call(self, method, args, kwargs):
+
+        # the lock is created lazily, so that instances
+        # can be constructed outside of an event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while self._stale_replies:
+                self._stale_replies -= 1
+                await self._receive()
+            self._pipe.send((method,args,kwargs))
+            success,result = await self._receive()
+
+        if not success:
+            raise Exception("AsyncB2World, worker error:\n"+result)
+        return result
+
+    def close(self, timeout=1.0):
+        try:
+            self._pipe.send(("close",None,None))
+            # the worker may be blocked sending the reply
+            # of a cancelled call
+            while self._stale_replies and self._pipe.poll(timeout):
+                self._pipe.recv()
+                self._stale_replies -= 1
+        except Exception:
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._pipe.close()
+
+
+class AsyncB2World:
+
+    """
+    asyncio facade of :py:class:`roboball2d.physics.b2_world.B2World`:
+    :py:meth:`step` and :py:meth:`reset` are coroutines, the simulation
+    running either on an executor (threads, see the constructor) or in a
+    worker process (see :py:meth:`in_process`), so that the event loop
+    is not blocked while the world is stepped. Calls to the same instance
+    are serialized, calls to different instances run concurrently.
+
+    World states are the ones returned by the world: if the world has been
+    constructed with world_state_mode "arrays" or "lazy" (and runs in threads),
+    they are refreshed in place at each step.
+
+    :py:meth:`close` should be called once the instance is no longer used
+    (instances are also asynchronous context managers).
+    """
+
+    __slots__=["_backend","_lock","_world_state"]
+
+    def __init__(self, world, executor=None):
+
+        """
+        Parameters
+        ----------
+
+        world :
+            instance of :py:class:`roboball2d.physics.b2_world.B2World`, which
+            should not be used directly anymore
+
+        executor :
+            instance of :py:class:`concurrent.futures.Executor` on which the
+            world is stepped (may be shared by several instances). If None,
+            a dedicated thread is used.
+        """
+
+        self._backend = _ThreadBackend(world,executor)
+        self._lock = None
+        self._world_state = None
+
+    @classmethod
+    def in_process(cls, *world_args, start_method=None, **world_kwargs):
+
+        """
+        Returns an instance which world runs in a worker process.
+
+        Parameters
+        ----------
+
+        world_args, world_kwargs :
+            arguments of the constructor of
+            :py:class:`roboball2d.physics.b2_world.B2World` (sent to
+            the worker, so they must be picklable)
+
+        start_method : `str`
+            multiprocessing start method ("fork", "spawn", "forkserver"),
+            default method of the platform if None
+        """
+
+        instance = cls.__new__(cls)
+        instance._backend = _ProcessBackend(world_args,world_kwargs,start_method)
+        instance._lock = None
+        instance._world_state = None
+        return instance
+
+    async def _call(self, method, *args, **kwargs):
+        # the lock is created lazily, so that instances
+        # can be constructed outside of an event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            world_state = await self._backend.call(method,args,kwargs)
+        self._world_state = world_state
+        return world_state
+
+    @property
+    def world_state(self):
+        """
+        World state returned by the last call to step or reset
+        """
+        return self._world_state
+
+    async def reset(self, init_robot_state=None, ball_gun=None, reset_time=True):
+
+        """
+        See :py:meth:`roboball2d.physics.b2_world.B2World.reset`
+        """
+
+        return await self._call("reset",init_robot_state,ball_gun,reset_time)
+
+    async def step(self, all_torques, **kwargs):
+
+        """
+        See :py:meth:`roboball2d.physics.b2_world.B2World.step`
+        """
+
+        return await self._call("step",all_torques,**kwargs)
+
+    async def iterate(self, policy, nb_steps=None, relative_torques=False):
+
+        """
+        Asynchronous iterator stepping the world and yielding
+        the world states, e.g.::
+
+            async for world_state in world.iterate(controller,nb_steps=100):
+                ...
+
+        Parameters
+        ----------
+
+        policy :
+            either the torques to apply at each step, or a callable taking
+            the latest world state (None if the world has not been reset
+            or stepped yet) and returning the torques
+
+        nb_steps : `int`
+            number of steps, if None iterates until the
+            iteration is interrupted
+
+        relative_torques : `Bool`
+            see :py:meth:`roboball2d.physics.b2_world.B2World.step`
+        """
+
+        step = 0
+        while nb_steps is None or step < nb_steps:
+            if callable(policy):
+                torques = policy(self._world_state)
+            else:
+                torques = policy
+            yield await self.step(torques,relative_torques=relative_torques)
+            step += 1
+
+    def close(self):
+
+        """
+        Releases the executor (if dedicated) or stops the worker process
+        """
+
+        self._backend.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
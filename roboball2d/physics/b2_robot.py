@@ -4,6 +4,9 @@ class B2Robot:
     Specifies the interface required by :py:class:`roboball2d.physics.B2World`
     to update the state of a robot. See :py:class:`roboball2d.physics.DefaultB2Robot`
     for an example of a class inherating from B2Robot. 
+    Instances are expected to provide the Box2D body of the racket as
+    attribute 'racket' (and may provide the bodies of the rods as attribute
+    'rods'), which B2World tags to detect the balls hitting the racket.
     """
     
     def __init__(self, robot, b2_world, ground):
@@ -15,6 +18,28 @@ class B2Robot:
     def get_state(self):
         raise NotImplementedError("get_state not implemented.")
 
+    def write_state(self, robots_arrays, index, desired_torques, applied_step = None):
+        """(optional) Write the state of the robot at the specified index
+        of the arrays of an instance of 
+        :py:class:`roboball2d.physics.world_state.ArrayWorldState`. Required
+        for using :py:class:`roboball2d.physics.b2_world.B2World` with 
+        array world states."""
+        raise NotImplementedError("write_state not implemented.")
+
+    def create_lazy_state(self):
+        """(optional) Returns a robot state reading its values from the Box2D
+        bodies of the robot at first access, see
+        :py:class:`roboball2d.physics.lazy_world_state.LazyRobotState`. Required
+        for using :py:class:`roboball2d.physics.b2_world.B2World` with 
+        lazy world states."""
+        raise NotImplementedError("create_lazy_state not implemented.")
+
+    def apply_generalized_torques_into(self, generalized_torques, applied_torques):
+        """(optional) Same as apply_generalized_torques, but writing the actually 
+        applied generalized torques in the array applied_torques. Required for
+        using :py:meth:`roboball2d.physics.b2_world.B2World.step_into`."""
+        raise NotImplementedError("apply_generalized_torques_into not implemented.")
+
     def apply_generalized_torques(self, generalized_torques):
         """Apply generalized torques and return actually applied generalized
         torques."""
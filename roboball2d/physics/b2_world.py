@@ -1,6 +1,5 @@
-import copy,time
+import copy,time,math
 import numpy as np
-import numpy.linalg as linalg
 
 from Box2D import (b2PolygonShape,
                    b2World,
@@ -8,7 +7,14 @@ from Box2D import (b2PolygonShape,
                    b2CircleShape,
                    b2ContactListener)
 
-from .world_state import WorldState
+from .world_state import WorldState,ArrayWorldState
+from .lazy_world_state import LazyWorldState
+from .contact_events import ContactEvents
+from .simulation_record import SimulationRecord
+from .bulk_balls import BulkBalls
+from .body_kinds import GROUND,BALL,ROD,RACKET
+from .step_profiler import (StepProfiler,_TORQUES,_APPLY_TORQUES,_DRAG,
+                            _BOX2D,_CONTACTS,_PLAY_AREA,_WORLD_STATE)
 from ..utils import arraytize
 
 class _Contacts:
@@ -20,59 +26,152 @@ class _Contacts:
     def __init__(self,nb_balls):
 
         self._nb_balls = nb_balls
-        self.reset()
+        self.balls_hits_racket = [None]*self._nb_balls
+        self.balls_hits_floor = [None]*self._nb_balls
 
     def reset(self):
-        
-        self.balls_hits_racket = [False]*self._nb_balls
-        self.balls_hits_floor = [None]*self._nb_balls
+
+        # in place, called at each step
+        balls_hits_racket = self.balls_hits_racket
+        balls_hits_floor = self.balls_hits_floor
+        for index in range(self._nb_balls):
+            balls_hits_racket[index] = None
+            balls_hits_floor[index] = None
+
+
+class _ArrayContacts:
+
+    # same as _Contacts, but allocation free: the contacts are
+    # stored in arrays, nan meaning no contact (used in "bulk" mode)
+
+    __slots__=["balls_hits_racket",
+               "balls_hits_floor"]
+    
+    def __init__(self,nb_balls):
+
+        self.balls_hits_racket = np.full(nb_balls,np.nan)
+        self.balls_hits_floor = np.full(nb_balls,np.nan)
+
+    def reset(self):
+
+        self.balls_hits_racket.fill(np.nan)
+        self.balls_hits_floor.fill(np.nan)
 
 
 class _ContactListener(b2ContactListener):
 
     """Contact listener for Box2D that registers ball bouncing on the ground
-    as well as off the racket."""
+    as well as off the racket. Bodies are identified via their userData, 
+    see :py:mod:`roboball2d.physics.body_kinds`."""
 
-    def __init__(self, world, contacts,
-                 balls,robots):
+    def __init__(self, contacts):
         b2ContactListener.__init__(self)
-        # instance of b2_world
-        self.world = world
         self.contacts = contacts
-        # booleans indicating if the related
-        # contacts should be managed
-        self.balls = balls
-        self.robots = robots
         
     # updates the attribute world.contacts
-    # i.e. set world.contacts.ball_hits_racket to True
-    #      and world.contacts.ball_hists_floor to
+    # i.e. set world.contacts.balls_hits_racket[ball index] to 
+    #      the index of the robot
+    #      and world.contacts.balls_hits_floor[ball index] to
     #      ball.position.x (if contact)
     def BeginContact(self, contact):
 
-        fixtureA = contact.fixtureA
-        bodyA = fixtureA.body
-        fixtureB = contact.fixtureB
-        bodyB = fixtureB.body
-
-        bodies = [bodyA, bodyB]
-
-        if self.balls:
-            ground_contact = self.world.ground in bodies
-            if ground_contact:
-                for index,ball in enumerate(self.world.balls):
-                    if ball in bodies :
-                        self.contacts.balls_hits_floor[index]=ball.position[0]
-                        
-        if self.balls and self.robots:
-            for robot in self.world.robots:
-                racket = robot.racket
-                if racket in bodies:
-                    for index,ball in enumerate(self.world.balls):
-                        if ball in bodies :
-                            self.contacts.balls_hits_racket[index] = True
+        bodyA = contact.fixtureA.body
+        bodyB = contact.fixtureB.body
+        dataA = bodyA.userData
+        dataB = bodyB.userData
+
+        if dataA is None or dataB is None:
+            return
+
+        if dataA[0] == BALL:
+            ball,ball_index = bodyA,dataA[1]
+            other_kind,other_index = dataB
+        elif dataB[0] == BALL:
+            ball,ball_index = bodyB,dataB[1]
+            other_kind,other_index = dataA
+        else:
+            return
+
+        if other_kind == GROUND:
+            self.contacts.balls_hits_floor[ball_index] = ball.position[0]
+        elif other_kind == RACKET:
+            self.contacts.balls_hits_racket[ball_index] = other_index
                 
 
+class _EventsContactListener(_ContactListener):
+
+    """Contact listener which, in addition to the contacts registered by
+    _ContactListener, records all contacts between tagged bodies into 
+    an instance of :py:class:`roboball2d.physics.contact_events.ContactEvents`
+    (only used if contact events are requested, as the PostSolve callback
+    is called for each touching contact at each step)"""
+
+    def __init__(self, contacts, events):
+        _ContactListener.__init__(self, contacts)
+        self.events = events
+
+    def BeginContact(self, contact):
+
+        _ContactListener.BeginContact(self, contact)
+
+        dataA = contact.fixtureA.body.userData
+        dataB = contact.fixtureB.body.userData
+        if dataA is None or dataB is None:
+            return
+
+        nb_points = contact.manifold.pointCount
+        if nb_points:
+            points = contact.worldManifold.points
+            x = sum([points[i][0] for i in range(nb_points)])/nb_points
+            y = sum([points[i][1] for i in range(nb_points)])/nb_points
+        else:
+            x,y = np.nan,np.nan
+
+        self.events.add(dataA[0],dataA[1],
+                        dataB[0],dataB[1],
+                        x,y)
+
+    def PostSolve(self, contact, impulse):
+
+        dataA = contact.fixtureA.body.userData
+        dataB = contact.fixtureB.body.userData
+        if dataA is None or dataB is None:
+            return
+
+        self.events.set_impulse(dataA[0],dataA[1],
+                                dataB[0],dataB[1],
+                                sum(impulse.normalImpulses[:impulse.count]))
+
+
+# listeners used while profiling is enabled (see B2World.enable_profiling,
+# which swaps the class of the listener of the world): the unprofiled
+# listeners run no profiling code at all
+
+class _ProfiledContactListener(_ContactListener):
+
+    def BeginContact(self, contact):
+        start = time.perf_counter_ns()
+        _ContactListener.BeginContact(self,contact)
+        self.profiler.add_contact(time.perf_counter_ns()-start)
+
+
+class _ProfiledEventsContactListener(_EventsContactListener):
+
+    def BeginContact(self, contact):
+        start = time.perf_counter_ns()
+        _EventsContactListener.BeginContact(self,contact)
+        self.profiler.add_contact(time.perf_counter_ns()-start)
+
+    def PostSolve(self, contact, impulse):
+        start = time.perf_counter_ns()
+        _EventsContactListener.PostSolve(self,contact,impulse)
+        self.profiler.add(_CONTACTS,time.perf_counter_ns()-start)
+
+
+_PROFILED_LISTENERS = { _ContactListener : _ProfiledContactListener,
+                        _EventsContactListener : _ProfiledEventsContactListener }
+
+
 # resetting the ball = shooting a new ball with the ball gun
 def _reset_ball(ball,ball_gun):
 
@@ -80,7 +179,72 @@ def _reset_ball(ball,ball_gun):
     ball.position = np.array(position)
     ball.angle = angle
     ball.linearVelocity = np.array(lin_vel)
-    ball.angularVelocty = np.array(ang_vel)
+    ball.angularVelocity = float(ang_vel)
+        
+class B2WorldSnapshot:
+
+    """
+    Immutable capture of the full state of an instance of
+    :py:class:`roboball2d.physics.b2_world.B2World`, as returned by
+    :py:meth:`roboball2d.physics.b2_world.B2World.snapshot` and
+    used by :py:meth:`roboball2d.physics.b2_world.B2World.restore`.
+    Instances can be pickled.
+
+    Attributes
+    ----------
+
+    bodies: read only (nb bodies,7) array
+        for all balls, then for all robots rods and racket:
+        x, y, angle, vx, vy, angular velocity, awake (0 or 1)
+
+    joints: read only (nb joints,2) array
+        motor speed and max motor torque of the joints of all robots
+
+    time: `tuple`
+        simulation time, time passed at the previous step (or None),
+        applied time step (or None), number of substeps, accumulated
+        time not simulated yet
+
+    desired_torques: `tuple`
+        torques applied at the last step (one tuple per robot), or None
+
+    contacts: `tuple`
+        contacts registered since the last step (balls hits racket,
+        balls hits floor)
+
+    balls_play: `tuple`
+        for each ball, tuple (active, time spent below the speed threshold), 
+        see :py:class:`roboball2d.physics.play_area.PlayArea`
+
+    contact_events: 
+        copy of the contact events of the world
+        (see :py:class:`roboball2d.physics.contact_events.ContactEvents`), or None
+
+    random_state: 
+        state of the global numpy random generator (used by ball guns),
+        or None if not captured
+    """
+
+    __slots__=["bodies","joints","time",
+               "desired_torques","contacts","balls_play",
+               "contact_events","random_state"]
+
+    def __init__(self,
+                 bodies,joints,time,
+                 desired_torques,contacts,balls_play,
+                 contact_events,random_state):
+
+        bodies.flags.writeable = False
+        joints.flags.writeable = False
+        self.bodies = bodies
+        self.joints = joints
+        self.time = time
+        self.desired_torques = desired_torques
+        self.contacts = contacts
+        self.balls_play = balls_play
+        self.contact_events = contact_events
+        self.random_state = random_state
+
         
 class B2World:
 
@@ -90,9 +254,15 @@ class B2World:
     """
     
     __slots__=["_vel_iters","_pos_iters","_robot_configs",
-               "_ball_configs","_time_step","_t","_time_start",
-               "_previous_step_time","_applied_step","_contacts",
-               "_b2world","ground","balls","robots","_all_desired_torques"]
+               "_ball_configs","_time_step","_t",
+               "_previous_step_time","_applied_step","_nb_substeps","_contacts",
+               "_max_substeps","_accumulator",
+               "_b2world","ground","balls","robots","_all_desired_torques",
+               "_array_state","_lazy_state","_drags","_max_torques",
+               "_play_area","_balls_active","_balls_rest",
+               "_frozen_balls","_dragged_balls","_bulk",
+               "_torques_buffer","_applied_torques","_validated_out",
+               "_contact_events","_profiler","_active_profiler"]
     
     def __init__(self,
                  robot_configs,
@@ -101,7 +271,12 @@ class B2World:
                  steps_per_sec=100.0,
                  gravitational_acceleration=-8.0,
                  vel_iters = 10,
-                 pos_iters = 8):
+                 pos_iters = 8,
+                 world_state_mode = "objects",
+                 world_state_dtype = np.float64,
+                 nb_contact_events = 0,
+                 play_area = None,
+                 max_substeps = None):
 
         """
         Parameters
@@ -135,6 +310,49 @@ class B2World:
 
         pos_iters : `int`
             ???
+
+        world_state_mode : `str`
+            "objects": :py:meth:`step` and :py:meth:`reset` return a new instance
+            of :py:class:`roboball2d.physics.world_state.WorldState` at each call.
+            "arrays": they return an instance of 
+            :py:class:`roboball2d.physics.world_state.ArrayWorldState`, allocated once
+            and refilled in place at each call.
+            "lazy": they return an instance of
+            :py:class:`roboball2d.physics.lazy_world_state.LazyWorldState`, allocated
+            once and refreshed in place at each call, which values are read 
+            from Box2D only at first access (use its method materialize to get a
+            stable instance of :py:class:`roboball2d.physics.world_state.WorldState`).
+            "bulk": same as "arrays", but intended for worlds managing many balls:
+            the balls are read from Box2D once per step (and this state is reused
+            for computing the drag at the next step), the drag forces and the
+            play area checks (if any) are computed with numpy (Box2D is still
+            read, and the drag forces applied, one ball at a time), and contacts
+            are registered in preallocated arrays.
+            See :py:class:`roboball2d.physics.bulk_balls.BulkBalls`.
+
+        world_state_dtype :
+            numpy dtype of the buffer of the array world state 
+            (ignored if world_state_mode is "objects")
+
+        nb_contact_events : `int`
+            if above 0, all contacts starting during a step (with contact point,
+            normal impulse and time) are recorded in a buffer of this capacity,
+            available via the attribute contact_events of the world states.
+            See :py:class:`roboball2d.physics.contact_events.ContactEvents`
+
+        play_area :
+            if not None, instance of :py:class:`roboball2d.physics.play_area.PlayArea`
+            used to deactivate the balls which are out of play
+
+        max_substeps : `int`
+            if not None, the world accumulates the time passed via the argument
+            current_time of :py:meth:`step`, and consumes it in fixed time steps of
+            1.0 / steps_per_second (i.e. the number of Box2D steps performed at each
+            call to step depends on the elapsed time, the time step does not).
+            At most max_substeps Box2D steps are performed per call, the time
+            exceeding this (e.g. after a hiccup of the calling process) is dropped.
+            The fraction of a time step accumulated but not simulated yet is given 
+            by the attribute interpolation_alpha of the world states.
         """
         
         self._vel_iters = vel_iters
@@ -152,22 +370,42 @@ class B2World:
         # used otherwise)
         self._time_step = 1.0/steps_per_sec 
         self._t = 0
-        self._time_start = time.time()
         # to compute time steps if time stamp
         # passed as argument of the step function
         self._previous_step_time = None
         self._applied_step = None
+        # number of Box2D steps performed during the last
+        # call to step (each of duration self._applied_step)
+        self._nb_substeps = 1
+        # time passed via current_time but not simulated yet
+        # (if max_substeps is not None)
+        self._max_substeps = max_substeps
+        self._accumulator = 0.0
+        if max_substeps is not None and max_substeps < 1:
+            raise Exception("B2World: max_substeps should be at least 1 (",
+                            max_substeps,"passed)")
         
         # contact listener will update
         # this instance at each iteration
         # to indicate contact between ball
         # and racket/floor
-        self._contacts = _Contacts(len(self._ball_configs))
+        if world_state_mode == "bulk":
+            self._contacts = _ArrayContacts(len(self._ball_configs))
+        else:
+            self._contacts = _Contacts(len(self._ball_configs))
+        if nb_contact_events > 0:
+            self._contact_events = ContactEvents(nb_contact_events)
+            contact_listener = _EventsContactListener(self._contacts,
+                                                      self._contact_events)
+        else:
+            self._contact_events = None
+            contact_listener = _ContactListener(self._contacts)
         self._b2world = b2World(
             gravity = (0.,gravitational_acceleration),
-            contactListener = _ContactListener(self,self._contacts,
-                                               len(self._ball_configs),
-                                               len(self._robot_configs)))
+            contactListener = contact_listener)
+        self._profiler = None
+        # profiler in use (None if profiling is disabled)
+        self._active_profiler = None
 
         #####################
         # adding the ground #
@@ -175,13 +413,14 @@ class B2World:
         
         self.ground = self._b2world.CreateStaticBody(
             position = (visible_area_width/2., -10.), 
-            shapes = b2PolygonShape(box = (2.*visible_area_width, 10.)),)
+            shapes = b2PolygonShape(box = (2.*visible_area_width, 10.)),
+            userData = (GROUND,0))
 
         ####################
         # adding the balls #
         ####################
 
-        def _create_ball(ball_config):
+        def _create_ball(index,ball_config):
             ball_fixture = b2FixtureDef(
                 shape = b2CircleShape(pos = (0., 0.), radius = ball_config.radius),
                 density = ball_config.density, 
@@ -190,39 +429,114 @@ class B2World:
             ball_fixture.filter.groupIndex = -1
             ball = self._b2world.CreateDynamicBody(
                 position = (visible_area_width, 4),
-                fixtures = ball_fixture
+                fixtures = ball_fixture,
+                userData = (BALL,index)
             )
             # turn on continuous collision detection for ball as it might otherwise
             # tunnel through racket if relative velocity is high
             ball.bullet = True
             return ball
             
-        self.balls = list( map( lambda config: _create_ball(config),
-                                self._ball_configs ) )
+        self.balls = [ _create_ball(index,config)
+                       for index,config in enumerate(self._ball_configs) ]
             
         #####################
         # adding the robots #
         #####################
 
         self.robots = []
-        for robot_config in self._robot_configs:
+        for index,robot_config in enumerate(self._robot_configs):
             b2robot = robot_config.create_b2_robot(self._b2world, self.ground)
+            # tagging the bodies of the robot, for the contact listener
+            # (B2Robot implementations are expected to provide the racket
+            # body as attribute, and may provide the rods)
+            b2robot.racket.userData = (RACKET,index)
+            for rod in getattr(b2robot,"rods",[]):
+                rod.userData = (ROD,index)
             self.robots.append(b2robot)
+
+        # drag coefficient of each ball
+        self._drags = [ball_config.ball_drag
+                       for ball_config in self._ball_configs]
+
+        ######################
+        # balls out of play #
+        ######################
+
+        self._play_area = play_area
+        self._balls_active = [True]*len(self.balls)
+        # time (in seconds) each ball has been slower
+        # than play_area.min_speed
+        self._balls_rest = np.zeros(len(self.balls))
+        # (x,y,angle) of deactivated balls, None for active balls
+        self._frozen_balls = [None]*len(self.balls)
+        # (ball,drag) of active balls
+        self._dragged_balls = []
+        if world_state_mode == "bulk":
+            self._bulk = BulkBalls(self.balls,self._drags)
+        else:
+            self._bulk = None
+        self._update_dragged_balls()
+
+        #########################################
+        # preallocated arrays used by step_into #
+        #########################################
+
+        nb_robots = len(self.robots)
+        self._max_torques = np.array([robot_config.max_torques
+                                      for robot_config in self._robot_configs],
+                                     dtype=float).reshape(nb_robots,3)
+        self._torques_buffer = np.zeros((nb_robots,3))
+        self._applied_torques = np.zeros((nb_robots,3))
+        # output world state last validated by step_into
+        self._validated_out = None
+        
+        ############################
+        # preallocated world state #
+        ############################
+
+        self._array_state = None
+        self._lazy_state = None
+        if world_state_mode in ("arrays","bulk"):
+            self._array_state = ArrayWorldState(self._robot_configs,
+                                                self._ball_configs,
+                                                dtype=world_state_dtype)
+        elif world_state_mode == "lazy":
+            self._lazy_state = LazyWorldState(self._robot_configs,
+                                              self._ball_configs,
+                                              self.robots,
+                                              self.balls)
+        elif world_state_mode != "objects":
+            raise Exception("B2World: unknown world state mode",world_state_mode,
+                            "(expected 'objects', 'arrays', 'lazy' or 'bulk')")
             
     # uses all the attributes of this call to create an instance
     # of WorldState, which is a class independant of Box2D
     # gathering all what is known about the state of the world
     # at the current iteration
     def _get_world_state(self):
+
+        if self._array_state is not None:
+            return self._fill_array_state()
+
+        if self._lazy_state is not None:
+            return self._refresh_lazy_state()
                 
         ws = WorldState(self._robot_configs,
                         self._ball_configs)
 
         ws.t = self._t
-        ws.applied_time_step = self._applied_step
+        if self._applied_step is not None:
+            ws.applied_time_step = self._applied_step*self._nb_substeps
+        ws.interpolation_alpha = self._accumulator/self._time_step
         
-        # saving infos about balls
-        for ws_ball,ball in zip(ws.balls,self.balls):
+        # saving infos about balls (deactivated balls
+        # are not read from Box2D, and have zero velocities)
+        for ws_ball,ball,frozen in zip(ws.balls,self.balls,self._frozen_balls):
+            if frozen is not None:
+                ws_ball.position = [frozen[0],frozen[1]]
+                ws_ball.angle = frozen[2]
+                continue
             ws_ball.position = [ball.position.x,
                                 ball.position.y]
             ws_ball.angle = ball.angle
@@ -245,6 +559,8 @@ class B2World:
             ws.balls_hits_floor[index] = self._contacts.balls_hits_floor[index]
             ws.balls_hits_racket[index] = self._contacts.balls_hits_racket[index]
 
+        ws.balls_active[:] = self._balls_active
+
         if ws.robots:
             ws.robot = ws.robots[0]
         if ws.balls:
@@ -254,9 +570,216 @@ class B2World:
         if ws.balls_hits_racket:
             ws.ball_hits_racket = ws.balls_hits_racket[0]
 
+        if self._contact_events is not None:
+            ws.contact_events = self._contact_events.copy()
+
         return ws
 
 
+    # same as _get_world_state, but refilling in place
+    # an instance of ArrayWorldState (self._array_state if None)
+    def _fill_array_state(self, state=None, all_desired_torques=None):
+
+        if state is None:
+            state = self._array_state
+
+        state._time[0] = self._t
+        if self._applied_step is None:
+            state._time[1] = np.nan
+        else:
+            state._time[1] = self._applied_step*self._nb_substeps
+        state._time[2] = self._accumulator/self._time_step
+
+        if self._bulk is not None:
+            if not self._bulk.valid:
+                self._bulk.read()
+            self._bulk.write(state.balls,self._contacts)
+        else:
+            self._fill_balls_arrays(state.balls)
+
+        if all_desired_torques is None:
+            if not hasattr(self,"_all_desired_torques") or not self._all_desired_torques:
+                self._all_desired_torques = [[None]*3]*len(self.robots)
+            all_desired_torques = self._all_desired_torques
+
+        for index,(robot,desired_torques) in enumerate(zip(self.robots,
+                                                           all_desired_torques)):
+            robot.write_state(state.robots,index,desired_torques,self._applied_step)
+
+        state.contact_events = self._contact_events
+
+        return state
+        
+    # writes the state and contacts of the balls in the
+    # arrays of an ArrayWorldState (see _fill_array_state)
+    def _fill_balls_arrays(self, balls):
+
+        contacts = self._contacts
+        for index,ball in enumerate(self.balls):
+            frozen = self._frozen_balls[index]
+            if frozen is None:
+                position = ball.position
+                velocity = ball.linearVelocity
+                balls.position[index,0] = position.x
+                balls.position[index,1] = position.y
+                balls.angle[index] = ball.angle
+                balls.linear_velocity[index,0] = velocity.x
+                balls.linear_velocity[index,1] = velocity.y
+                balls.angular_velocity[index] = ball.angularVelocity
+                balls.active[index] = 1.0
+            else:
+                # deactivated ball, not read from Box2D
+                balls.position[index,0] = frozen[0]
+                balls.position[index,1] = frozen[1]
+                balls.angle[index] = frozen[2]
+                balls.linear_velocity[index,0] = 0.0
+                balls.linear_velocity[index,1] = 0.0
+                balls.angular_velocity[index] = 0.0
+                balls.active[index] = 0.0
+            hits_floor = contacts.balls_hits_floor[index]
+            if hits_floor is None:
+                balls.hits_floor[index] = np.nan
+            else:
+                balls.hits_floor[index] = hits_floor
+            hits_racket = contacts.balls_hits_racket[index]
+            if hits_racket is None:
+                balls.hits_racket[index] = np.nan
+            else:
+                balls.hits_racket[index] = hits_racket
+
+    # same as _get_world_state, but only copying time and contacts
+    # in self._lazy_state (balls and robots values being read from
+    # Box2D at first access)
+    def _refresh_lazy_state(self):
+
+        if not hasattr(self,"_all_desired_torques") or not self._all_desired_torques:
+            self._all_desired_torques = [[None]*3]*len(self.robots)
+
+        if self._applied_step is None:
+            applied_time_step = None
+        else:
+            applied_time_step = self._applied_step*self._nb_substeps
+
+        self._lazy_state._refresh(self._t,
+                                  applied_time_step,
+                                  self._accumulator/self._time_step,
+                                  self._all_desired_torques,
+                                  self._applied_step,
+                                  self._contacts.balls_hits_floor,
+                                  self._contacts.balls_hits_racket,
+                                  self._balls_active,
+                                  self._contact_events)
+        return self._lazy_state
+
+    def _update_dragged_balls(self):
+        self._dragged_balls[:] = [ (ball,drag) for ball,drag,active
+                                   in zip(self.balls,self._drags,self._balls_active)
+                                   if active ]
+        if self._bulk is not None:
+            self._bulk.set_active(self._balls_active,self._frozen_balls)
+
+    # the ball is set inactive in Box2D (not simulated, no contacts),
+    # with zero velocities, and its state is not read anymore
+    def _deactivate_ball(self, index):
+        ball = self.balls[index]
+        ball.linearVelocity = (0.,0.)
+        ball.angularVelocity = 0.
+        ball.active = False
+        position = ball.position
+        self._frozen_balls[index] = (position.x,position.y,ball.angle)
+        self._balls_active[index] = False
+
+    def _activate_ball(self, index):
+        self.balls[index].active = True
+        self._frozen_balls[index] = None
+        self._balls_active[index] = True
+        self._balls_rest[index] = 0.0
+
+    # deactivates the balls which are out of play according to
+    # self._play_area. elapsed: duration of the last step
+    def _apply_play_area(self, elapsed):
+
+        area = self._play_area
+
+        if self._bulk is not None:
+            if not self._bulk.valid:
+                self._bulk.read()
+            indexes = self._bulk.out_of_play(area,self._balls_rest,elapsed)
+            for index in indexes:
+                self._deactivate_ball(index)
+            if indexes:
+                self._update_dragged_balls()
+            return
+
+        min_speed2 = area.min_speed*area.min_speed
+        changed = False
+
+        for index,ball in enumerate(self.balls):
+            if not self._balls_active[index]:
+                continue
+            position = ball.position
+            x = position.x
+            y = position.y
+            out = ( x < area.x_min or x > area.x_max or y < area.y_min or
+                    (area.y_max is not None and y > area.y_max) )
+            if not out:
+                velocity = ball.linearVelocity
+                vx = velocity.x
+                vy = velocity.y
+                if vx*vx+vy*vy < min_speed2:
+                    self._balls_rest[index] += elapsed
+                    out = self._balls_rest[index] >= area.rest_duration
+                else:
+                    self._balls_rest[index] = 0.0
+            if out:
+                self._deactivate_ball(index)
+                changed = True
+
+        if changed:
+            self._update_dragged_balls()
+
+    # applies the aerodynamic drag on the balls and
+    # performs one Box2D step of duration self._applied_step.
+    # Torques are expected to have been applied already.
+    # t: simulation time at the end of the Box2D step
+    # (self._t if None), used to time stamp contact events
+    def _integrate(self, t=None):
+
+        # (profiling: one check per phase, see enable_profiling)
+        profiler = self._active_profiler
+
+        if self._contact_events is not None:
+            self._contact_events.time = self._t if t is None else t
+
+        if profiler is not None:
+            start = time.perf_counter_ns()
+
+        # aerodynamic drag on the balls
+        # (-drag*|v|*v, applied on the center of the ball)
+        # (deactivated balls skipped)
+        if self._bulk is not None:
+            self._bulk.apply_drag()
+        else:
+            for ball,drag in self._dragged_balls:
+                velocity = ball.linearVelocity
+                vx = velocity.x
+                vy = velocity.y
+                f = -drag*math.sqrt(vx*vx+vy*vy)
+                ball.ApplyForceToCenter((f*vx,f*vy), True)
+
+        if profiler is not None:
+            end = time.perf_counter_ns()
+            profiler.add(_DRAG,end-start)
+            start = end
+
+        self._b2world.Step(self._applied_step,
+                           self._vel_iters,
+                           self._pos_iters)
+        self._b2world.ClearForces()
+
+        if profiler is not None:
+            profiler.add(_BOX2D,time.perf_counter_ns()-start)
+
     def reset(self,
               init_robot_state=None,
               ball_gun=None,
@@ -294,6 +817,7 @@ class B2World:
         if reset_time:
             self._t = 0
             self._previous_step_time = None
+            self._accumulator = 0.0
             
         ball_guns = arraytize(ball_gun)
         init_robot_states = arraytize(init_robot_state)
@@ -304,10 +828,21 @@ class B2World:
                             len(ball_guns),"ball guns used for reset.")
         
         # resetting the balls using the ball gun
+        # (deactivated balls are reactivated)
         if ball_guns:
-            for ball,ball_gun in zip(self.balls,ball_guns):
+            reactivated = False
+            for index,(ball,ball_gun) in enumerate(zip(self.balls,ball_guns)):
                 if ball_gun:
+                    if not self._balls_active[index]:
+                        self._activate_ball(index)
+                        reactivated = True
+                    else:
+                        self._balls_rest[index] = 0.0
                     _reset_ball(ball,ball_gun)
+            if reactivated:
+                self._update_dragged_balls()
+            if self._bulk is not None:
+                self._bulk.invalidate()
 
         # resetting the robots using the
         # init_robot function
@@ -315,6 +850,9 @@ class B2World:
             for robot, robot_state in zip(self.robots, init_robot_states):
                 robot.set_state(robot_state)
 
+        if self._contact_events is not None:
+            self._contact_events.reset()
+
         # return updated world state
         world_state = self._get_world_state()
         return world_state
@@ -327,7 +865,8 @@ class B2World:
              relative_torques=False,
              current_time=None,
              mirroring_robot_states={},
-             mirroring_ball_states={}):
+             mirroring_ball_states={},
+             n_substeps=1):
 
         """
         Performs a simulation step. 
@@ -348,7 +887,9 @@ class B2World:
             if provided, the time step will not be based on the step per second 
             (:py:class:`roboball2d.physics.b2_world.B2World` 
             but based on the current_time argument passed during the previous call 
-            to step
+            to step. If the world has been constructed with max_substeps, the 
+            elapsed time is instead consumed in fixed time steps (and n_substeps
+            is ignored), see :py:class:`roboball2d.physics.b2_world.B2World`.
 
         mirroring_robot_states: `dict`
             dictionary {index:robot_state}, with robot state being an instance
@@ -362,6 +903,13 @@ class B2World:
             specified indexes the position, angle, linear_velocity and angular_velocity
             that should be used to overwrite the current state of the ball.
 
+        n_substeps: `int`
+            number of Box2D steps performed during this step. The torques
+            are applied (and the drag computed) at each of them, and the
+            time step (see steps_per_second and current_time) is applied at each of 
+            them (if current_time is passed, the elapsed time is split between 
+            the substeps). Contacts occurring during any of the substeps are 
+            reported in the returned world state, which is created only once.
 
         Returns
         -------
@@ -371,6 +919,11 @@ class B2World:
         the step).
 
         """
+
+        # (profiling: one check per phase, see enable_profiling)
+        profiler = self._active_profiler
+        if profiler is not None:
+            step_start = start = time.perf_counter_ns()
         
         # the code in this function will use
         # torques, angles and angular_velocities
@@ -395,15 +948,33 @@ class B2World:
         # to makes sure we have the correct shape
         self._all_desired_torques = copy.deepcopy(all_torques)
 
+        # if relative torques, the user did not enter torques directly,
+        # but a ratio to the max torque between -1 and 1 
+        # converting here this "relative" torque to the value to apply
+        if all_torques and relative_torques:
+            for index,robot_config in enumerate(self._robot_configs):
+                torques = all_torques[index]
+                all_torques[index]=[ t*max_t for t,max_t
+                                     in zip(torques,
+                                            robot_config.max_torques) ]
+
+        if profiler is not None:
+            profiler.add(_TORQUES,time.perf_counter_ns()-start)
+
         # overwritting states of balls if asked to do so
         if mirroring_ball_states:
             for index,item in mirroring_ball_states.items():
+                if not self._balls_active[index]:
+                    self._activate_ball(index)
+                    self._update_dragged_balls()
                 ball = self.balls[index]
                 ball.position = np.array(item.position)
                 ball.angle = item.angle
                 ball.linearVelocity = np.array(item.linear_velocity)
                 ball.angularVelocity = item.angular_velocity
                 ball.bullet = True
+            if self._bulk is not None:
+                self._bulk.invalidate()
                 
         # mirroring info can be used to force the robot(s) to move
         # according to data passed to the step function rather than
@@ -417,48 +988,59 @@ class B2World:
             if not isinstance(mirroring_robot_states,dict):
                 mirroring_robot_states = {0:mirroring_robot_states}
 
-        # if relative torques, the user did not enter torques directly,
-        # but a ratio to the max torque between -1 and 1 
-        # converting here this "relative" torque to the value to apply
-        if all_torques and relative_torques:
-            for index,robot_config in enumerate(self._robot_configs):
-                torques = all_torques[index]
-                all_torques[index]=[ t*max_t for t,max_t
-                                     in zip(torques,
-                                            robot_config.max_torques) ]
-                
+        if n_substeps < 1:
+            raise Exception("B2World, step: n_substeps should be at least 1 (",
+                            n_substeps,"passed)")
+
         # increasing time
         # user did not provide a time stamp,
         # using the predefine time step
         if current_time is None:
-            self._t += self._time_step
+            self._t += self._time_step*n_substeps
+            self._applied_step = self._time_step
+        # user did provide a time stamp, and the world
+        # accumulates time: number of fixed time steps
+        # depending on the elapsed time
+        elif self._max_substeps is not None:
+            n_substeps = self._consume_time(current_time)
+            self._t += self._time_step*n_substeps
             self._applied_step = self._time_step
         # user did provide a time stamp,
         # computing the time step
         else :
             if self._previous_step_time is None:
                 self._previous_step_time = current_time
-            self._applied_step = current_time - self._previous_step_time
-            self._t += current_time - self._time_start
+            self._applied_step = (current_time - self._previous_step_time)/n_substeps
+            self._t += current_time - self._previous_step_time
             self._previous_step_time = current_time
+        self._nb_substeps = n_substeps
 
         # updating the robots
+        if profiler is not None:
+            start = time.perf_counter_ns()
         if all_torques:
             for index1,(generalized_torques,robot) in enumerate(zip(all_torques, self.robots)):
                 applied_torques = robot.apply_generalized_torques(generalized_torques)
                 self._all_desired_torques[index1] = applied_torques
+        if profiler is not None:
+            profiler.add(_APPLY_TORQUES,time.perf_counter_ns()-start)
 
+        # contact events of the previous step are discarded
+        if self._contact_events is not None:
+            self._contact_events.reset()
                 
-        # aerodynamic drag on the balls
-        for ball,ball_config in zip(self.balls,self._ball_configs):
-            ball.ApplyForce(-ball_config.ball_drag*linalg.norm(
-                ball.linearVelocity)*ball.linearVelocity, 
-                            ball.position, wake = True)
-
-        self._b2world.Step(self._applied_step,
-                           self._vel_iters,
-                           self._pos_iters)
-        self._b2world.ClearForces()
+        # drag and Box2D update(s). Joint motors keep the
+        # torques set above over the substeps, and contacts
+        # are accumulated until the world state is created
+        for substep in range(n_substeps):
+            self._integrate(self._t - (n_substeps-1-substep)*self._applied_step)
+
+        if self._play_area is not None:
+            if profiler is not None:
+                start = time.perf_counter_ns()
+            self._apply_play_area(self._applied_step*n_substeps)
+            if profiler is not None:
+                profiler.add(_PLAY_AREA,time.perf_counter_ns()-start)
 
         # check if robot dynamics are to be overwritten
         # by mirroring information (i.e. mirroring another robot
@@ -472,12 +1054,516 @@ class B2World:
                 self.robots[index].set_state(robot_state)
 
         # updating the world state
+        if profiler is not None:
+            start = time.perf_counter_ns()
         world_state = self._get_world_state()
+        if profiler is not None:
+            profiler.add(_WORLD_STATE,time.perf_counter_ns()-start)
 
         # reseting the contacts
         self._contacts.reset()
+
+        if profiler is not None:
+            profiler.end_step(time.perf_counter_ns()-step_start)
         
         return world_state
 
-    
+    # adds the time elapsed since the previous call to the
+    # accumulator, and returns the number of time steps to
+    # perform (at most self._max_substeps)
+    def _consume_time(self, current_time):
+
+        if self._previous_step_time is None:
+            self._previous_step_time = current_time
+        self._accumulator += current_time - self._previous_step_time
+        self._previous_step_time = current_time
+
+        # (with a tolerance for rounding errors on time stamps, 
+        # e.g. 0.05-0.025 < 0.025)
+        tolerance = 1e-9
+        accumulator = self._accumulator + tolerance
+        nb_steps = int(accumulator // self._time_step)
+        if nb_steps > self._max_substeps:
+            # time which can not be simulated within the
+            # max number of substeps is dropped
+            nb_steps = self._max_substeps
+            accumulator = accumulator % self._time_step
+        else:
+            accumulator -= nb_steps*self._time_step
+        self._accumulator = max(0.0,accumulator-tolerance)
+        return nb_steps
+
+    def create_array_state(self, dtype=np.float64):
+
+        """
+        Returns a new instance of :py:class:`roboball2d.physics.world_state.ArrayWorldState`
+        suitable for this world, e.g. to be used as output of :py:meth:`step_into`.
+        """
+
+        return ArrayWorldState(self._robot_configs,
+                               self._ball_configs,
+                               dtype=dtype)
+
+    def fill_array_state(self, out):
+
+        """
+        Writes the current state of the world into out, an instance of
+        :py:class:`roboball2d.physics.world_state.ArrayWorldState`
+        (see :py:meth:`create_array_state`), and returns it, e.g. to
+        observe the world after :py:meth:`reset`. Desired torques are those
+        passed to the last call to :py:meth:`step` (nan if none), and
+        contacts those detected since the last step.
+        """
+
+        if out is not self._validated_out:
+            self._validate_out(out,"fill_array_state")
+        return self._fill_array_state(out)
+
+    def _validate_out(self, out, method="step_into"):
+
+        if not isinstance(out,ArrayWorldState):
+            raise Exception("B2World, "+method+": out should be an instance of ArrayWorldState,",
+                            "see B2World.create_array_state")
+        if ( len(out.balls) != len(self.balls) or
+             len(out.robots) != len(self.robots) ):
+            raise Exception("B2World, "+method+": out has",len(out.balls),"balls and",
+                            len(out.robots),"robots, but the world has",
+                            len(self.balls),"balls and",len(self.robots),"robots")
+        self._validated_out = out
+
+    def step_into(self,
+                  torques,
+                  out,
+                  relative_torques=False,
+                  n_substeps=1):
+
+        """
+        Performs a simulation step, as :py:meth:`step`, but writing the
+        resulting state in place in `out`. Contrary to :py:meth:`step`, 
+        no world state, item or list is created (and torques are not copied), 
+        making this method suitable for hot loops.
+        The time step is always 1.0 / steps_per_sec. 
         
+        Parameters
+        ----------
+
+        torques : 
+            numpy array of shape (R,3), R being the number of robots 
+            (None if no robot is managed)
+
+        out:
+            instance of :py:class:`roboball2d.physics.world_state.ArrayWorldState`,
+            e.g. created via :py:meth:`create_array_state`. It is validated the
+            first time it is used.
+
+        relative torques : `Bool`
+            if true, the torques are in [-1,1] and are mapped
+            to (-max torque, +max torque)
+
+        n_substeps : `int`
+            number of Box2D steps, see :py:meth:`step`
+
+        Returns
+        -------
+
+        out
+
+        """
+
+        # (profiling: one check per phase, see enable_profiling)
+        profiler = self._active_profiler
+        if profiler is not None:
+            step_start = start = time.perf_counter_ns()
+
+        if out is not self._validated_out:
+            self._validate_out(out)
+
+        if n_substeps < 1:
+            raise Exception("B2World, step_into: n_substeps should be at least 1 (",
+                            n_substeps,"passed)")
+
+        if self.robots:
+            if torques.shape != self._torques_buffer.shape:
+                raise Exception("B2World, step_into: torques of shape",torques.shape,
+                                "but",self._torques_buffer.shape,"expected")
+            if relative_torques:
+                np.multiply(torques,self._max_torques,out=self._torques_buffer)
+                torques = self._torques_buffer
+
+        if profiler is not None:
+            end = time.perf_counter_ns()
+            profiler.add(_TORQUES,end-start)
+            start = end
+
+        if self.robots:
+            for index,robot in enumerate(self.robots):
+                robot.apply_generalized_torques_into(torques[index],
+                                                     self._applied_torques[index])
+
+        if profiler is not None:
+            profiler.add(_APPLY_TORQUES,time.perf_counter_ns()-start)
+
+        self._t += self._time_step*n_substeps
+        self._applied_step = self._time_step
+        self._nb_substeps = n_substeps
+
+        if self._contact_events is not None:
+            self._contact_events.reset()
+
+        for substep in range(n_substeps):
+            self._integrate(self._t - (n_substeps-1-substep)*self._time_step)
+
+        if self._play_area is not None:
+            if profiler is not None:
+                start = time.perf_counter_ns()
+            self._apply_play_area(self._time_step*n_substeps)
+            if profiler is not None:
+                profiler.add(_PLAY_AREA,time.perf_counter_ns()-start)
+
+        if profiler is not None:
+            start = time.perf_counter_ns()
+        self._fill_array_state(out,self._applied_torques)
+        if profiler is not None:
+            profiler.add(_WORLD_STATE,time.perf_counter_ns()-start)
+
+        self._contacts.reset()
+
+        if profiler is not None:
+            profiler.end_step(time.perf_counter_ns()-step_start)
+
+        return out
+
+    def simulate(self,
+                 torque_sequence,
+                 record=None,
+                 relative_torques=False,
+                 n_substeps=1,
+                 out=None):
+
+        """
+        Performs T simulation steps (as :py:meth:`step_into`), applying
+        a sequence of torques, and records the successive states in
+        preallocated arrays. No world state is created during the simulation,
+        making this method suitable for evaluating many open loop torque
+        sequences (e.g. restoring a snapshot, see :py:meth:`snapshot`,
+        before each evaluation, and passing the returned record as `out`
+        so that arrays are reused).
+
+        Parameters
+        ----------
+
+        torque_sequence :
+            array of shape (T,R,3), R being the number of robots
+            (shape (T,3) also accepted if the world manages one robot)
+
+        record :
+            iterable of the names of the channels to record (see
+            :py:class:`roboball2d.physics.simulation_record.SimulationRecord`),
+            all channels if None
+
+        relative torques : `Bool`
+            if true, the torques are in [-1,1] and are mapped
+            to (-max torque, +max torque)
+
+        n_substeps : `int`
+            number of Box2D steps per step, see :py:meth:`step`
+
+        out :
+            instance of :py:class:`roboball2d.physics.simulation_record.SimulationRecord`
+            returned by a previous call (same horizon and channels), refilled
+            in place. If None, a new instance is returned.
+
+        Returns
+        -------
+
+        instance of :py:class:`roboball2d.physics.simulation_record.SimulationRecord`,
+        which also gathers the contact events of all steps (if the world has been
+        constructed with nb_contact_events > 0)
+        """
+
+        torque_sequence = np.asarray(torque_sequence,dtype=float)
+        nb_robots = len(self.robots)
+        if torque_sequence.ndim == 2 and nb_robots == 1:
+            torque_sequence = torque_sequence.reshape((-1,1,3))
+        if torque_sequence.ndim != 3 or torque_sequence.shape[1:] != (nb_robots,3):
+            raise Exception("B2World, simulate: torque sequence of shape",
+                            torque_sequence.shape,"but (T,",nb_robots,",3) expected")
+        nb_steps = torque_sequence.shape[0]
+
+        if relative_torques:
+            torque_sequence = torque_sequence*self._max_torques
+
+        if out is None:
+            capacity = self._contact_events.capacity if self._contact_events else 0
+            out = SimulationRecord(self._robot_configs,self._ball_configs,
+                                   nb_steps,record,capacity)
+        elif out.nb_steps != nb_steps:
+            raise Exception("B2World, simulate: out records",out.nb_steps,
+                            "steps, but torque sequence of",nb_steps,"steps")
+        elif record is not None and tuple(record) != out.channels:
+            raise Exception("B2World, simulate: out records the channels",out.channels,
+                            "but",tuple(record),"requested")
+
+        state = out._state
+        copies = out._copies
+        events = self._contact_events
+        recorded_events = out.contact_events if events is not None else None
+        if recorded_events is not None:
+            recorded_events.reset()
+
+        step_into = self.step_into
+        for step in range(nb_steps):
+            step_into(torque_sequence[step],state,False,n_substeps)
+            for array,values in copies:
+                array[step] = values
+            if recorded_events is not None:
+                recorded_events.extend(events)
+
+        return out
+
+    # Box2D bodies and joints of the world, in the order
+    # used by snapshots
+    def _snapshot_items(self):
+
+        bodies = list(self.balls)
+        joints = []
+        for robot in self.robots:
+            bodies.extend(robot.rods)
+            bodies.append(robot.racket)
+            joints.extend(robot.joints)
+        return bodies,joints
+
+    def snapshot(self, random_state=True):
+
+        """
+        Captures the full state of the simulation: position, angle and 
+        velocities of all bodies, joint motor settings, time, desired torques, 
+        contacts registered since the last step and (optionally) the state 
+        of the global numpy random generator used by the ball guns.
+
+        Parameters
+        ----------
+
+        random_state : `Bool`
+            if True, the state of the global numpy random generator is
+            captured (and will be set back by :py:meth:`restore`)
+
+        Returns
+        -------
+
+        An instance of :py:class:`roboball2d.physics.b2_world.B2WorldSnapshot`
+
+        """
+
+        bodies,joints = self._snapshot_items()
+
+        bodies_values = np.empty((len(bodies),7))
+        for index,body in enumerate(bodies):
+            position = body.position
+            velocity = body.linearVelocity
+            bodies_values[index,0] = position.x
+            bodies_values[index,1] = position.y
+            bodies_values[index,2] = body.angle
+            bodies_values[index,3] = velocity.x
+            bodies_values[index,4] = velocity.y
+            bodies_values[index,5] = body.angularVelocity
+            bodies_values[index,6] = body.awake
+
+        joints_values = np.empty((len(joints),2))
+        for index,joint in enumerate(joints):
+            joints_values[index,0] = joint.motorSpeed
+            joints_values[index,1] = joint.GetMaxMotorTorque()
+
+        desired_torques = getattr(self,"_all_desired_torques",None)
+        if desired_torques:
+            desired_torques = tuple([tuple(torques) for torques in desired_torques])
+        else:
+            desired_torques = None
+
+        contact_events = None
+        if self._contact_events is not None:
+            contact_events = self._contact_events.copy()
+
+        return B2WorldSnapshot(bodies_values,
+                               joints_values,
+                               (self._t,self._previous_step_time,
+                                self._applied_step,self._nb_substeps,
+                                self._accumulator),
+                               desired_torques,
+                               (tuple(self._contacts.balls_hits_racket),
+                                tuple(self._contacts.balls_hits_floor)),
+                               tuple(zip(self._balls_active,self._balls_rest)),
+                               contact_events,
+                               np.random.get_state() if random_state else None)
+
+    def restore(self, snapshot):
+
+        """
+        Sets the simulation back to the state captured by :py:meth:`snapshot`.
+        Note that Box2D internal contact data (used for warm starting 
+        the solver) are not part of the snapshot, so the dynamics after restore
+        may very slightly differ from the dynamics after the snapshot was taken.
+
+        Parameters
+        ----------
+
+        snapshot : 
+            an instance of :py:class:`roboball2d.physics.b2_world.B2WorldSnapshot`,
+            as returned by :py:meth:`snapshot` (of this world or of a world
+            constructed with the same configurations)
+
+        """
+
+        bodies,joints = self._snapshot_items()
+
+        if ( snapshot.bodies.shape[0] != len(bodies) or
+             snapshot.joints.shape[0] != len(joints) ):
+            raise Exception("B2World, restore: snapshot of a world with",
+                            snapshot.bodies.shape[0],"bodies and",
+                            snapshot.joints.shape[0],"joints, but this world has",
+                            len(bodies),"bodies and",len(joints),"joints")
+
+        for body,(x,y,angle,vx,vy,w,awake) in zip(bodies,snapshot.bodies.tolist()):
+            body.transform = ((x,y),angle)
+            body.linearVelocity = (vx,vy)
+            body.angularVelocity = w
+            body.awake = bool(awake)
+
+        for joint,(speed,max_torque) in zip(joints,snapshot.joints.tolist()):
+            joint.motorSpeed = speed
+            joint.maxMotorTorque = max_torque
+
+        (self._t,self._previous_step_time,
+         self._applied_step,self._nb_substeps,
+         self._accumulator) = snapshot.time
+
+        for index,(active,rest) in enumerate(snapshot.balls_play):
+            if active and not self._balls_active[index]:
+                self._activate_ball(index)
+            elif not active:
+                self._deactivate_ball(index)
+            self._balls_rest[index] = rest
+        self._update_dragged_balls()
+        if self._bulk is not None:
+            self._bulk.invalidate()
+
+        if snapshot.desired_torques is None:
+            self._all_desired_torques = None
+        else:
+            self._all_desired_torques = [list(torques) for torques
+                                         in snapshot.desired_torques]
+
+        balls_hits_racket,balls_hits_floor = snapshot.contacts
+        self._contacts.balls_hits_racket[:] = balls_hits_racket
+        self._contacts.balls_hits_floor[:] = balls_hits_floor
+
+        if self._contact_events is not None:
+            self._contact_events.reset()
+            if snapshot.contact_events is not None:
+                events = snapshot.contact_events
+                for index in range(events.nb_events):
+                    self._contact_events.time = events.times[index]
+                    self._contact_events.add(events.kinds[index,0],events.indexes[index,0],
+                                             events.kinds[index,1],events.indexes[index,1],
+                                             events.points[index,0],events.points[index,1])
+                    self._contact_events.normal_impulses[index] = events.normal_impulses[index]
+
+        if snapshot.random_state is not None:
+            np.random.set_state(snapshot.random_state)
+
+    def enable_profiling(self, profiler=None):
+
+        """
+        Starts measuring the duration of each phase of the steps
+        (torques conversion, application of the torques, drag, Box2D step,
+        contact listener, play area, world state), and the number of
+        contacts per step, of both :py:meth:`step` and :py:meth:`step_into`.
+        See :py:meth:`profile_report`.
+
+        When profiling is disabled (the default), the cost of profiling
+        is a check per phase (the contact listener is swapped with a
+        profiled subclass only while profiling is enabled).
+
+        Parameters
+        ----------
+
+        profiler :
+            instance of :py:class:`roboball2d.physics.step_profiler.StepProfiler`
+            in which measures are registered. If None, the current profiler is 
+            kept (a new one is created at first call).
+
+        Returns
+        -------
+
+        the profiler in use
+        """
+
+        if profiler is not None:
+            self._profiler = profiler
+        elif self._profiler is None:
+            self._profiler = StepProfiler()
+
+        listener = self._b2world.contactListener
+        profiled_listener = _PROFILED_LISTENERS.get(type(listener))
+        if profiled_listener is not None:
+            listener.__class__ = profiled_listener
+        listener.profiler = self._profiler
+        self._active_profiler = self._profiler
+
+        return self._profiler
+
+    def disable_profiling(self):
+
+        """
+        Stops the measures started by :py:meth:`enable_profiling`
+        (the measures already performed are kept)
+        """
+
+        listener = self._b2world.contactListener
+        for original,profiled in _PROFILED_LISTENERS.items():
+            if type(listener) is profiled:
+                listener.__class__ = original
+        self._active_profiler = None
+
+    @property
+    def robot_configs(self):
+        """
+        Configurations of the robots of this world
+        """
+        return self._robot_configs
+
+    @property
+    def ball_configs(self):
+        """
+        Configurations of the balls of this world
+        """
+        return self._ball_configs
+
+    @property
+    def contact_events(self):
+        """
+        Instance of :py:class:`roboball2d.physics.contact_events.ContactEvents`
+        recording the contacts of the last step (None if the world was
+        constructed with nb_contact_events=0)
+        """
+        return self._contact_events
+
+    @property
+    def profiler(self):
+        """
+        Instance of :py:class:`roboball2d.physics.step_profiler.StepProfiler`
+        used by profiling (None if profiling was never enabled)
+        """
+        return self._profiler
+
+    def profile_report(self):
+
+        """
+        Returns a table (string) summarizing the durations of the phases
+        of the steps performed since profiling was enabled
+        (see :py:meth:`enable_profiling`)
+        """
+
+        if self._profiler is None:
+            raise Exception("B2World: profiling has not been enabled")
+        return self._profiler.report()
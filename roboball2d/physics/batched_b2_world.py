@@ -0,0 +1,431 @@
+import numpy as np
+
+from .b2_world import B2World
+from ..utils import arraytize
+
+
+class BatchedWorldState:
+
+    """
+    Stacked state of all the worlds managed by an instance of
+    :py:class:`roboball2d.physics.batched_b2_world.BatchedB2World`.
+    All attributes are numpy arrays whose first dimension is the
+    index of the world (N worlds, B balls and R robots per world).
+    The arrays are allocated once and refilled in place at each
+    step: user code should copy them if values must be kept
+    over several steps.
+
+    Attributes
+    ----------
+
+    t: (N,) array
+        current simulation time of each world (in seconds)
+
+    balls_position: (N,B,2) array
+
+    balls_angle: (N,B) array
+
+    balls_linear_velocity: (N,B,2) array
+
+    balls_angular_velocity: (N,B) array
+
+    rods_position: (N,R,2,2) array
+
+    rods_angle: (N,R,2) array
+
+    rods_linear_velocity: (N,R,2,2) array
+
+    rods_angular_velocity: (N,R,2) array
+
+    rackets_position: (N,R,2) array
+
+    rackets_angle: (N,R) array
+
+    rackets_linear_velocity: (N,R,2) array
+
+    rackets_angular_velocity: (N,R) array
+
+    joints_angle: (N,R,3) array
+
+    joints_angular_velocity: (N,R,3) array
+
+    joints_torque: (N,R,3) array
+        torques measured on the joints (nan if no step has
+        been applied since the reset)
+
+    joints_desired_torque: (N,R,3) array
+        torques applied on the joints (i.e. after clipping), nan
+        if no torque has been applied since the reset
+
+    balls_hits_floor: (N,B) array
+        x position at which the ball hit the floor during the
+        last step, nan if the ball did not hit the floor
+
+    balls_hits_racket: (N,B) array of int
+        index of the robot which racket the ball hit during 
+        the last step, -1 if the ball did not hit a racket
+
+    dones: (N,) array of bool
+        True if the episode of the world ended during the last step.
+        The world has then already been reset, i.e. the other
+        arrays contain the first state of the new episode (contacts
+        excepted, which are the ones of the last step of the
+        finished episode)
+
+    """
+
+    __slots__=["t",
+               "balls_position","balls_angle",
+               "balls_linear_velocity","balls_angular_velocity",
+               "rods_position","rods_angle",
+               "rods_linear_velocity","rods_angular_velocity",
+               "rackets_position","rackets_angle",
+               "rackets_linear_velocity","rackets_angular_velocity",
+               "joints_angle","joints_angular_velocity",
+               "joints_torque","joints_desired_torque",
+               "balls_hits_floor","balls_hits_racket",
+               "dones"]
+
+    @staticmethod
+    def layout(nb_worlds,nb_robots,nb_balls):
+
+        """
+        Returns a list of tuples (attribute, shape, dtype) describing
+        the arrays of a batched world state of the specified size.
+        """
+
+        n,r,b = nb_worlds,nb_robots,nb_balls
+        f,bool_ = np.float64,np.bool_
+        return [ ("t",(n,),f),
+                 ("balls_position",(n,b,2),f),
+                 ("balls_angle",(n,b),f),
+                 ("balls_linear_velocity",(n,b,2),f),
+                 ("balls_angular_velocity",(n,b),f),
+                 ("rods_position",(n,r,2,2),f),
+                 ("rods_angle",(n,r,2),f),
+                 ("rods_linear_velocity",(n,r,2,2),f),
+                 ("rods_angular_velocity",(n,r,2),f),
+                 ("rackets_position",(n,r,2),f),
+                 ("rackets_angle",(n,r),f),
+                 ("rackets_linear_velocity",(n,r,2),f),
+                 ("rackets_angular_velocity",(n,r),f),
+                 ("joints_angle",(n,r,3),f),
+                 ("joints_angular_velocity",(n,r,3),f),
+                 ("joints_torque",(n,r,3),f),
+                 ("joints_desired_torque",(n,r,3),f),
+                 ("balls_hits_floor",(n,b),f),
+                 ("balls_hits_racket",(n,b),np.int64),
+                 ("dones",(n,),bool_) ]
+        
+    def __init__(self,nb_worlds,nb_robots,nb_balls,
+                 arrays=None):
+
+        """
+        Parameters
+        ----------
+
+        nb_worlds, nb_robots, nb_balls : `int`
+            size of the arrays
+
+        arrays : 
+            (advanced usage) if not None, dictionary {attribute:array}
+            of already allocated arrays (e.g. in shared memory) to use
+            rather than allocating new ones. Arrays shapes and dtypes
+            must match :py:meth:`layout`.
+        """
+
+        if arrays is None:
+            arrays = {}
+            for attr,shape,dtype in self.layout(nb_worlds,nb_robots,nb_balls):
+                arrays[attr] = np.zeros(shape,dtype=dtype)
+            arrays["balls_hits_floor"].fill(np.nan)
+            arrays["balls_hits_racket"].fill(-1)
+
+        for attr in self.__slots__:
+            setattr(self,attr,arrays[attr])
+
+    def __str__(self):
+
+        values = [attr+": "+str(getattr(self,attr))
+                  for attr in self.__slots__ ]
+        return "batched world state:\n\t"+"\n\t".join(values)
+
+
+class BatchedB2World:
+
+    """
+    Manages N independant instances of :py:class:`roboball2d.physics.b2_world.B2World`
+    sharing the same robot and ball configurations, and steps all of them
+    in a single call. Torques are passed as a numpy array and the
+    states of all the worlds are returned as stacked numpy arrays
+    (see :py:class:`roboball2d.physics.batched_b2_world.BatchedWorldState`),
+    i.e. no instance of :py:class:`roboball2d.physics.world_state.WorldState`
+    is created during stepping.
+    Worlds which episode ended are automatically reset during the step.
+
+    Robots are expected to be instances of
+    :py:class:`roboball2d.physics.default_b2_robot.DefaultB2Robot`
+    (i.e. 2 rods, a racket and 3 joints).
+
+    Each world is stepped via :py:meth:`roboball2d.physics.b2_world.B2World.step_into`,
+    i.e. with the same dynamics as a B2World (including substeps and
+    step profiling, see :py:meth:`roboball2d.physics.b2_world.B2World.enable_profiling`).
+
+    """
+
+    __slots__=["worlds","_nb_robots","_nb_balls",
+               "_ball_guns","_robot_reinits",
+               "_max_episode_time","_max_floor_hits",
+               "_floor_hits","_state","_world_states"]
+
+    def __init__(self,
+                 nb_worlds,
+                 robot_configs,
+                 ball_configs,
+                 visible_area_width,
+                 ball_guns=None,
+                 robot_reinits=None,
+                 max_episode_time=None,
+                 max_floor_hits=None,
+                 steps_per_sec=100.0,
+                 gravitational_acceleration=-8.0,
+                 vel_iters = 10,
+                 pos_iters = 8,
+                 state = None):
+
+        """
+        Parameters
+        ----------
+
+        nb_worlds : `int`
+            number of worlds to create
+
+        robot_configs :
+            instance (or list of instances)
+            of :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`,
+            used by all worlds
+
+        ball_configs :
+            instance (or list of instances)
+            of :py:class:`roboball2d.ball.ball_config.BallConfig`,
+            used by all worlds
+
+        visible_width_area: `float`
+            width of the world ground
+
+        ball_guns :
+            ball gun (or list of ball guns, one per ball) used to reset
+            the balls of a world when its episode starts.
+            See :py:meth:`roboball2d.physics.b2_world.B2World.reset`
+
+        robot_reinits :
+            robot state (or list of robot states, one per robot) used to
+            reset the robots of a world when its episode starts.
+            See :py:meth:`roboball2d.physics.b2_world.B2World.reset`
+
+        max_episode_time : `float`
+            if not None, the episode of a world ends when its time
+            reaches this value (in seconds)
+
+        max_floor_hits : `int`
+            if not None, the episode of a world ends when the number
+            of times its balls hit the floor reaches this value
+
+        steps_per_sec, gravitational_acceleration, vel_iters, pos_iters:
+            see :py:class:`roboball2d.physics.b2_world.B2World`
+
+        state :
+            (advanced usage) instance of 
+            :py:class:`roboball2d.physics.batched_b2_world.BatchedWorldState`
+            the worlds will write into. A new instance is created if None.
+
+        """
+
+        robot_configs = arraytize(robot_configs)
+        ball_configs = arraytize(ball_configs)
+
+        self.worlds = [B2World(robot_configs,
+                               ball_configs,
+                               visible_area_width,
+                               steps_per_sec=steps_per_sec,
+                               gravitational_acceleration=gravitational_acceleration,
+                               vel_iters=vel_iters,
+                               pos_iters=pos_iters,
+                               world_state_mode="arrays")
+                       for _ in range(nb_worlds)]
+        # array world state of each world, refilled at each step
+        # (the one returned by the reset of the world, which
+        # allocates it at construction)
+        self._world_states = [None]*nb_worlds
+
+        self._nb_robots = len(robot_configs)
+        self._nb_balls = len(ball_configs)
+
+        self._ball_guns = arraytize(ball_guns)
+        if not self._ball_guns:
+            self._ball_guns = [None]*self._nb_balls
+        if not len(self._ball_guns) == self._nb_balls:
+            raise Exception("BatchedB2World:",self._nb_balls,"balls but",
+                            len(self._ball_guns),"ball guns.")
+        self._robot_reinits = arraytize(robot_reinits)
+
+        self._max_episode_time = max_episode_time
+        self._max_floor_hits = max_floor_hits
+
+        # number of times the balls hit the floor
+        # since the start of the episode
+        self._floor_hits = np.zeros(nb_worlds,dtype=int)
+
+        if state is None:
+            state = BatchedWorldState(nb_worlds,
+                                      self._nb_robots,
+                                      self._nb_balls)
+        self._state = state
+
+    @property
+    def nb_worlds(self):
+        return len(self.worlds)
+
+    def _reset_world(self,index):
+        # (in arrays mode, the world returns the same
+        # instance of ArrayWorldState at each reset)
+        self._world_states[index] = self.worlds[index].reset(self._robot_reinits,
+                                                             self._ball_guns)
+        self._floor_hits[index] = 0
+
+    # copies the array world state of the world at index
+    # into the stacked arrays of self._state
+    def _read_world(self,index):
+
+        world_state = self._world_states[index]
+        state = self._state
+        balls = world_state.balls
+        robots = world_state.robots
+
+        state.t[index] = world_state.t
+
+        state.balls_position[index] = balls.position
+        state.balls_angle[index] = balls.angle
+        state.balls_linear_velocity[index] = balls.linear_velocity
+        state.balls_angular_velocity[index] = balls.angular_velocity
+
+        if self._nb_robots:
+            state.rods_position[index] = robots.rod_positions
+            state.rods_angle[index] = robots.rod_angles
+            state.rods_linear_velocity[index] = robots.rod_linear_velocities
+            state.rods_angular_velocity[index] = robots.rod_angular_velocities
+            state.rackets_position[index] = robots.racket_positions
+            state.rackets_angle[index] = robots.racket_angles
+            state.rackets_linear_velocity[index] = robots.racket_linear_velocities
+            state.rackets_angular_velocity[index] = robots.racket_angular_velocities
+            state.joints_angle[index] = robots.joint_angles
+            state.joints_angular_velocity[index] = robots.joint_angular_velocities
+            state.joints_torque[index] = robots.joint_torques
+            state.joints_desired_torque[index] = robots.joint_desired_torques
+
+    def reset(self,indexes=None):
+
+        """
+        Reset worlds, using the ball guns and robot states passed to the
+        constructor.
+
+        Parameters
+        ----------
+
+        indexes :
+            list of indexes of the worlds to reset. All worlds are
+            reset if None.
+
+        Returns
+        -------
+
+        An instance of :py:class:`roboball2d.physics.batched_b2_world.BatchedWorldState`
+
+        """
+
+        if indexes is None:
+            indexes = range(len(self.worlds))
+
+        state = self._state
+        for index in indexes:
+            self._reset_world(index)
+            self._read_world(index)
+            state.balls_hits_floor[index] = np.nan
+            state.balls_hits_racket[index] = -1
+            state.dones[index] = False
+
+        return state
+
+    def step(self,
+             torques,
+             relative_torques=False,
+             n_substeps=1):
+
+        """
+        Performs a simulation step of all the worlds. The worlds
+        which episode ended during this step are reset.
+
+        Parameters
+        ----------
+
+        torques:
+            array of shape (N,R,3) (or (N,3) if a single robot
+            is managed), None if no robot is managed
+
+        relative torques : `Bool`
+            if true, the torques are in [-1,1] and are mapped
+            to (-max torque, +max torque)
+
+        n_substeps : `int`
+            number of Box2D steps, see :py:meth:`roboball2d.physics.b2_world.B2World.step`
+
+        Returns
+        -------
+
+        An instance of :py:class:`roboball2d.physics.batched_b2_world.BatchedWorldState`
+        (same instance at each call, updated in place)
+
+        """
+
+        nb_worlds = len(self.worlds)
+
+        if self._nb_robots:
+            torques = np.asarray(torques,dtype=float).reshape(nb_worlds,
+                                                              self._nb_robots,
+                                                              3)
+
+        state = self._state
+        state.dones.fill(False)
+
+        for index,world in enumerate(self.worlds):
+
+            world_state = self._world_states[index]
+            if world_state is None:
+                # world stepped before its first reset
+                world_state = self._world_states[index] = world.create_array_state()
+
+            world.step_into(torques[index] if self._nb_robots else None,
+                            world_state,
+                            relative_torques,
+                            n_substeps)
+
+            # contacts (nan: no contact)
+            balls = world_state.balls
+            state.balls_hits_floor[index] = balls.hits_floor
+            self._floor_hits[index] += np.count_nonzero(~np.isnan(balls.hits_floor))
+            state.balls_hits_racket[index] = np.where(np.isnan(balls.hits_racket),
+                                                      -1,balls.hits_racket)
+
+            # end of episode ?
+            done = ( (self._max_episode_time is not None
+                      and world_state.t >= self._max_episode_time - 1e-9)
+                     or (self._max_floor_hits is not None
+                         and self._floor_hits[index] >= self._max_floor_hits) )
+
+            if done:
+                state.dones[index] = True
+                self._reset_world(index)
+
+            self._read_world(index)
+
+        return state
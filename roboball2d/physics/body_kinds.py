@@ -0,0 +1,13 @@
+"""
+Kinds of the Box2D bodies managed by :py:class:`roboball2d.physics.b2_world.B2World`.
+The userData of each body is set by B2World (for robots, once created by their
+configuration) to a tuple (kind, index), index being the index of the ball
+(for balls) or of the robot (for rods and rackets).
+This allows the contact listener of B2World to identify the bodies in
+contact in constant time.
+"""
+
+GROUND = 0
+BALL = 1
+ROD = 2
+RACKET = 3
@@ -0,0 +1,179 @@
+import numpy as np
+
+
+class BulkBalls:
+
+    """
+    (Advanced usage)
+
+    Used internally by :py:class:`roboball2d.physics.b2_world.B2World`
+    when constructed with world_state_mode "bulk", for worlds managing
+    many balls. The state of the balls is read from Box2D once per step
+    into a single (B,6) array (x, y, angle, vx, vy, angular velocity),
+    which is then used to:
+
+    - compute the aerodynamic drag of all balls, at the start of the next
+      step (i.e. velocities are not read twice). The drag forces are
+      computed with numpy, and applied only to moving balls, so that
+      Box2D can let resting balls sleep.
+    - check (vectorized) which balls are out of play
+      (see :py:class:`roboball2d.physics.play_area.PlayArea`)
+    - fill the world state (a few numpy copies)
+
+    Note that the Python bindings of Box2D provide no bulk accessor:
+    reading the state still loops over the (active) balls, and the drag
+    forces are applied with one call per moving ball. The gain over the
+    "arrays" mode comes from reading each ball once per step rather than
+    twice, from the numpy computations and from the resting balls being
+    skipped, not from removing the per ball calls.
+
+    Users code is not expected to create instances of BulkBalls.
+    """
+
+    __slots__=["_balls","_drags","values","valid",
+               "_active","_active_indexes",
+               "_speeds","_forces"]
+
+    def __init__(self, balls, drags):
+
+        """
+        Parameters
+        ----------
+
+        balls :
+            list of the Box2D bodies of the balls
+
+        drags :
+            drag coefficient of each ball
+        """
+
+        nb_balls = len(balls)
+        self._balls = balls
+        self._drags = np.array(drags,dtype=float)
+        # x, y, angle, vx, vy, angular velocity of each ball
+        self.values = np.zeros((nb_balls,6))
+        # True if values are the current state of the Box2D bodies
+        self.valid = False
+        self._active = np.ones(nb_balls,dtype=bool)
+        self._active_indexes = np.arange(nb_balls)
+        self._speeds = np.zeros(nb_balls)
+        self._forces = np.zeros((nb_balls,2))
+
+    def invalidate(self):
+
+        """
+        To be called when the bodies are set by other means than a
+        Box2D step (reset, mirroring, restore)
+        """
+
+        self.valid = False
+
+    def set_active(self, balls_active, frozen_balls):
+
+        """
+        Sets which balls are active. The values of inactive balls are
+        set to their frozen (x,y,angle), with zero velocities
+        """
+
+        self._active[:] = balls_active
+        self._active_indexes = np.flatnonzero(self._active)
+        for index,frozen in enumerate(frozen_balls):
+            if frozen is not None:
+                self.values[index] = (frozen[0],frozen[1],frozen[2],0.,0.,0.)
+
+    def read(self):
+
+        """
+        Reads the state of all active balls from Box2D
+        (one read per ball, gathered in a single array)
+        """
+
+        balls = self._balls
+        values = []
+        extend = values.extend
+        if len(self._active_indexes) == len(balls):
+            for ball in balls:
+                position = ball.position
+                velocity = ball.linearVelocity
+                extend((position.x,position.y,ball.angle,
+                        velocity.x,velocity.y,ball.angularVelocity))
+            self.values.reshape(-1)[:] = values
+        else:
+            for index in self._active_indexes.tolist():
+                ball = balls[index]
+                position = ball.position
+                velocity = ball.linearVelocity
+                extend((position.x,position.y,ball.angle,
+                        velocity.x,velocity.y,ball.angularVelocity))
+            self.values[self._active_indexes] = np.reshape(values,(-1,6))
+        self.valid = True
+
+    def apply_drag(self):
+
+        """
+        Applies the aerodynamic drag (-drag*|v|*v) to all active
+        moving balls (forces computed with numpy, then applied with
+        one Box2D call per moving ball). To be called before each Box2D step.
+        """
+
+        if not self.valid:
+            self.read()
+
+        velocities = self.values[:,3:5]
+        speeds = self._speeds
+        forces = self._forces
+        np.hypot(velocities[:,0],velocities[:,1],out=speeds)
+        speeds *= self._active
+        np.multiply(speeds,self._drags,out=forces[:,0])
+        np.negative(forces[:,0],out=forces[:,0])
+        forces[:,1] = forces[:,0]
+        forces *= velocities
+
+        balls = self._balls
+        moving = np.flatnonzero(speeds)
+        for index,fx,fy in zip(moving.tolist(),
+                               forces[moving,0].tolist(),
+                               forces[moving,1].tolist()):
+            balls[index].ApplyForceToCenter((fx,fy),True)
+
+        # the Box2D step will change the velocities
+        self.valid = False
+
+    def out_of_play(self, play_area, balls_rest, elapsed):
+
+        """
+        Updates the time each active ball spent below the speed threshold
+        of the play area (balls_rest, array updated in place) and returns
+        the indexes of the active balls which are out of play
+        """
+
+        values = self.values
+        x = values[:,0]
+        y = values[:,1]
+        out = (x < play_area.x_min) | (x > play_area.x_max) | (y < play_area.y_min)
+        if play_area.y_max is not None:
+            out |= y > play_area.y_max
+        slow = ( np.square(values[:,3])+np.square(values[:,4])
+                 < play_area.min_speed*play_area.min_speed )
+        balls_rest[slow] += elapsed
+        balls_rest[~slow] = 0.0
+        out |= balls_rest >= play_area.rest_duration
+        out &= self._active
+        return np.flatnonzero(out).tolist()
+
+    def write(self, balls_arrays, contacts):
+
+        """
+        Copies the values (and the contacts) in the arrays of an instance of
+        :py:class:`roboball2d.physics.world_state.ArrayWorldState`
+        (see :py:class:`roboball2d.physics.world_state._BallsArrays`)
+        """
+
+        values = self.values
+        balls_arrays.position[:] = values[:,0:2]
+        balls_arrays.angle[:] = values[:,2]
+        balls_arrays.linear_velocity[:] = values[:,3:5]
+        balls_arrays.angular_velocity[:] = values[:,5]
+        balls_arrays.active[:] = self._active
+        balls_arrays.hits_floor[:] = contacts.balls_hits_floor
+        balls_arrays.hits_racket[:] = contacts.balls_hits_racket
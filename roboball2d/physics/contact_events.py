@@ -0,0 +1,185 @@
+import numpy as np
+
+
+class ContactEvents:
+
+    """
+    Bounded buffer of the contacts which started during the last
+    simulation step, filled by the contact listener of
+    :py:class:`roboball2d.physics.b2_world.B2World` (if constructed
+    with nb_contact_events > 0). Arrays are allocated once, and the
+    buffer is emptied (in place) at the start of each step. If more
+    contacts than the capacity of the buffer occur during a step,
+    the oldest events are overwritten (ring buffer) and the number of
+    overwritten events is given by the attribute nb_dropped.
+
+    Only the first nb_events rows of the arrays are valid. Bodies are
+    identified by their kind and index, see
+    :py:mod:`roboball2d.physics.body_kinds`.
+
+    Attributes
+    ----------
+
+    capacity: `int`
+        max number of events per step
+
+    nb_events: `int`
+        number of valid events (at most capacity)
+
+    nb_dropped: `int`
+        number of events which have been overwritten
+
+    kinds: (capacity,2) array of int
+        kinds of the two bodies in contact
+
+    indexes: (capacity,2) array of int
+        indexes of the two bodies in contact
+
+    points: (capacity,2) array
+        world coordinates of the contact point (average of the
+        manifold points)
+
+    normal_impulses: (capacity,) array
+        normal impulse (sum over the manifold points) applied by the solver
+        to resolve the contact, nan if the contact has not been solved
+        (e.g. sensor)
+
+    times: (capacity,) array
+        simulation time at the end of the (sub)step during which the 
+        contact started
+
+    """
+
+    __slots__=["capacity","nb_events","nb_dropped",
+               "kinds","indexes","points",
+               "normal_impulses","times",
+               "time","_pending","_total"]
+
+    def __init__(self,capacity):
+
+        """
+        Parameters
+        ----------
+
+        capacity: `int`
+            max number of events stored per step
+        """
+
+        self.capacity = int(capacity)
+        self.kinds = np.zeros((self.capacity,2),dtype=np.int64)
+        self.indexes = np.zeros((self.capacity,2),dtype=np.int64)
+        self.points = np.zeros((self.capacity,2))
+        self.normal_impulses = np.full(self.capacity,np.nan)
+        self.times = np.zeros(self.capacity)
+        # current simulation time, set by the world before each
+        # Box2D step
+        self.time = 0.0
+        # {(kind a, index a, kind b, index b):row} of the events
+        # which normal impulse has not been set yet
+        self._pending = {}
+        self.reset()
+
+    def reset(self):
+
+        """
+        Empties the buffer (in place)
+        """
+
+        self.nb_events = 0
+        self.nb_dropped = 0
+        self._total = 0
+        self._pending.clear()
+
+    def add(self,
+            kind_a,index_a,
+            kind_b,index_b,
+            x,y):
+
+        """
+        Adds an event (at the current time), returns its row
+        """
+
+        row = self._total % self.capacity
+        self._total += 1
+        if self.nb_events < self.capacity:
+            self.nb_events += 1
+        else:
+            self.nb_dropped += 1
+
+        self.kinds[row,0] = kind_a
+        self.kinds[row,1] = kind_b
+        self.indexes[row,0] = index_a
+        self.indexes[row,1] = index_b
+        self.points[row,0] = x
+        self.points[row,1] = y
+        self.normal_impulses[row] = np.nan
+        self.times[row] = self.time
+
+        self._pending[(kind_a,index_a,kind_b,index_b)] = row
+
+        return row
+
+    def set_impulse(self,
+                    kind_a,index_a,
+                    kind_b,index_b,
+                    normal_impulse):
+
+        """
+        Sets the normal impulse of the last event between the two
+        bodies, if not set already
+        """
+
+        row = self._pending.pop((kind_a,index_a,kind_b,index_b),None)
+        if row is not None:
+            self.normal_impulses[row] = normal_impulse
+
+    def extend(self, events):
+
+        """
+        Appends a copy of the valid events of another instance (in
+        chronological order). Events which do not fit in the remaining
+        capacity are not added (but counted in nb_dropped).
+        """
+
+        n = events.nb_events
+        if events.nb_dropped:
+            # ring buffer overflowed: oldest event at _total % capacity
+            order = np.roll(np.arange(events.capacity),
+                            -(events._total % events.capacity))
+        else:
+            order = np.arange(n)
+        start = self.nb_events
+        nb = min(n,self.capacity-start)
+        order = order[:nb]
+        end = start+nb
+        self.kinds[start:end] = events.kinds[order]
+        self.indexes[start:end] = events.indexes[order]
+        self.points[start:end] = events.points[order]
+        self.normal_impulses[start:end] = events.normal_impulses[order]
+        self.times[start:end] = events.times[order]
+        self.nb_events = end
+        self.nb_dropped += events.nb_dropped + n-nb
+        self._total = end
+
+    def copy(self):
+
+        """
+        Returns a new instance with a copy of the valid events
+        (in chronological order)
+        """
+
+        events = ContactEvents(max(self.nb_events,1))
+        events.extend(self)
+        events.time = self.time
+        return events
+
+    def __str__(self):
+
+        n = self.nb_events
+        return ("contact events ("+str(n)+", "+str(self.nb_dropped)+" dropped):\n\t"+
+                "\n\t".join([ "kinds: "+str(self.kinds[i])+
+                              " indexes: "+str(self.indexes[i])+
+                              " point: "+str(self.points[i])+
+                              " impulse: "+str(self.normal_impulses[i])+
+                              " time: "+str(self.times[i])
+                              for i in range(n) ]))
@@ -136,6 +136,51 @@ class DefaultB2Robot(B2Robot):
         
         return self._robot_state
 
+    def write_state(self, robots_arrays, index, desired_torques, applied_step = None):
+
+        # same values as get_state, but written in place in the 
+        # arrays of a roboball2d.physics.world_state.ArrayWorldState
+        r = index
+
+        for j,(world_joint,desired_torque) in enumerate(zip(self.joints,
+                                                            desired_torques)):
+            anchor = world_joint.anchorA
+            robots_arrays.joint_angles[r,j] = world_joint.angle
+            robots_arrays.joint_angular_velocities[r,j] = world_joint.speed
+            robots_arrays.joint_anchors[r,j,0] = anchor.x
+            robots_arrays.joint_anchors[r,j,1] = anchor.y
+            if desired_torque is None:
+                robots_arrays.joint_desired_torques[r,j] = np.nan
+            else:
+                robots_arrays.joint_desired_torques[r,j] = desired_torque
+            if applied_step is not None and applied_step != 0: 
+                robots_arrays.joint_torques[r,j] = world_joint.GetMotorTorque(1.0/applied_step)
+            else:
+                robots_arrays.joint_torques[r,j] = np.nan
+
+        for i,world_rod in enumerate(self.rods):
+            position = world_rod.position
+            velocity = world_rod.linearVelocity
+            robots_arrays.rod_positions[r,i,0] = position.x
+            robots_arrays.rod_positions[r,i,1] = position.y
+            robots_arrays.rod_angles[r,i] = world_rod.angle
+            robots_arrays.rod_linear_velocities[r,i,0] = velocity.x
+            robots_arrays.rod_linear_velocities[r,i,1] = velocity.y
+            robots_arrays.rod_angular_velocities[r,i] = world_rod.angularVelocity
+
+        position = self.racket.position
+        velocity = self.racket.linearVelocity
+        robots_arrays.racket_positions[r,0] = position.x
+        robots_arrays.racket_positions[r,1] = position.y
+        robots_arrays.racket_angles[r] = self.racket.angle
+        robots_arrays.racket_linear_velocities[r,0] = velocity.x
+        robots_arrays.racket_linear_velocities[r,1] = velocity.y
+        robots_arrays.racket_angular_velocities[r] = self.racket.angularVelocity
+
+    def create_lazy_state(self):
+        from .lazy_world_state import LazyRobotState
+        return LazyRobotState(self.robot_config,self)
+
     def apply_generalized_torques(self, generalized_torques):
         applied_torques = []
         for (joint,
@@ -156,3 +201,21 @@ class DefaultB2Robot(B2Robot):
             applied_torques.append(t)
         return applied_torques
 
+    def apply_generalized_torques_into(self, generalized_torques, applied_torques):
+        # same as apply_generalized_torques, but without
+        # creating a list of applied torques
+        max_motor_speed = self.robot_config.max_motor_speed
+        max_torques = self.robot_config.max_torques
+        joints = self.joints
+        for index in range(3):
+            torque = float(generalized_torques[index])
+            joint = joints[index]
+            if torque > 0:
+                joint.motorSpeed = max_motor_speed
+            elif torque < 0:
+                joint.motorSpeed = -max_motor_speed
+            else:
+                joint.motorSpeed = 0.0
+            t = min(abs(torque),max_torques[index])
+            joint.maxMotorTorque = t
+            applied_torques[index] = t
@@ -0,0 +1,325 @@
+from ..item import Item
+from ..robot.default_robot_state import DefaultRobotState
+from .world_state import WorldState
+
+
+class _cached:
+
+    """
+    Descriptor for the attributes of lazy items: the value is computed
+    by the decorated method at first access, then stored in the cache of
+    the instance (until the cache is cleared)
+    """
+
+    __slots__=["_read","_name"]
+
+    def __init__(self,read):
+        self._read = read
+        self._name = read.__name__
+
+    def __get__(self,instance,owner):
+        if instance is None:
+            return self
+        cache = instance._cache
+        try:
+            return cache[self._name]
+        except KeyError:
+            value = self._read(instance)
+            cache[self._name] = value
+            return value
+
+
+_ITEM_ATTRIBUTES = Item.__slots__
+
+
+def _item_str(lazy_item):
+    return "\t\t"+"\n\t\t".join([attr+":\t"+str(getattr(lazy_item,attr))
+                                 for attr in _ITEM_ATTRIBUTES])
+
+
+def _materialize_item(lazy_item):
+    item = Item()
+    for attr in _ITEM_ATTRIBUTES:
+        setattr(item,attr,getattr(lazy_item,attr))
+    return item
+
+
+class _LazyBody:
+
+    """
+    Item (ball, rod or racket) which attributes are read from the
+    Box2D body at first access. Provides the same attributes as
+    :py:class:`roboball2d.item.Item`.
+    """
+
+    __slots__=["_body","_cache","torque","desired_torque","anchor"]
+
+    def __init__(self,body,desired_torque=0.0):
+        self._body = body
+        self._cache = {}
+        # values not managed by Box2D (same as in eager world states)
+        self.torque = 0.0
+        self.desired_torque = desired_torque
+        self.anchor = 0.0
+
+    @_cached
+    def position(self):
+        position = self._body.position
+        return [position.x,position.y]
+
+    @_cached
+    def angle(self):
+        return self._body.angle
+
+    @_cached
+    def linear_velocity(self):
+        velocity = self._body.linearVelocity
+        return [velocity.x,velocity.y]
+
+    @_cached
+    def angular_velocity(self):
+        return self._body.angularVelocity
+
+    def __str__(self):
+        return _item_str(self)
+
+
+class _LazyJoint:
+
+    """
+    Joint of a robot which attributes are read from the Box2D joint
+    at first access. Provides the same attributes as
+    :py:class:`roboball2d.item.Item`.
+    """
+
+    __slots__=["_joint","_robot","_index","_cache"]
+
+    def __init__(self,joint,robot,index):
+        self._joint = joint
+        self._robot = robot
+        self._index = index
+        self._cache = {}
+
+    @property
+    def position(self):
+        return [0.0,0.0]
+
+    @property
+    def linear_velocity(self):
+        return [0.0,0.0]
+
+    @_cached
+    def angle(self):
+        return self._joint.angle
+
+    @_cached
+    def angular_velocity(self):
+        return self._joint.speed
+
+    @_cached
+    def anchor(self):
+        return list(self._joint.anchorA)
+
+    @_cached
+    def torque(self):
+        applied_step = self._robot._applied_step
+        if applied_step is not None and applied_step != 0:
+            return self._joint.GetMotorTorque(1.0/applied_step)
+        return None
+
+    @property
+    def desired_torque(self):
+        return self._robot._desired_torques[self._index]
+
+    def __str__(self):
+        return _item_str(self)
+
+
+class LazyRobotState:
+
+    """
+    State of a robot of an instance of :py:class:`LazyWorldState`,
+    providing the same attributes as
+    :py:class:`roboball2d.robot.default_robot_state.DefaultRobotState`.
+    Values are read from Box2D at first access and cached until the next
+    simulation step.
+    """
+
+    __slots__=["robot_config","rods","racket","joints",
+               "_desired_torques","_applied_step","_items"]
+
+    def __init__(self, robot_config, b2_robot):
+
+        """
+        Parameters
+        ----------
+
+        robot_config :
+            configuration of the robot
+
+        b2_robot :
+            an instance of :py:class:`roboball2d.physics.default_b2_robot.DefaultB2Robot`
+            (or any instance with the attributes rods, racket and joints)
+        """
+
+        self.robot_config = robot_config
+        self.rods = [_LazyBody(rod,None) for rod in b2_robot.rods]
+        self.racket = _LazyBody(b2_robot.racket,None)
+        self.joints = [_LazyJoint(joint,self,index)
+                       for index,joint in enumerate(b2_robot.joints)]
+        self._items = self.rods+[self.racket]+self.joints
+        self._desired_torques = [None]*len(self.joints)
+        self._applied_step = None
+
+    # called by roboball2d.physics.lazy_world_state.LazyWorldState
+    # at each step
+    def _refresh(self, desired_torques, applied_step):
+        for item in self._items:
+            item._cache.clear()
+        self._desired_torques = desired_torques
+        self._applied_step = applied_step
+
+    @property
+    def angles(self):
+        return [joint.angle for joint in self.joints]
+
+    @property
+    def angular_velocities(self):
+        return [joint.angular_velocity for joint in self.joints]
+
+    def materialize(self):
+
+        """
+        Returns an instance of
+        :py:class:`roboball2d.robot.default_robot_state.DefaultRobotState`
+        with a copy of all the values of the current step
+        """
+
+        state = DefaultRobotState(self.robot_config)
+        state.rods = [_materialize_item(rod) for rod in self.rods]
+        state.racket = _materialize_item(self.racket)
+        state.joints = [_materialize_item(joint) for joint in self.joints]
+        return state
+
+    def render(self, color = None, z_coordinate = None):
+        DefaultRobotState.render(self,color,z_coordinate)
+
+    def __str__(self):
+        return DefaultRobotState.__str__(self)
+
+
+class LazyWorldState:
+
+    """
+    World state returned by :py:class:`roboball2d.physics.b2_world.B2World`
+    when constructed with world_state_mode "lazy". It provides the same
+    attributes as :py:class:`roboball2d.physics.world_state.WorldState`, but
+    the values of the balls and robots are read from the Box2D bodies only
+    at first access (and then cached until the next step). Time and contacts
+    are copied at each step.
+
+    A single instance is allocated per world and refreshed in place at each
+    call to step or reset, i.e. values are valid only until the next step.
+    Use :py:meth:`materialize` to get a stable copy.
+    """
+
+    __slots__=["robot_config","robot_configs",
+               "robots","robot",
+               "ball_config","ball_configs",
+               "balls","ball",
+               "t","applied_time_step","interpolation_alpha",
+               "balls_hits_floor","balls_hits_racket",
+               "balls_active","contact_events"]
+
+    def __init__(self, robot_configs, ball_configs, b2_robots, b2_balls):
+
+        """
+        Parameters
+        ----------
+
+        robot_configs, ball_configs :
+            configurations of the robots and balls of the world
+
+        b2_robots :
+            list of instances of :py:class:`roboball2d.physics.b2_robot.B2Robot`
+            of the world, which should implement create_lazy_state
+
+        b2_balls :
+            list of the Box2D bodies of the balls
+        """
+
+        self.robot_config,self.robot_configs = WorldState._arraytize(robot_configs)
+        self.ball_config,self.ball_configs = WorldState._arraytize(ball_configs)
+
+        self.robots = [b2_robot.create_lazy_state() for b2_robot in b2_robots]
+        self.balls = [_LazyBody(ball) for ball in b2_balls]
+        self.robot = self.robots[0] if self.robots else None
+        self.ball = self.balls[0] if self.balls else None
+
+        self.t = None
+        self.applied_time_step = None
+        self.interpolation_alpha = 0.0
+        self.balls_hits_floor = [None]*len(self.balls)
+        self.balls_hits_racket = [None]*len(self.balls)
+        self.balls_active = [True]*len(self.balls)
+        self.contact_events = None
+
+    @property
+    def ball_hits_floor(self):
+        if not self.balls_hits_floor:
+            return None
+        return self.balls_hits_floor[0]
+
+    @property
+    def ball_hits_racket(self):
+        if not self.balls_hits_racket:
+            return None
+        return self.balls_hits_racket[0]
+
+    # called by roboball2d.physics.b2_world.B2World at each step
+    def _refresh(self,
+                 t, applied_time_step, interpolation_alpha,
+                 all_desired_torques, applied_step,
+                 balls_hits_floor, balls_hits_racket,
+                 balls_active, contact_events):
+
+        self.t = t
+        self.applied_time_step = applied_time_step
+        self.interpolation_alpha = interpolation_alpha
+        for ball in self.balls:
+            ball._cache.clear()
+        for robot,desired_torques in zip(self.robots,all_desired_torques):
+            robot._refresh(desired_torques,applied_step)
+        self.balls_hits_floor[:] = balls_hits_floor
+        self.balls_hits_racket[:] = balls_hits_racket
+        self.balls_active[:] = balls_active
+        self.contact_events = contact_events
+
+    def materialize(self):
+
+        """
+        Reads all values of the current step and returns them as
+        a new instance of :py:class:`roboball2d.physics.world_state.WorldState`
+        """
+
+        ws = WorldState(self.robot_configs,self.ball_configs)
+        ws.t = self.t
+        ws.applied_time_step = self.applied_time_step
+        ws.interpolation_alpha = self.interpolation_alpha
+        ws.balls = [_materialize_item(ball) for ball in self.balls]
+        ws.robots = [robot.materialize() for robot in self.robots]
+        ws.balls_hits_floor = list(self.balls_hits_floor)
+        ws.balls_hits_racket = list(self.balls_hits_racket)
+        ws.balls_active = list(self.balls_active)
+        if ws.robots:
+            ws.robot = ws.robots[0]
+        if ws.balls:
+            ws.ball = ws.balls[0]
+        ws.ball_hits_floor = self.ball_hits_floor
+        ws.ball_hits_racket = self.ball_hits_racket
+        if self.contact_events is not None:
+            ws.contact_events = self.contact_events.copy()
+        return ws
+
+    def __str__(self):
+        return WorldState.__str__(self)
@@ -0,0 +1,60 @@
+class PlayArea:
+
+    """
+
+    Play Area
+
+    Policy used by :py:class:`roboball2d.physics.b2_world.B2World` (if passed
+    as the argument play_area of its constructor) to deactivate balls which
+    are out of play, i.e. which left the area or which stayed slower than a
+    speed threshold for some time. Deactivated balls are not simulated
+    anymore (their Box2D body is set inactive, their velocities are set to
+    zero, and no drag is computed for them), their state is not read from
+    Box2D anymore, and they are flagged in the world states (see the
+    attribute balls_active of :py:class:`roboball2d.physics.world_state.WorldState`).
+    A ball is reactivated when it is reset by a ball gun.
+
+    Attributes
+    ----------
+
+    x_min, x_max : `float`
+        balls with an x position outside of [x_min,x_max] are deactivated (in meters)
+
+    y_min : `float`
+        balls below y_min are deactivated (in meters)
+
+    y_max : `float`
+        balls above y_max are deactivated (in meters), None for no limit
+
+    min_speed : `float`
+        balls slower than min_speed (in meters per second) during
+        rest_duration are deactivated
+
+    rest_duration : `float`
+        in seconds
+
+    """
+
+    __slots__=["x_min","x_max",
+               "y_min","y_max",
+               "min_speed","rest_duration"]
+
+    def __init__(self, visible_area_width):
+
+        """
+        construct the play area, setting default values to attributes
+
+        Parameters
+        ----------
+
+        visible_area_width : `float`
+            width of the visible area of the world (in meters), the
+            play area extends 0.5 meter on each side of it
+        """
+
+        self.x_min = -0.5
+        self.x_max = visible_area_width+0.5
+        self.y_min = -0.5
+        self.y_max = None
+        self.min_speed = 0.01
+        self.rest_duration = 1.0
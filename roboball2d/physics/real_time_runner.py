@@ -0,0 +1,269 @@
+import copy,threading,time
+
+import numpy as np
+
+
+class RealTimeStats:
+
+    """
+    Timing statistics of an instance of
+    :py:class:`roboball2d.physics.real_time_runner.RealTimeRunner`,
+    as returned by its method get_stats. Percentiles are computed over the
+    most recent iterations (see the argument history of RealTimeRunner).
+
+    Attributes
+    ----------
+
+    nb_steps : `int`
+        number of simulation steps performed since start
+
+    nb_overruns : `int`
+        number of iterations which did not finish before the start
+        time of the next iteration
+
+    latency_p50, latency_p99 : `float`
+        median and 99th percentile of the duration (in seconds) of an
+        iteration (simulation step and publication of the world state)
+
+    jitter_p50, jitter_p99 : `float`
+        median and 99th percentile of the delay (in seconds) between the
+        scheduled and the actual start of an iteration
+
+    """
+
+    __slots__=["nb_steps","nb_overruns",
+               "latency_p50","latency_p99",
+               "jitter_p50","jitter_p99"]
+
+    def __init__(self):
+        self.nb_steps = 0
+        self.nb_overruns = 0
+        self.latency_p50 = None
+        self.latency_p99 = None
+        self.jitter_p50 = None
+        self.jitter_p99 = None
+
+    def __str__(self):
+        return "real time stats:\n\t"+"\n\t".join([attr+": "+str(getattr(self,attr))
+                                                   for attr in self.__slots__])
+
+
+# returns a world state which is not modified by the next
+# steps of the world
+def _detach(world_state):
+
+    if hasattr(world_state,"materialize"):
+        # roboball2d.physics.lazy_world_state.LazyWorldState
+        return world_state.materialize()
+    if hasattr(world_state,"buffer"):
+        # roboball2d.physics.world_state.ArrayWorldState
+        return world_state.copy()
+    # roboball2d.physics.world_state.WorldState: robot states
+    # are updated in place by the robots
+    world_state.robots = [ copy.copy(robot) for robot in world_state.robots ]
+    for robot in world_state.robots:
+        robot.rods = [ copy.copy(rod) for rod in robot.rods ]
+        robot.racket = copy.copy(robot.racket)
+        robot.joints = [ copy.copy(joint) for joint in robot.joints ]
+    if world_state.robots:
+        world_state.robot = world_state.robots[0]
+    return world_state
+
+
+class RealTimeRunner:
+
+    """
+    Steps an instance of :py:class:`roboball2d.physics.b2_world.B2World`
+    on a dedicated thread, at a fixed frequency (wall clock).
+
+    Torques are set via :py:meth:`set_torques`: at each step, the runner
+    uses the latest torques set (no lock, no queue: previous values not
+    used yet are overwritten). After each step, the world state is
+    published: :py:meth:`get_world_state` returns the latest one (a copy
+    which is not modified by further steps).
+
+    If an iteration takes longer than the period, it is counted as an
+    overrun and the schedule is shifted (the runner does not try to
+    catch up with missed steps). See :py:meth:`get_stats`.
+
+    Once started, the world should be accessed only via the runner
+    (Box2D is not thread safe), e.g. use :py:meth:`reset` rather than
+    the reset method of the world. Instances can be used as context
+    managers (started on enter, stopped on exit).
+    """
+
+    __slots__=["_world","_period","_relative_torques",
+               "_torques","_world_state","_reset",
+               "_thread","_running","_error",
+               "_nb_steps","_nb_overruns",
+               "_latencies","_jitters"]
+
+    def __init__(self,
+                 world,
+                 steps_per_sec=None,
+                 relative_torques=False,
+                 history=10000):
+
+        """
+        Parameters
+        ----------
+
+        world :
+            instance of :py:class:`roboball2d.physics.b2_world.B2World`
+            (expected to have been reset)
+
+        steps_per_sec : `float`
+            frequency of the steps, if None the steps per second of the
+            world (i.e. the simulation runs in real time)
+
+        relative_torques : `Bool`
+            see :py:meth:`roboball2d.physics.b2_world.B2World.step`
+
+        history : `int`
+            number of iterations used for computing the latency and
+            jitter percentiles
+        """
+
+        self._world = world
+        if steps_per_sec is None:
+            self._period = world._time_step
+        else:
+            self._period = 1.0/steps_per_sec
+        self._relative_torques = relative_torques
+        self._torques = None
+        self._world_state = None
+        self._reset = None
+        self._thread = None
+        self._running = False
+        self._error = None
+        self._nb_steps = 0
+        self._nb_overruns = 0
+        # ring buffers (index: nb_steps % history)
+        self._latencies = np.full(history,np.nan)
+        self._jitters = np.full(history,np.nan)
+
+    def set_torques(self, torques):
+
+        """
+        Sets the torques applied from the next step on (see
+        :py:meth:`roboball2d.physics.b2_world.B2World.step`)
+        """
+
+        self._torques = torques
+
+    def reset(self, init_robot_state=None, ball_gun=None):
+
+        """
+        Requests a reset of the world, performed by the runner thread
+        before the next step (see
+        :py:meth:`roboball2d.physics.b2_world.B2World.reset`)
+        """
+
+        self._reset = (init_robot_state,ball_gun)
+
+    def get_world_state(self):
+
+        """
+        Returns the latest published world state (None if no step
+        has been performed yet).
+        """
+
+        if self._error is not None:
+            raise self._error
+        return self._world_state
+
+    def get_stats(self):
+
+        """
+        Returns an instance of
+        :py:class:`roboball2d.physics.real_time_runner.RealTimeStats`
+        """
+
+        stats = RealTimeStats()
+        stats.nb_steps = self._nb_steps
+        stats.nb_overruns = self._nb_overruns
+        nb_values = min(self._nb_steps,len(self._latencies))
+        if nb_values:
+            latencies = self._latencies[:nb_values]
+            jitters = self._jitters[:nb_values]
+            stats.latency_p50,stats.latency_p99 = np.percentile(latencies,(50,99))
+            stats.jitter_p50,stats.jitter_p99 = np.percentile(jitters,(50,99))
+        return stats
+
+    def start(self):
+
+        """
+        Starts stepping the world (on a new thread)
+        """
+
+        if self._running:
+            raise Exception("RealTimeRunner: already started")
+        self._running = True
+        self._thread = threading.Thread(target=self._run,daemon=True)
+        self._thread.start()
+
+    def stop(self):
+
+        """
+        Stops stepping the world (waiting for the current step to finish)
+        """
+
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+
+        world = self._world
+        period = self._period
+        history = len(self._latencies)
+        clock = time.perf_counter
+        scheduled = clock()
+
+        try:
+
+            while self._running:
+
+                start = clock()
+                jitter = start - scheduled
+
+                reset = self._reset
+                if reset is not None:
+                    self._reset = None
+                    world.reset(*reset)
+
+                # (copy: step modifies lists of relative torques in place)
+                torques = self._torques
+                if torques is not None:
+                    torques = list(torques)
+                world_state = world.step(torques,
+                                         relative_torques=self._relative_torques)
+                self._world_state = _detach(world_state)
+
+                end = clock()
+                index = self._nb_steps % history
+                self._latencies[index] = end-start
+                self._jitters[index] = jitter
+                self._nb_steps += 1
+
+                scheduled += period
+                if end > scheduled:
+                    # overrun: next iteration starts now
+                    self._nb_overruns += 1
+                    scheduled = end
+                else:
+                    time.sleep(scheduled-end)
+
+        except Exception as e:
+            self._error = e
+            self._running = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,295 @@
+import numpy as np
+
+from .world_state import ArrayWorldState
+from .contact_events import ContactEvents
+
+
+# default channels (see ArrayWorldState.layout) gathered in observations
+OBSERVATION_CHANNELS = ("joint_angles","joint_angular_velocities",
+                        "position","linear_velocity")
+
+
+class Rollout:
+
+    """
+    Trajectory of a closed loop rollout, as returned by
+    :py:func:`roboball2d.physics.rollout.rollout`. Arrays are allocated
+    once for the horizon T: an instance may be passed back to rollout
+    (argument out) to be refilled in place. Only the first nb_steps
+    rows (nb_steps+1 for observations) are valid.
+
+    An observation is a 1d array concatenating the values of the observation
+    channels (arrays of :py:class:`roboball2d.physics.world_state.ArrayWorldState`,
+    see its method layout), e.g. by default the joint angles and angular
+    velocities of the robots, and the positions and linear velocities of
+    the balls. See :py:meth:`channel` to get the values of a channel.
+
+    Attributes
+    ----------
+
+    horizon: `int`
+        T, maximal number of steps
+
+    nb_steps: `int`
+        number of steps performed (smaller than the horizon if the
+        rollout terminated early)
+
+    terminated: `Bool`
+        True if the rollout was ended by a ball hitting the floor
+        (see the argument terminate_on_floor_hit of rollout)
+
+    channels: `tuple`
+        names of the observation channels
+
+    observations: (T+1,D) array
+        observation after the reset (row 0) and after each step
+
+    actions: (T,R,3) array
+        outputs of the policy
+
+    torques: (T,R,3) array
+        torques passed to the world (same as actions if no
+        controller is used)
+
+    balls_hits_floor: (T,B) array
+        x position at which each ball hit the floor during
+        each step, nan if the ball did not hit the floor
+
+    balls_hits_racket: (T,B) array
+        index of the robot which racket each ball hit during each
+        step, nan if the ball did not hit a racket
+
+    contact_events:
+        instance of :py:class:`roboball2d.physics.contact_events.ContactEvents`
+        gathering the contact events of all steps, or None if the world
+        does not register contact events
+
+    """
+
+    __slots__=["horizon","nb_steps","terminated","channels",
+               "observations","actions","torques",
+               "balls_hits_floor","balls_hits_racket",
+               "contact_events","_state","_copies","_shapes"]
+
+    def __init__(self, robot_configs, ball_configs, horizon,
+                 channels=OBSERVATION_CHANNELS, nb_contact_events=0):
+
+        """
+        Parameters
+        ----------
+
+        robot_configs, ball_configs:
+            see :py:class:`roboball2d.physics.world_state.WorldState`
+
+        horizon: `int`
+            T, maximal number of steps
+
+        channels:
+            iterable of the names of the observation channels
+
+        nb_contact_events: `int`
+            max number of contact events per step (0 if contact events
+            are not recorded)
+        """
+
+        self._state = ArrayWorldState(robot_configs,ball_configs)
+        nb_robots = len(self._state.robots)
+        nb_balls = len(self._state.balls)
+        layout,_ = ArrayWorldState.layout(nb_robots,nb_balls)
+
+        # offset and shape of each channel in the state buffer
+        offsets = {}
+        offset = 0
+        for channel,shape in layout:
+            offsets[channel] = (offset,shape)
+            offset += int(np.prod(shape))
+
+        # (observation slice, state buffer slice) of each channel
+        self.channels = tuple(channels)
+        self._copies = []
+        self._shapes = {}
+        size = 0
+        for channel in self.channels:
+            if channel not in offsets:
+                raise Exception("Rollout: unknown channel",channel,
+                                "(channels:",[c for c,_ in layout],")")
+            offset,shape = offsets[channel]
+            nb_values = int(np.prod(shape))
+            self._copies.append((slice(size,size+nb_values),
+                                 self._state.buffer[offset:offset+nb_values]))
+            self._shapes[channel] = (slice(size,size+nb_values),shape)
+            size += nb_values
+
+        self.horizon = horizon
+        self.nb_steps = 0
+        self.terminated = False
+        self.observations = np.zeros((horizon+1,size))
+        self.actions = np.zeros((horizon,nb_robots,3))
+        self.torques = np.zeros((horizon,nb_robots,3))
+        self.balls_hits_floor = np.full((horizon,nb_balls),np.nan)
+        self.balls_hits_racket = np.full((horizon,nb_balls),np.nan)
+        if nb_contact_events > 0:
+            self.contact_events = ContactEvents(nb_contact_events*horizon)
+        else:
+            self.contact_events = None
+
+    def _observe(self, row):
+        observation = self.observations[row]
+        for observation_slice,values in self._copies:
+            observation[observation_slice] = values
+
+    def channel(self, channel):
+
+        """
+        Returns the (valid) observed values of a channel, as an
+        array of shape (nb_steps+1,)+shape of the channel
+        """
+
+        observation_slice,shape = self._shapes[channel]
+        return self.observations[:self.nb_steps+1,observation_slice].reshape((-1,)+shape)
+
+    def __str__(self):
+        return ("rollout ("+str(self.nb_steps)+" steps"+
+                (", terminated" if self.terminated else "")+
+                "):\n\tobservations: "+", ".join(self.channels))
+
+
+def rollout(world,
+            policy,
+            horizon,
+            ball_gun=None,
+            robot_init=None,
+            controller=None,
+            relative_torques=False,
+            terminate_on_floor_hit=True,
+            channels=OBSERVATION_CHANNELS,
+            n_substeps=1,
+            out=None):
+
+    """
+    Resets the world and runs a closed loop episode of at most horizon steps,
+    without creating any world state or list during the episode. At each step,
+    the policy is called on the current observation (a 1d numpy array, see
+    :py:class:`Rollout`), its output is (optionally) converted into torques by
+    a PD controller, and the world is stepped (see
+    :py:meth:`roboball2d.physics.b2_world.B2World.step_into`).
+
+    e.g., the rollout of the demo roboball2d.demos.simple
+    (without the termination after 2 bounces)::
+
+        references = [-math.pi/8.0]*3
+        trajectory = rollout(world,lambda observation: references,1000,
+                             ball_gun,DefaultRobotState(robot_config),
+                             controller=PDController(),relative_torques=True)
+
+    Parameters
+    ----------
+
+    world :
+        instance of :py:class:`roboball2d.physics.b2_world.B2World`
+
+    policy :
+        callable taking an observation and returning an array of
+        shape (R,3) (or (3,) if the world manages one robot)
+
+    horizon : `int`
+        max number of steps
+
+    ball_gun, robot_init :
+        passed to :py:meth:`roboball2d.physics.b2_world.B2World.reset`
+        (ball_gun and init_robot_state)
+
+    controller :
+        if not None, instance of :py:class:`roboball2d.robot.pd_controller.PDController`
+        (or any object with a similar get method, and optionally get_batch): the
+        outputs of the policy are then the references (joint angles) of the controller
+
+    relative_torques : `Bool`
+        see :py:meth:`roboball2d.physics.b2_world.B2World.step`
+
+    terminate_on_floor_hit : `Bool`
+        if True, the episode ends at the first step during which
+        a ball hits the floor
+
+    channels :
+        names of the observation channels (ignored if out is not None)
+
+    n_substeps : `int`
+        see :py:meth:`roboball2d.physics.b2_world.B2World.step`
+
+    out :
+        instance of :py:class:`Rollout` returned by a previous call with the same
+        world and horizon, refilled in place. If None, a new instance is returned.
+
+    Returns
+    -------
+
+    instance of :py:class:`Rollout`
+
+    """
+
+    if out is None:
+        events = world.contact_events
+        out = Rollout(world.robot_configs,world.ball_configs,horizon,
+                      channels,events.capacity if events is not None else 0)
+    elif out.horizon != horizon:
+        raise Exception("rollout: out of horizon",out.horizon,
+                        "but horizon",horizon,"requested")
+
+    state = out._state
+    balls = state.balls
+    robots = state.robots
+    actions = out.actions
+    torques = out.torques
+    hits_floor = out.balls_hits_floor
+    hits_racket = out.balls_hits_racket
+    events = world.contact_events
+    recorded_events = out.contact_events if events is not None else None
+    if recorded_events is not None:
+        recorded_events.reset()
+
+    world.reset(robot_init,ball_gun)
+    world.fill_array_state(state)
+    out._observe(0)
+
+    # controllers computing the torques of all robots at once
+    get_batch = getattr(controller,"get_batch",None)
+
+    nb_steps = 0
+    terminated = False
+
+    for step in range(horizon):
+
+        actions[step] = policy(out.observations[step])
+
+        if get_batch is not None:
+            get_batch(actions[step],robots.joint_angles,
+                      robots.joint_angular_velocities,out=torques[step])
+        elif controller is not None:
+            for index in range(len(robots)):
+                torques[step,index] = controller.get(actions[step,index],
+                                                     robots.joint_angles[index],
+                                                     robots.joint_angular_velocities[index])
+        else:
+            torques[step] = actions[step]
+
+        world.step_into(torques[step],state,relative_torques,n_substeps)
+
+        out._observe(step+1)
+        hits_floor[step] = balls.hits_floor
+        hits_racket[step] = balls.hits_racket
+        if recorded_events is not None:
+            recorded_events.extend(events)
+        nb_steps += 1
+
+        if terminate_on_floor_hit and not np.isnan(hits_floor[step]).all():
+            terminated = True
+            break
+
+    # rows of previous rollouts beyond the end of this one
+    hits_floor[nb_steps:] = np.nan
+    hits_racket[nb_steps:] = np.nan
+
+    out.nb_steps = nb_steps
+    out.terminated = terminated
+    return out
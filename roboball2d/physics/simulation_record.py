@@ -0,0 +1,118 @@
+import numpy as np
+
+from .world_state import ArrayWorldState
+from .contact_events import ContactEvents
+
+
+class SimulationRecord:
+
+    """
+    Values recorded by :py:meth:`roboball2d.physics.b2_world.B2World.simulate`.
+    Arrays are allocated once: an instance may be passed back to simulate
+    (argument out) to be refilled in place, e.g. when evaluating many torque
+    sequences of the same horizon.
+
+    Channels are the arrays of :py:class:`roboball2d.physics.world_state.ArrayWorldState`
+    (see its method layout, e.g. "position" for the balls positions or
+    "joint_angles"). The recorded array of a channel is of shape (T,)+shape
+    of the channel, row t being the value after the (t+1)th step. Recorded
+    arrays can be accessed via indexing, e.g. `record["joint_angles"]`.
+
+    Attributes
+    ----------
+
+    nb_steps: `int`
+        T, the number of steps of the simulation
+
+    channels: `tuple`
+        names of the recorded channels
+
+    arrays: `dict`
+        {channel: recorded array}
+
+    contact_events:
+        instance of :py:class:`roboball2d.physics.contact_events.ContactEvents`
+        gathering the contact events of all steps (see their attribute times), or
+        None if the world does not register contact events
+
+    """
+
+    __slots__=["nb_steps","channels","arrays","contact_events",
+               "_state","_copies","_all"]
+
+    def __init__(self, robot_configs, ball_configs, nb_steps,
+                 channels=None, nb_contact_events=0):
+
+        """
+        Parameters
+        ----------
+
+        robot_configs, ball_configs:
+            see :py:class:`roboball2d.physics.world_state.WorldState`
+
+        nb_steps: `int`
+            T, number of steps
+
+        channels:
+            iterable of channel names, all channels if None
+
+        nb_contact_events: `int`
+            max number of contact events per step (0 if contact events
+            are not recorded)
+        """
+
+        # state in which each step is written
+        self._state = ArrayWorldState(robot_configs,ball_configs)
+        layout,size = ArrayWorldState.layout(len(self._state.robots),
+                                             len(self._state.balls))
+
+        all_channels = [ channel for channel,_ in layout ]
+        if channels is None:
+            channels = all_channels
+        for channel in channels:
+            if channel not in all_channels:
+                raise Exception("SimulationRecord: unknown channel",channel,
+                                "(channels:",all_channels,")")
+        self.channels = tuple(channels)
+        self.nb_steps = nb_steps
+        self._all = len(set(self.channels)) == len(all_channels)
+
+        # (recorded array, slice of the state buffer) of each channel.
+        # If all channels are recorded, a single (T,size) array
+        # is copied at each step, channels being views on it
+        self.arrays = {}
+        self._copies = []
+        if self._all:
+            buffer = np.zeros((nb_steps,size))
+            self._copies.append((buffer,self._state.buffer))
+        offset = 0
+        for channel,shape in layout:
+            nb_values = int(np.prod(shape))
+            if self._all:
+                self.arrays[channel] = buffer[:,offset:offset+nb_values].reshape((nb_steps,)+shape)
+            elif channel in self.channels:
+                array = np.zeros((nb_steps,nb_values))
+                self.arrays[channel] = array.reshape((nb_steps,)+shape)
+                self._copies.append((array,self._state.buffer[offset:offset+nb_values]))
+            offset += nb_values
+
+        if nb_contact_events > 0:
+            self.contact_events = ContactEvents(nb_contact_events*nb_steps)
+        else:
+            self.contact_events = None
+
+    def __getitem__(self, channel):
+        return self.arrays[channel]
+
+    @property
+    def t(self):
+        """
+        (T,) array of the simulation time after each step
+        (requires the channel "time")
+        """
+        return self.arrays["time"][:,0]
+
+    def __str__(self):
+        return ("simulation record ("+str(self.nb_steps)+" steps):\n\t"+
+                "\n\t".join([ channel+": "+str(self.arrays[channel].shape)
+                              for channel in self.channels ]))
@@ -0,0 +1,158 @@
+# phases of a step, in execution order
+# (contacts: time spent in the contact listener,
+#  which is included in the time of box2d)
+PHASES = ("torques","apply_torques","drag","box2d",
+          "contacts","play_area","world_state","step")
+
+_TORQUES,_APPLY_TORQUES,_DRAG,_BOX2D,_CONTACTS,_PLAY_AREA,_WORLD_STATE,_STEP = range(len(PHASES))
+
+# number of buckets of the histograms (durations: bucket i gathers
+# durations d (in ns) such as 2**(i-1) <= d < 2**i, contacts: bucket i
+# gathers steps with i contacts, the last bucket gathering the steps
+# with NB_BUCKETS-1 contacts or more)
+NB_BUCKETS = 64
+
+
+class StepProfiler:
+
+    """
+    Per phase timings of the steps of an instance of
+    :py:class:`roboball2d.physics.b2_world.B2World`, see
+    its method enable_profiling.
+
+    Durations are measured with :py:func:`time.perf_counter_ns` and
+    registered in fixed size histograms (power of 2 buckets), so that
+    profiling long runs does not require memory allocation. Percentiles are
+    therefore approximated by the upper bound of their bucket.
+
+    Attributes
+    ----------
+
+    counts : `list`
+        for each phase (see PHASES), number of times the phase was measured
+
+    totals : `list`
+        for each phase, total duration (in ns)
+
+    histograms : `list`
+        for each phase, histogram of the durations (list of NB_BUCKETS ints)
+
+    contacts_histogram : `list`
+        histogram of the number of contacts (calls to the contact listener)
+        per step (list of NB_BUCKETS ints)
+
+    """
+
+    __slots__=["counts","totals","histograms",
+               "contacts_histogram","_step_contacts"]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+
+        """
+        Discards all measurements
+        """
+
+        self.counts = [0]*len(PHASES)
+        self.totals = [0]*len(PHASES)
+        self.histograms = [ [0]*NB_BUCKETS for _ in PHASES ]
+        self.contacts_histogram = [0]*NB_BUCKETS
+        self._step_contacts = 0
+
+    def add(self, phase, duration):
+
+        """
+        Registers the duration (in ns) of a phase (index in PHASES)
+        """
+
+        self.counts[phase] += 1
+        self.totals[phase] += duration
+        self.histograms[phase][min(duration.bit_length(),NB_BUCKETS-1)] += 1
+
+    def add_contact(self, duration):
+
+        """
+        Registers a call to the contact listener, and its duration (in ns)
+        """
+
+        self._step_contacts += 1
+        self.add(_CONTACTS,duration)
+
+    def end_step(self, duration):
+
+        """
+        Registers the duration (in ns) of a full step, and the
+        number of contacts since the last call
+        """
+
+        self.add(_STEP,duration)
+        self.contacts_histogram[min(self._step_contacts,NB_BUCKETS-1)] += 1
+        self._step_contacts = 0
+
+    @staticmethod
+    def _bucket(histogram, count, ratio):
+        # index of the bucket in which the percentile falls
+        threshold = ratio*count
+        cumulated = 0
+        for bucket,value in enumerate(histogram):
+            cumulated += value
+            if cumulated >= threshold:
+                return bucket
+        return len(histogram)-1
+
+    def percentile(self, phase, ratio):
+
+        """
+        Returns the approximated percentile (ratio in [0,1]) of the
+        durations (in ns) of a phase (name or index in PHASES), None if
+        the phase was never measured
+        """
+
+        if isinstance(phase,str):
+            phase = PHASES.index(phase)
+        count = self.counts[phase]
+        if not count:
+            return None
+        # upper bound of the bucket
+        return 2**self._bucket(self.histograms[phase],count,ratio)
+
+    def report(self):
+
+        """
+        Returns a table (string) with, for each phase, the number
+        of measures, the mean, the (approximated) median and 99th
+        percentile (in microseconds) and the share of the total step
+        time; followed by statistics on the number of contacts per step
+        """
+
+        lines = [("{:>14}"+" {:>10}"*5).format("phase","count","mean(us)",
+                                               "p50(us)","p99(us)","share(%)")]
+        step_total = self.totals[_STEP]
+        for phase,name in enumerate(PHASES):
+            count = self.counts[phase]
+            if not count:
+                continue
+            total = self.totals[phase]
+            share = 100.0*total/step_total if step_total else float("nan")
+            lines.append(("{:>14} {:>10}"+" {:>10.2f}"*4).format(
+                name,count,
+                total/count/1e3,
+                self.percentile(phase,0.5)/1e3,
+                self.percentile(phase,0.99)/1e3,
+                share))
+        nb_steps = sum(self.contacts_histogram)
+        if nb_steps:
+            nb_contacts = sum([ nb*count for nb,count
+                                in enumerate(self.contacts_histogram) ])
+            lines.append("contacts per step: mean {:.2f}, p50 {}, p99 {}, max {}".format(
+                nb_contacts/nb_steps,
+                self._bucket(self.contacts_histogram,nb_steps,0.5),
+                self._bucket(self.contacts_histogram,nb_steps,0.99),
+                max([ nb for nb,count in enumerate(self.contacts_histogram)
+                      if count ])))
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
@@ -0,0 +1,374 @@
+import multiprocessing,traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .batched_b2_world import BatchedB2World,BatchedWorldState
+from ..utils import arraytize
+
+
+# computes the offsets of the arrays of a batched world state
+# (and of the torques array) in a single shared memory block.
+# Returns a list of (attribute,shape,dtype,offset) and the total size
+def _shared_layout(nb_worlds,nb_robots,nb_balls):
+
+    layout = BatchedWorldState.layout(nb_worlds,nb_robots,nb_balls)
+    layout.append(("torques",(nb_worlds,nb_robots,3),np.float64))
+
+    offset = 0
+    shared = []
+    for attr,shape,dtype in layout:
+        shared.append((attr,shape,dtype,offset))
+        size = int(np.prod(shape))*np.dtype(dtype).itemsize
+        # keeping arrays aligned on 8 bytes
+        offset += size + (-size)%8
+
+    return shared,max(offset,8)
+
+
+# returns dict {attribute:array}, the arrays being views
+# on the shared memory buffer
+def _shared_arrays(buffer,layout):
+
+    return { attr:np.ndarray(shape,dtype=dtype,
+                             buffer=buffer,offset=offset)
+             for attr,shape,dtype,offset in layout }
+
+
+def _worker(index,
+            shm_name,
+            layout,
+            world_args,
+            seed,
+            pipe):
+
+    # runs in its own process: manages a single world which
+    # state (and torques) are the row 'index' of the shared arrays
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+
+        if seed is not None:
+            np.random.seed(seed)
+        else:
+            np.random.seed()
+
+        arrays = { attr:array[index:index+1]
+                   for attr,array in _shared_arrays(shm.buf,layout).items() }
+        torques = arrays.pop("torques")
+
+        (robot_configs,ball_configs,visible_area_width,
+         ball_guns,robot_reinits,
+         max_episode_time,max_floor_hits,
+         steps_per_sec,gravitational_acceleration,
+         vel_iters,pos_iters) = world_args
+
+        state = BatchedWorldState(1,
+                                  len(robot_configs),
+                                  len(ball_configs),
+                                  arrays=arrays)
+
+        world = BatchedB2World(1,
+                               robot_configs,
+                               ball_configs,
+                               visible_area_width,
+                               ball_guns=ball_guns,
+                               robot_reinits=robot_reinits,
+                               max_episode_time=max_episode_time,
+                               max_floor_hits=max_floor_hits,
+                               steps_per_sec=steps_per_sec,
+                               gravitational_acceleration=gravitational_acceleration,
+                               vel_iters=vel_iters,
+                               pos_iters=pos_iters,
+                               state=state)
+
+        pipe.send(None)
+
+        while True:
+
+            command,relative_torques = pipe.recv()
+
+            if command == "close":
+                break
+
+            try:
+                if command == "step":
+                    world.step(torques,relative_torques=relative_torques)
+                elif command == "reset":
+                    world.reset()
+                pipe.send(None)
+            except Exception:
+                pipe.send(traceback.format_exc())
+
+        del state,world,arrays,torques
+
+    except Exception:
+        pipe.send(traceback.format_exc())
+
+    finally:
+        pipe.close()
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+class SubprocessB2World:
+
+    """
+    Runs N worlds in N processes (one world per process).
+    As for :py:class:`roboball2d.physics.batched_b2_world.BatchedB2World`,
+    torques are passed as numpy arrays and states are returned as an instance
+    of :py:class:`roboball2d.physics.batched_b2_world.BatchedWorldState`.
+    The torques and the states are shared with the worker processes
+    via shared memory (:py:mod:`multiprocessing.shared_memory`), i.e. only
+    small commands are sent to the workers (no pickling of world states).
+
+    Stepping can be done in two stages: :py:meth:`step_async` sends the
+    torques to the workers and returns immediately, :py:meth:`step_wait`
+    waits for all workers to be done and returns the state.
+
+    :py:meth:`close` should be called once the instance is no longer used
+    (instances are also context managers), as it releases the shared memory.
+    """
+
+    __slots__=["_processes","_pipes","_shm",
+               "_state","_torques","_nb_robots",
+               "_waiting","_closed"]
+
+    def __init__(self,
+                 nb_worlds,
+                 robot_configs,
+                 ball_configs,
+                 visible_area_width,
+                 ball_guns=None,
+                 robot_reinits=None,
+                 max_episode_time=None,
+                 max_floor_hits=None,
+                 steps_per_sec=100.0,
+                 gravitational_acceleration=-8.0,
+                 vel_iters = 10,
+                 pos_iters = 8,
+                 seed = None,
+                 start_method = None):
+
+        """
+        Parameters
+        ----------
+
+        nb_worlds, robot_configs, ball_configs, visible_area_width,
+        ball_guns, robot_reinits, max_episode_time, max_floor_hits,
+        steps_per_sec, gravitational_acceleration, vel_iters, pos_iters:
+            see :py:class:`roboball2d.physics.batched_b2_world.BatchedB2World`.
+            Configurations, ball guns and robot states are sent to the workers,
+            so they must be picklable. Seeded ball guns (e.g. instances of
+            :py:class:`roboball2d.ball_gun.default_ball_gun.DefaultBallGun`
+            constructed with a seed) are spawned, each worker receiving its own
+            child ball gun (see DefaultBallGun.spawn), so that workers shoot
+            different but reproducible balls.
+
+        seed : `int`
+            if not None, the global numpy random generator of the worker
+            of index i is seeded with seed+i (otherwise it is seeded with fresh
+            entropy, so that ball guns do not shoot the same balls in all workers)
+
+        start_method : `str`
+            multiprocessing start method ("fork", "spawn", "forkserver"),
+            default method of the platform if None
+        """
+
+        robot_configs = arraytize(robot_configs)
+        ball_configs = arraytize(ball_configs)
+
+        self._nb_robots = len(robot_configs)
+        self._waiting = False
+        self._closed = False
+        self._processes = []
+        self._pipes = []
+
+        layout,size = _shared_layout(nb_worlds,
+                                     self._nb_robots,
+                                     len(ball_configs))
+        self._shm = shared_memory.SharedMemory(create=True,size=size)
+
+        arrays = _shared_arrays(self._shm.buf,layout)
+        self._torques = arrays.pop("torques")
+        self._torques.fill(0.0)
+        self._state = BatchedWorldState(nb_worlds,
+                                        self._nb_robots,
+                                        len(ball_configs),
+                                        arrays=arrays)
+        for attr in self._state.__slots__:
+            getattr(self._state,attr).fill(0)
+        self._state.balls_hits_floor.fill(np.nan)
+        self._state.balls_hits_racket.fill(-1)
+
+        # ball guns of each worker (seeded ball guns are spawned)
+        ball_guns = arraytize(ball_guns)
+        workers_ball_guns = [ ball_gun.spawn(nb_worlds)
+                              if getattr(ball_gun,"seeded",False)
+                              else [ball_gun]*nb_worlds
+                              for ball_gun in ball_guns ]
+
+        context = multiprocessing.get_context(start_method)
+
+        for index in range(nb_worlds):
+            world_args = (robot_configs,ball_configs,visible_area_width,
+                          [ guns[index] for guns in workers_ball_guns ] or None,
+                          robot_reinits,
+                          max_episode_time,max_floor_hits,
+                          steps_per_sec,gravitational_acceleration,
+                          vel_iters,pos_iters)
+            parent_pipe,child_pipe = context.Pipe()
+            process = context.Process(target=_worker,
+                                      args=(index,
+                                            self._shm.name,
+                                            layout,
+                                            world_args,
+                                            None if seed is None else seed+index,
+                                            child_pipe),
+                                      daemon=True)
+            process.start()
+            child_pipe.close()
+            self._processes.append(process)
+            self._pipes.append(parent_pipe)
+
+        # waiting for all workers to be ready
+        try:
+            self._wait()
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def nb_worlds(self):
+        return len(self._processes)
+
+    def _send(self,command,relative_torques=False):
+
+        for pipe in self._pipes:
+            pipe.send((command,relative_torques))
+        self._waiting = True
+
+    def _wait(self):
+
+        errors = [pipe.recv() for pipe in self._pipes]
+        self._waiting = False
+        errors = [error for error in errors if error is not None]
+        if errors:
+            raise Exception("SubprocessB2World, worker error:\n"+errors[0])
+
+    def reset(self):
+
+        """
+        Reset all worlds, see :py:meth:`roboball2d.physics.batched_b2_world.BatchedB2World.reset`.
+
+        Returns
+        -------
+
+        An instance of :py:class:`roboball2d.physics.batched_b2_world.BatchedWorldState`
+        (in shared memory, updated in place at each step)
+        """
+
+        if self._waiting:
+            self._wait()
+        self._send("reset")
+        self._wait()
+        return self._state
+
+    def step_async(self,
+                   torques,
+                   relative_torques=False):
+
+        """
+        Sends the torques to the workers and returns without
+        waiting for the workers to be done stepping.
+        See :py:meth:`roboball2d.physics.batched_b2_world.BatchedB2World.step`
+        for the arguments.
+        """
+
+        if self._waiting:
+            raise Exception("SubprocessB2World, step_async: "
+                            "step_wait should be called first")
+
+        if self._nb_robots:
+            self._torques[...] = np.reshape(torques,self._torques.shape)
+        self._send("step",relative_torques)
+
+    def step_wait(self):
+
+        """
+        Waits for the workers to be done stepping.
+
+        Returns
+        -------
+
+        An instance of :py:class:`roboball2d.physics.batched_b2_world.BatchedWorldState`
+        (in shared memory, updated in place at each step)
+        """
+
+        if not self._waiting:
+            raise Exception("SubprocessB2World, step_wait: "
+                            "step_async should be called first")
+
+        self._wait()
+        return self._state
+
+    def step(self,
+             torques,
+             relative_torques=False):
+
+        """
+        Calls :py:meth:`step_async` followed by :py:meth:`step_wait`
+        """
+
+        self.step_async(torques,relative_torques)
+        return self.step_wait()
+
+    def close(self, timeout=1.0):
+
+        """
+        Stops the worker processes and releases the shared memory.
+
+        Parameters
+        ----------
+
+        timeout : `float`
+            time (in seconds) each worker is given to finish its current
+            step and to exit, after which it is terminated
+        """
+
+        if self._closed:
+            return
+        self._closed = True
+
+        for pipe in self._pipes:
+            try:
+                if self._waiting and pipe.poll(timeout):
+                    pipe.recv()
+                pipe.send(("close",False))
+            except Exception:
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for pipe in self._pipes:
+            pipe.close()
+
+        self._state = None
+        self._torques = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # user code still holds views on the shared arrays
+            pass
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,3 +1,5 @@
+import numpy as np
+
 from ..item import Item
 from ..robot.robot_state import RobotState
 
@@ -31,6 +33,13 @@ class WorldState:
     applied_time_step: `float`
         duration of the time step applied (in seconds)
 
+    interpolation_alpha: `float`
+        if the world accumulates wall clock time (see the argument max_substeps of
+        :py:class:`roboball2d.physics.b2_world.B2World`), fraction (between 0 and 1)
+        of a time step which has elapsed but has not been simulated yet. Rendering
+        (1-alpha)*previous state + alpha*current state gives a smooth
+        motion. 0 otherwise.
+
     robots: 
         list of states of robots, 
         see :py:class:`roboball2d.robot.default_robot_state.DefaultRobotState`
@@ -57,10 +66,25 @@ class WorldState:
         list of index or None values, one per managed ball.
         None at a given index means the ball at this index did not hit any racket
         during the last simulation step. An integer gives the index of the robot
-        which racket the ball touched.
+        which racket the ball touched. Note: up to version 0.1.07, values were
+        True/False (changed in version 0.2.0). As the index of the first robot
+        is 0, hits should now be checked with "is not None" rather than by
+        truthiness.
 
     ball_hits_racket:
-        value at index 0 of balls_hits_racket
+        value at index 0 of balls_hits_racket (see above, check it with
+        "is not None")
+
+    balls_active:
+        list of bool values, one per managed ball. False at a given index
+        means the ball has been deactivated as out of play (see 
+        :py:class:`roboball2d.physics.play_area.PlayArea`): it is not simulated
+        anymore and its state is the one it had when deactivated.
+
+    contact_events:
+        None, or (if the world has been constructed with nb_contact_events > 0)
+        an instance of :py:class:`roboball2d.physics.contact_events.ContactEvents`
+        recording all contacts which started during the last step
 
     """
     
@@ -81,9 +105,10 @@ class WorldState:
                "robots","robot",
                "ball_config","ball_configs",
                "balls","ball",
-               "t","applied_time_step",
+               "t","applied_time_step","interpolation_alpha",
                "ball_hits_floor","balls_hits_floor",
-               "ball_hits_racket","balls_hits_racket"]
+               "ball_hits_racket","balls_hits_racket",
+               "balls_active","contact_events"]
         
     def __init__( self,
                   robot_configs,
@@ -110,12 +135,16 @@ class WorldState:
             self.robot = None
         self.t = None
         self.applied_time_step = None
+        self.interpolation_alpha = 0.0
         self.balls_hits_floor = [None for _
                                  in self.ball_configs]
         self.ball_hits_floor = None
-        self.balls_hits_racket = [False for _
+        self.balls_hits_racket = [None for _
                                   in self.ball_configs]
-        self.ball_hits_racket = False
+        self.ball_hits_racket = None
+        self.balls_active = [True for _
+                             in self.ball_configs]
+        self.contact_events = None
 
         
     def __str__(self):
@@ -123,3 +152,518 @@ class WorldState:
         values = [attr+": "+str(getattr(self,attr))
                   for attr in self.__slots__ ]
         return "world state:\n\t"+"\n\t".join(values)
+
+
+class _ItemView:
+
+    """
+    Read only view on the data of an item (ball, rod, racket or joint)
+    of an instance of :py:class:`ArrayWorldState`, providing the same
+    attributes as :py:class:`roboball2d.item.Item`. Vectors (position,
+    linear velocity and anchor) are returned as read only numpy views on the
+    buffer of the world state, i.e. they are updated in place at each step
+    (copy them to keep or modify their values).
+    """
+
+    __slots__=["_position","_angle",
+               "_linear_velocity","_angular_velocity",
+               "_torque","_desired_torque","_anchor"]
+
+    # each argument is either None (value of roboball2d.item.Item
+    # default) or a view on the world state buffer. Scalar values
+    # are views of size 1
+    def __init__(self,
+                 position=None,angle=None,
+                 linear_velocity=None,angular_velocity=None,
+                 torque=None,desired_torque=None,
+                 anchor=None):
+
+        self._position = self._read_only(position)
+        self._angle = angle
+        self._linear_velocity = self._read_only(linear_velocity)
+        self._angular_velocity = angular_velocity
+        self._torque = torque
+        self._desired_torque = desired_torque
+        self._anchor = self._read_only(anchor)
+
+    # (the buffer itself remains writable, only
+    # the view returned to the user is not)
+    @staticmethod
+    def _read_only(view):
+        if view is None:
+            return None
+        view = view.view()
+        view.flags.writeable = False
+        return view
+
+    @staticmethod
+    def _scalar(view,default):
+        if view is None:
+            return default
+        return float(view[0])
+
+    # for values which may not be set (nan in the buffer)
+    @staticmethod
+    def _optional(view,default):
+        if view is None:
+            return default
+        value = view[0]
+        if np.isnan(value):
+            return None
+        return float(value)
+
+    @property
+    def position(self):
+        if self._position is None:
+            return [0.0,0.0]
+        return self._position
+
+    @property
+    def angle(self):
+        return self._scalar(self._angle,0.0)
+
+    @property
+    def linear_velocity(self):
+        if self._linear_velocity is None:
+            return [0.0,0.0]
+        return self._linear_velocity
+
+    @property
+    def angular_velocity(self):
+        return self._scalar(self._angular_velocity,0.0)
+
+    @property
+    def torque(self):
+        return self._optional(self._torque,0.0)
+
+    @property
+    def desired_torque(self):
+        return self._optional(self._desired_torque,None)
+
+    @property
+    def anchor(self):
+        if self._anchor is None:
+            return 0.0
+        return self._anchor
+
+    def __str__(self):
+        attrs = ["position","angle",
+                 "linear_velocity","angular_velocity",
+                 "torque","desired_torque","anchor"]
+        return "\t\t"+"\n\t\t".join([attr+":\t"+str(getattr(self,attr))
+                                     for attr in attrs])
+
+
+class _BallsArrays:
+
+    """
+    Named views on the balls data of an :py:class:`ArrayWorldState`
+    (B: number of balls).
+    Indexing (or iterating over) an instance returns read only
+    views providing the attributes of :py:class:`roboball2d.item.Item`.
+
+    Attributes
+    ----------
+
+    position: (B,2) array
+
+    angle: (B,) array
+
+    linear_velocity: (B,2) array
+
+    angular_velocity: (B,) array
+
+    hits_floor: (B,) array
+        x position at which the ball hit the floor during the last step,
+        nan if the ball did not hit the floor
+
+    hits_racket: (B,) array
+        index of the robot which racket the ball hit during the 
+        last step, nan if the ball did not hit a racket (up to
+        version 0.1.07: 1 if the ball hit a racket, 0 otherwise)
+
+    active: (B,) array
+        1 for active balls, 0 for balls deactivated as out of play
+
+    """
+
+    __slots__=["position","angle",
+               "linear_velocity","angular_velocity",
+               "hits_floor","hits_racket","active","_items"]
+
+    def __init__(self,views):
+
+        for attr in self.__slots__[:-1]:
+            setattr(self,attr,views[attr])
+
+        self._items = [ _ItemView(position=self.position[index],
+                                  angle=self.angle[index:index+1],
+                                  linear_velocity=self.linear_velocity[index],
+                                  angular_velocity=self.angular_velocity[index:index+1])
+                        for index in range(len(self.angle)) ]
+
+    def __getitem__(self,index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class _RobotView:
+
+    """
+    Read only view on the data of a robot of an :py:class:`ArrayWorldState`,
+    providing the same attributes as
+    :py:class:`roboball2d.robot.default_robot_state.DefaultRobotState`
+    """
+
+    __slots__=["robot_config","rods","racket","joints",
+               "_robots","_index"]
+
+    def __init__(self,robot_config,robots,index):
+
+        self.robot_config = robot_config
+        self._robots = robots
+        self._index = index
+        r = index
+
+        self.rods = [ _ItemView(position=robots.rod_positions[r,i],
+                                angle=robots.rod_angles[r,i:i+1],
+                                linear_velocity=robots.rod_linear_velocities[r,i],
+                                angular_velocity=robots.rod_angular_velocities[r,i:i+1])
+                      for i in range(2) ]
+
+        self.racket = _ItemView(position=robots.racket_positions[r],
+                                angle=robots.racket_angles[r:r+1],
+                                linear_velocity=robots.racket_linear_velocities[r],
+                                angular_velocity=robots.racket_angular_velocities[r:r+1])
+
+        self.joints = [ _ItemView(angle=robots.joint_angles[r,j:j+1],
+                                  angular_velocity=robots.joint_angular_velocities[r,j:j+1],
+                                  torque=robots.joint_torques[r,j:j+1],
+                                  desired_torque=robots.joint_desired_torques[r,j:j+1],
+                                  anchor=robots.joint_anchors[r,j])
+                        for j in range(3) ]
+
+    @property
+    def angles(self):
+        return self._robots.joint_angles[self._index]
+
+    @property
+    def angular_velocities(self):
+        return self._robots.joint_angular_velocities[self._index]
+
+    def render(self, color = None, z_coordinate = None):
+        from ..robot.default_robot_state import DefaultRobotState
+        DefaultRobotState.render(self,color,z_coordinate)
+
+    def __str__(self):
+        from ..robot.default_robot_state import DefaultRobotState
+        return DefaultRobotState.__str__(self)
+
+
+class _RobotsArrays:
+
+    """
+    Named views on the robots data of an :py:class:`ArrayWorldState`
+    (R: number of robots). Robots are expected to be 3 dofs robots
+    (2 rods and a racket, see 
+    :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`).
+    Indexing (or iterating over) an instance returns read only
+    views providing the attributes of 
+    :py:class:`roboball2d.robot.default_robot_state.DefaultRobotState`.
+
+    Attributes
+    ----------
+
+    joint_angles: (R,3) array
+
+    joint_angular_velocities: (R,3) array
+
+    joint_torques: (R,3) array
+        measured torques
+
+    joint_desired_torques: (R,3) array
+        applied torques (nan if not set yet)
+
+    joint_anchors: (R,3,2) array
+
+    rod_positions: (R,2,2) array
+
+    rod_angles: (R,2) array
+
+    rod_linear_velocities: (R,2,2) array
+
+    rod_angular_velocities: (R,2) array
+
+    racket_positions: (R,2) array
+
+    racket_angles: (R,) array
+
+    racket_linear_velocities: (R,2) array
+
+    racket_angular_velocities: (R,) array
+
+    """
+
+    __slots__=["joint_angles","joint_angular_velocities",
+               "joint_torques","joint_desired_torques","joint_anchors",
+               "rod_positions","rod_angles",
+               "rod_linear_velocities","rod_angular_velocities",
+               "racket_positions","racket_angles",
+               "racket_linear_velocities","racket_angular_velocities",
+               "_robots"]
+
+    def __init__(self,views,robot_configs):
+
+        for attr in self.__slots__[:-1]:
+            setattr(self,attr,views[attr])
+
+        self._robots = [ _RobotView(robot_config,self,index)
+                         for index,robot_config in enumerate(robot_configs) ]
+
+    def __getitem__(self,index):
+        return self._robots[index]
+
+    def __len__(self):
+        return len(self._robots)
+
+    def __iter__(self):
+        return iter(self._robots)
+
+
+class ArrayWorldState:
+
+    """
+    Array backed alternative to :py:class:`WorldState`, returned by
+    :py:class:`roboball2d.physics.b2_world.B2World` when constructed with
+    `world_state_mode="arrays"`. All the values are stored in a single
+    preallocated numpy buffer (attribute `buffer`) which is refilled in place
+    by the world at each step, i.e. the same instance is returned at each
+    step (see :py:meth:`copy` to keep values over several steps).
+
+    The data are accessible via named numpy views, e.g.
+    `balls.position` ((B,2) array) or `robots.joint_angles` ((R,3) array),
+    see :py:class:`_BallsArrays` and :py:class:`_RobotsArrays`.
+    For compatibility, the attributes of :py:class:`WorldState` are
+    also provided (as read only accessors), e.g. `ball.position`,
+    `robot.joints[0].angle` or `ball_hits_floor`.
+
+    Attributes
+    ----------
+
+    buffer:
+        1d numpy array storing all values
+
+    balls:
+        named views on the balls values, also a sequence of
+        read only ball items
+
+    robots:
+        named views on the robots values, also a sequence of
+        read only robot states
+
+    t: `float`
+        current simulation time (in seconds)
+
+    applied_time_step: `float`
+        duration of the time step applied (in seconds)
+
+    interpolation_alpha: `float`
+        see :py:class:`WorldState`
+
+    contact_events:
+        None, or the instance of 
+        :py:class:`roboball2d.physics.contact_events.ContactEvents` of the
+        world (refilled in place at each step)
+
+    robot_configs, robot_config, ball_configs, ball_config, robot, ball,
+    balls_hits_floor, ball_hits_floor, balls_hits_racket, ball_hits_racket,
+    balls_active:
+        see :py:class:`WorldState`
+
+    """
+
+    __slots__=["robot_config","robot_configs",
+               "ball_config","ball_configs",
+               "buffer","balls","robots","contact_events","_time"]
+
+    @staticmethod
+    def layout(nb_robots,nb_balls):
+
+        """
+        Returns the list of tuples (attribute, shape) of all arrays
+        stored in the buffer (in order) and the size of the buffer.
+        """
+
+        r,b = nb_robots,nb_balls
+        layout = [ ("time",(3,)),
+                   ("position",(b,2)),
+                   ("angle",(b,)),
+                   ("linear_velocity",(b,2)),
+                   ("angular_velocity",(b,)),
+                   ("hits_floor",(b,)),
+                   ("hits_racket",(b,)),
+                   ("active",(b,)),
+                   ("joint_angles",(r,3)),
+                   ("joint_angular_velocities",(r,3)),
+                   ("joint_torques",(r,3)),
+                   ("joint_desired_torques",(r,3)),
+                   ("joint_anchors",(r,3,2)),
+                   ("rod_positions",(r,2,2)),
+                   ("rod_angles",(r,2)),
+                   ("rod_linear_velocities",(r,2,2)),
+                   ("rod_angular_velocities",(r,2)),
+                   ("racket_positions",(r,2)),
+                   ("racket_angles",(r,)),
+                   ("racket_linear_velocities",(r,2)),
+                   ("racket_angular_velocities",(r,)) ]
+        size = sum([ int(np.prod(shape)) for _,shape in layout ])
+        return layout,size
+
+    def __init__( self,
+                  robot_configs,
+                  ball_configs,
+                  dtype=np.float64,
+                  buffer=None ):
+
+        """
+        Parameters
+        ----------
+
+        robot_configs, ball_configs:
+            see :py:class:`WorldState`
+
+        dtype:
+            numpy dtype of the buffer (np.float64 or np.float32)
+
+        buffer:
+            if not None, 1d numpy array of suitable size
+            (see :py:meth:`layout`) to use as buffer
+        """
+
+        self.robot_config,self.robot_configs = WorldState._arraytize(robot_configs)
+        self.ball_config,self.ball_configs = WorldState._arraytize(ball_configs)
+
+        layout,size = self.layout(len(self.robot_configs),
+                                  len(self.ball_configs))
+
+        if buffer is None:
+            buffer = np.zeros(size,dtype=dtype)
+            init = True
+        else:
+            init = False
+        if buffer.shape != (size,):
+            raise Exception("ArrayWorldState: buffer of shape",buffer.shape,
+                            "but",size,"values expected")
+        self.buffer = buffer
+
+        views = {}
+        offset = 0
+        for attr,shape in layout:
+            nb_values = int(np.prod(shape))
+            views[attr] = buffer[offset:offset+nb_values].reshape(shape)
+            offset += nb_values
+
+        if init:
+            views["hits_floor"].fill(np.nan)
+            views["hits_racket"].fill(np.nan)
+            views["active"].fill(1.0)
+            views["joint_desired_torques"].fill(np.nan)
+
+        self._time = views["time"]
+        self.contact_events = None
+        self.balls = _BallsArrays(views)
+        self.robots = _RobotsArrays(views,self.robot_configs)
+
+    @property
+    def t(self):
+        return float(self._time[0])
+
+    @property
+    def applied_time_step(self):
+        return float(self._time[1])
+
+    @property
+    def interpolation_alpha(self):
+        return float(self._time[2])
+
+    @property
+    def ball(self):
+        try:
+            return self.balls[0]
+        except IndexError:
+            return None
+
+    @property
+    def robot(self):
+        try:
+            return self.robots[0]
+        except IndexError:
+            return None
+
+    @property
+    def balls_hits_floor(self):
+        return [None if np.isnan(x) else float(x)
+                for x in self.balls.hits_floor]
+
+    @property
+    def ball_hits_floor(self):
+        if not len(self.balls):
+            return None
+        x = self.balls.hits_floor[0]
+        return None if np.isnan(x) else float(x)
+
+    @property
+    def balls_hits_racket(self):
+        return [None if np.isnan(index) else int(index)
+                for index in self.balls.hits_racket]
+
+    @property
+    def ball_hits_racket(self):
+        if not len(self.balls):
+            return None
+        index = self.balls.hits_racket[0]
+        return None if np.isnan(index) else int(index)
+
+    @property
+    def balls_active(self):
+        return [bool(active) for active in self.balls.active]
+
+    def copy(self):
+
+        """
+        Returns a new instance with a copy of the buffer
+        """
+
+        state = ArrayWorldState(self.robot_configs,
+                                self.ball_configs,
+                                buffer=self.buffer.copy())
+        if self.contact_events is not None:
+            state.contact_events = self.contact_events.copy()
+        return state
+
+    def __reduce__(self):
+        contact_events = None
+        if self.contact_events is not None:
+            contact_events = self.contact_events.copy()
+        return (ArrayWorldState,
+                (self.robot_configs,self.ball_configs,
+                 self.buffer.dtype,self.buffer.copy()),
+                {"contact_events":contact_events})
+
+    def __setstate__(self,state):
+        self.contact_events = state["contact_events"]
+
+    def __str__(self):
+
+        attrs = ["robot_configs","robots",
+                 "ball_configs","balls",
+                 "t","applied_time_step","interpolation_alpha",
+                 "balls_hits_floor","balls_hits_racket","balls_active"]
+        values = [attr+": "+str(getattr(self,attr))
+                  for attr in attrs ]
+        return "world state:\n\t"+"\n\t".join(values)
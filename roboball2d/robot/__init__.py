@@ -4,3 +4,9 @@ from roboball2d.robot.robot_state import RobotState
 from roboball2d.robot.default_robot_state import DefaultRobotState
 from roboball2d.robot.pd_controller import PDController
 
+from roboball2d.robot.kinematics import Kinematics
+from roboball2d.robot.kinematics import forward_kinematics
+from roboball2d.robot.kinematics import inverse_kinematics
+from roboball2d.robot.kinematics import best_solutions
+from roboball2d.robot.kinematics import InverseKinematics
+from roboball2d.robot.reachability_map import ReachabilityMap
@@ -4,6 +4,7 @@ import numpy as np
 
 from ..item import Item
 from .robot_state import RobotState
+from .kinematics import forward_kinematics
 
 try :
     import pyglet.gl as gl
@@ -136,6 +137,93 @@ class DefaultRobotState(RobotState):
 
             counter += 1
 
+    @classmethod
+    def from_kinematics(cls, robot_config, kinematics, index=0):
+
+        """
+        Returns a robot state which items are set from the values
+        computed by :py:func:`roboball2d.robot.kinematics.forward_kinematics`
+        (i.e. without computing the kinematics again)
+
+        Parameters
+        ----------
+
+        robot_config:
+            configuration used to compute the kinematics
+
+        kinematics:
+            instance of :py:class:`roboball2d.robot.kinematics.Kinematics`
+
+        index: `int`
+            index of the robot in kinematics
+        """
+
+        return cls._from_lists(robot_config,
+                               kinematics.joint_angles[index].tolist(),
+                               kinematics.joint_angular_velocities[index].tolist(),
+                               kinematics.anchors[index].tolist(),
+                               kinematics.positions[index].tolist(),
+                               kinematics.angles[index].tolist(),
+                               kinematics.linear_velocities[index].tolist(),
+                               kinematics.angular_velocities[index].tolist())
+
+    @classmethod
+    def batch(cls, robot_config, generalized_coordinates,
+              generalized_velocities = None):
+
+        """
+        Returns a list of N robot states, the kinematics of which being
+        computed at once by :py:func:`roboball2d.robot.kinematics.forward_kinematics`
+
+        Parameters
+        ----------
+
+        robot_config:
+            configuration of the robots
+
+        generalized_coordinates: (N,3) array
+            angles of the joints
+
+        generalized_velocities: (N,3) array
+            angular velocities of the joints (zeros if None)
+        """
+
+        kinematics = forward_kinematics(robot_config,
+                                        generalized_coordinates,
+                                        generalized_velocities)
+        # one conversion to lists for all robots
+        values = zip(kinematics.joint_angles.tolist(),
+                     kinematics.joint_angular_velocities.tolist(),
+                     kinematics.anchors.tolist(),
+                     kinematics.positions.tolist(),
+                     kinematics.angles.tolist(),
+                     kinematics.linear_velocities.tolist(),
+                     kinematics.angular_velocities.tolist())
+        return [ cls._from_lists(robot_config,*robot_values)
+                 for robot_values in values ]
+
+    @classmethod
+    def _from_lists(cls, robot_config, joint_angles, joint_angular_velocities,
+                    anchors, positions, angles, linear_velocities,
+                    angular_velocities):
+
+        state = cls.__new__(cls)
+        state.robot_config = robot_config
+        state.angles = joint_angles
+        state.angular_velocities = joint_angular_velocities
+        state.rods = [Item() for _ in range(2)]
+        state.racket = Item()
+        state.joints = [Item() for _ in range(3)]
+        for item,joint,anchor,position,angle,linear_velocity,angular_velocity \
+                in zip(state.rods+[state.racket],state.joints,anchors,positions,
+                       angles,linear_velocities,angular_velocities):
+            joint.anchor = anchor
+            item.position = position
+            item.angle = angle
+            item.linear_velocity = linear_velocity
+            item.angular_velocity = angular_velocity
+        return state
+
     def render(self, color = None, z_coordinate = None):
         from ..rendering.pyglet_utils import draw_rod, draw_racket, draw_circle_sector
 
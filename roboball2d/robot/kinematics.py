@@ -0,0 +1,410 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class Kinematics:
+
+    """
+    Poses and velocities of the parts (2 rods and the racket) of N robots
+    configured by the same :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`,
+    as computed by :py:func:`roboball2d.robot.kinematics.forward_kinematics`.
+    Parts are ordered as the joints: first rod, second rod, racket.
+    Arrays are allocated once: an instance may be passed back to
+    forward_kinematics (argument out) to be refilled in place.
+
+    Attributes
+    ----------
+
+    joint_angles: (N,3) array
+        angles of the joints (in radian)
+
+    joint_angular_velocities: (N,3) array
+        angular velocities of the joints (in radian per second)
+
+    anchors: (N,3,2) array
+        position of each joint
+
+    anchor_velocities: (N,3,2) array
+        linear velocity of each joint
+
+    positions: (N,3,2) array
+        position of the center of each part
+
+    angles: (N,3) array
+        angle of each part (in radian)
+
+    linear_velocities: (N,3,2) array
+        linear velocity of the center of each part
+
+    angular_velocities: (N,3) array
+        angular velocity of each part (in radian per second)
+
+    """
+
+    __slots__=["joint_angles","joint_angular_velocities",
+               "anchors","anchor_velocities",
+               "positions","angles",
+               "linear_velocities","angular_velocities"]
+
+    def __init__(self, nb_robots):
+
+        """
+        Parameters
+        ----------
+
+        nb_robots: `int`
+            N, number of robots (arrays are set to zero)
+        """
+
+        self.joint_angles = np.zeros((nb_robots,3))
+        self.joint_angular_velocities = np.zeros((nb_robots,3))
+        self.anchors = np.zeros((nb_robots,3,2))
+        self.anchor_velocities = np.zeros((nb_robots,3,2))
+        self.positions = np.zeros((nb_robots,3,2))
+        self.angles = np.zeros((nb_robots,3))
+        self.linear_velocities = np.zeros((nb_robots,3,2))
+        self.angular_velocities = np.zeros((nb_robots,3))
+
+    def __len__(self):
+        return len(self.joint_angles)
+
+    def __str__(self):
+        return ("kinematics ("+str(len(self))+" robots):\n\tracket positions: "+
+                str(self.positions[:,2].tolist()))
+
+
+def forward_kinematics(robot_config,
+                       joint_angles,
+                       joint_angular_velocities=None,
+                       out=None):
+
+    """
+    Computes the poses and velocities of the rods and racket of N robots at
+    once (vectorized), using the geometry of the robot configuration
+    (position, rod_length, racket_thickness). Values are the same as the
+    ones computed by :py:class:`roboball2d.robot.default_robot_state.DefaultRobotState`
+    (see :py:meth:`roboball2d.robot.default_robot_state.DefaultRobotState.from_kinematics`).
+
+    Parameters
+    ----------
+
+    robot_config:
+        instance of :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`
+
+    joint_angles: (N,3) array
+        angles of the joints (in radian)
+
+    joint_angular_velocities: (N,3) array
+        angular velocities of the joints (zeros if None)
+
+    out:
+        instance of :py:class:`Kinematics` of N robots, refilled in place.
+        If None, a new instance is returned.
+
+    Returns
+    -------
+
+    instance of :py:class:`Kinematics`
+    """
+
+    joint_angles = np.asarray(joint_angles,dtype=float).reshape(-1,3)
+    nb_robots = joint_angles.shape[0]
+    if out is None:
+        out = Kinematics(nb_robots)
+    elif len(out) != nb_robots:
+        raise Exception("forward_kinematics: out for",len(out),
+                        "robots but",nb_robots,"joint angles")
+
+    out.joint_angles[:] = joint_angles
+    if joint_angular_velocities is None:
+        out.joint_angular_velocities.fill(0.0)
+    else:
+        out.joint_angular_velocities[:] = np.reshape(joint_angular_velocities,(-1,3))
+
+    # each joint adds its angle (and angular velocity)
+    # to the ones of the previous part
+    np.cumsum(out.joint_angles,axis=1,out=out.angles)
+    np.cumsum(out.joint_angular_velocities,axis=1,out=out.angular_velocities)
+
+    half_lengths = 0.5*np.array([robot_config.rod_length,
+                                 robot_config.rod_length,
+                                 robot_config.racket_thickness])
+    sin = np.sin(out.angles)
+    cos = np.cos(out.angles)
+
+    # from a joint to the center of its part (and from the
+    # center to the next joint): half length along the part
+    half_part = np.empty((nb_robots,3,2))
+    half_part[:,:,0] = -half_lengths*sin
+    half_part[:,:,1] = half_lengths*cos
+    # derivative: angular velocity times the
+    # half part rotated by 90 degrees
+    half_velocity = np.empty((nb_robots,3,2))
+    half_velocity[:,:,0] = -half_part[:,:,1]*out.angular_velocities
+    half_velocity[:,:,1] = half_part[:,:,0]*out.angular_velocities
+
+    out.anchors[:,0,0] = robot_config.position
+    out.anchors[:,0,1] = 0.0
+    np.cumsum(2.0*half_part[:,:2],axis=1,out=out.anchors[:,1:])
+    out.anchors[:,1:,0] += robot_config.position
+    np.add(out.anchors,half_part,out=out.positions)
+
+    out.anchor_velocities[:,0] = 0.0
+    np.cumsum(2.0*half_velocity[:,:2],axis=1,out=out.anchor_velocities[:,1:])
+    np.add(out.anchor_velocities,half_velocity,out=out.linear_velocities)
+
+    return out
+
+
+def _wrap(angles):
+    # angles in [-pi,pi)
+    return np.mod(angles+np.pi,2.0*np.pi)-np.pi
+
+
+def inverse_kinematics(robot_config, targets):
+
+    """
+    Computes (vectorized) the joint angles placing the center of the racket of
+    a robot at the target positions, with the target racket angles (as the
+    attributes position and angle of the racket of
+    :py:class:`roboball2d.robot.default_robot_state.DefaultRobotState`).
+    For a reachable target, the 3 dof chain has two solutions ("elbow"
+    to the left or to the right), which are valid if all joint angles are
+    within the joint limits of the configuration (rod_joint_limit and
+    racket_joint_limit).
+
+    Parameters
+    ----------
+
+    robot_config:
+        instance of :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`
+
+    targets: (N,3) array
+        x, y and angle (in radian) of the racket
+
+    Returns
+    -------
+
+    solutions: (N,2,3) array
+        joint angles of the two solutions of each target (nan
+        if the target is out of reach)
+
+    valid: (N,2) array of bool
+        True if the solution is reachable and within the joint limits
+    """
+
+    targets = np.asarray(targets,dtype=float).reshape(-1,3)
+    rod_length = robot_config.rod_length
+    half_racket = 0.5*robot_config.racket_thickness
+
+    # position of the racket joint
+    angle = targets[:,2]
+    wrist_x = targets[:,0] + half_racket*np.sin(angle) - robot_config.position
+    wrist_y = targets[:,1] - half_racket*np.cos(angle)
+
+    # two links of same length: the elbow is at half distance to the
+    # wrist, moved sideways. Angles of parts are measured from the
+    # vertical (see forward_kinematics)
+    distance = np.hypot(wrist_x,wrist_y)
+    direction = np.arctan2(-wrist_x,wrist_y)
+    with np.errstate(invalid="ignore"):
+        elbow = np.arccos(distance/(2.0*rod_length))
+
+    solutions = np.empty((len(targets),2,3))
+    for index,sign in enumerate((1.0,-1.0)):
+        first = direction + sign*elbow
+        second = direction - sign*elbow
+        solutions[:,index,0] = _wrap(first)
+        solutions[:,index,1] = _wrap(second-first)
+        solutions[:,index,2] = _wrap(angle-second)
+
+    limits = np.array([robot_config.rod_joint_limit,
+                       robot_config.rod_joint_limit,
+                       robot_config.racket_joint_limit])
+    with np.errstate(invalid="ignore"):
+        valid = (np.abs(solutions) <= limits).all(axis=2)
+    return solutions,valid
+
+
+def best_solutions(solutions, valid, references=None):
+
+    """
+    Selects, for each target, the valid solution closest (euclidean distance
+    in the joint space) to the reference joint angles.
+
+    Parameters
+    ----------
+
+    solutions, valid:
+        as returned by :py:func:`inverse_kinematics`
+
+    references: (N,3) or (3,) array
+        e.g. the current joint angles (zeros if None)
+
+    Returns
+    -------
+
+    joint_angles: (N,3) array
+        best solution of each target (nan if no valid solution)
+
+    valid: (N,) array of bool
+        True if the target has a valid solution
+    """
+
+    if references is None:
+        references = np.zeros(3)
+    references = np.asarray(references,dtype=float).reshape(-1,1,3)
+    distances = ((solutions-references)**2).sum(axis=2)
+    distances[~valid] = np.inf
+    best = np.argmin(distances,axis=1)
+    joint_angles = solutions[np.arange(len(solutions)),best]
+    found = valid.any(axis=1)
+    joint_angles[~found] = np.nan
+    return joint_angles,found
+
+
+class InverseKinematics:
+
+    """
+    Batched inverse kinematics (see :py:func:`inverse_kinematics`) with a
+    cache of the solutions, for control loops querying repeatedly the same
+    (or close) targets. Targets are quantized (rounded to the resolution):
+    targets rounding to the same values share the solutions of the first
+    of them which was computed. The cache keeps the cache_size last used
+    targets (least recently used targets are removed first).
+
+    Attributes
+    ----------
+
+    robot_config:
+        instance of :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`
+
+    resolution: (3,) array
+        quantization of x, y and angle of the targets
+
+    cache_size: `int`
+        max number of targets in the cache (0: no cache)
+
+    hits: `int`
+        number of targets found in the cache
+
+    misses: `int`
+        number of targets computed
+
+    """
+
+    __slots__=["robot_config","resolution","cache_size",
+               "hits","misses","_cache"]
+
+    def __init__(self, robot_config, resolution=(1e-3,1e-3,1e-3),
+                 cache_size=4096):
+
+        """
+        Parameters
+        ----------
+
+        robot_config:
+            instance of :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`
+
+        resolution: `float` or (3,) array
+            quantization of x, y (in meters) and angle (in radian) of the targets
+
+        cache_size: `int`
+            max number of targets in the cache (0: no cache)
+        """
+
+        self.robot_config = robot_config
+        self.resolution = np.broadcast_to(np.asarray(resolution,dtype=float),(3,)).copy()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def clear(self):
+        """
+        Empties the cache (required if the robot configuration is changed)
+        """
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def solve_all(self, targets):
+
+        """
+        Same as :py:func:`inverse_kinematics`, using the cache
+        """
+
+        targets = np.asarray(targets,dtype=float).reshape(-1,3)
+        if self.cache_size <= 0:
+            self.misses += len(targets)
+            return inverse_kinematics(self.robot_config,targets)
+
+        keys = [ tuple(key) for key in
+                 np.round(targets/self.resolution).astype(np.int64).tolist() ]
+        solutions = np.empty((len(targets),2,3))
+        valid = np.empty((len(targets),2),dtype=bool)
+
+        # targets not in the cache (first index of each key)
+        missing = OrderedDict()
+        for index,key in enumerate(keys):
+            cached = self._cache.get(key)
+            if cached is None:
+                missing.setdefault(key,index)
+            else:
+                self._cache.move_to_end(key)
+                solutions[index],valid[index] = cached
+                self.hits += 1
+
+        if missing:
+            computed,computed_valid = inverse_kinematics(self.robot_config,
+                                                         targets[list(missing.values())])
+            self.misses += len(missing)
+            rows = {}
+            for row,key in enumerate(missing.keys()):
+                self._cache[key] = (computed[row],computed_valid[row])
+                rows[key] = row
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            # (including targets sharing their key with a computed target)
+            for index,key in enumerate(keys):
+                row = rows.get(key)
+                if row is not None:
+                    solutions[index] = computed[row]
+                    valid[index] = computed_valid[row]
+        return solutions,valid
+
+    def solve(self, targets, references=None):
+
+        """
+        Returns the best solution of each target (see :py:func:`best_solutions`),
+        using the cache
+
+        Parameters
+        ----------
+
+        targets: (N,3) array
+            x, y and angle (in radian) of the racket
+
+        references: (N,3) or (3,) array
+            e.g. the current joint angles (zeros if None)
+
+        Returns
+        -------
+
+        joint_angles: (N,3) array
+            best solution of each target (nan if no valid solution)
+
+        valid: (N,) array of bool
+            True if the target has a valid solution
+        """
+
+        solutions,valid = self.solve_all(targets)
+        return best_solutions(solutions,valid,references)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __str__(self):
+        return ("inverse kinematics ("+str(len(self._cache))+" cached targets, "+
+                str(self.hits)+" hits, "+str(self.misses)+" misses)")
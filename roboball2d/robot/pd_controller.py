@@ -1,15 +1,22 @@
 
 
+import numpy as np
+
+
 class PDController:
 
     """
     
     PDController : a simple PD controller for 3dofs robot 
+
+    :py:meth:`get` computes the torques of one robot, :py:meth:`get_batch`
+    the ones of N robots (e.g. of N environments) at once. For get_batch,
+    the gains may also be given per robot, as (N,3) arrays.
     
     """
 
     
-    __slots__=["_kp","_kd"]
+    __slots__=["_kp","_kd","_kp_array","_kd_array","_buffer"]
     
     def __init__(self,
                  kp=[2.0,1.0,0.5],
@@ -22,10 +29,18 @@ class PDController:
 
             kd (3d array of floats) : 
                  derivative gains
+
+            (or (N,3) arrays of floats: gains of each of N robots,
+            used only by get_batch)
         """
 
         self._kp = kp
         self._kd = kd
+        self._kp_array = np.asarray(kp,dtype=float)
+        self._kd_array = np.asarray(kd,dtype=float)
+        # derivative terms of get_batch (reused
+        # as long as the number of robots does not change)
+        self._buffer = None
 
     def get(self,
             references,
@@ -65,4 +80,54 @@ class PDController:
                         references,
                         angles,angular_velocities))
 
-    
+    def get_batch(self,
+                  references,
+                  angles,
+                  angular_velocities,
+                  out=None,
+                  max_torques=None):
+        """
+        Same as :py:meth:`get`, for N robots at once
+
+        Parameters
+        ----------
+
+        references: 
+            (N,3) array of desired angle values
+
+        angles: 
+            (N,3) array of current angle values
+
+        angular_velocities: 
+            (N,3) array of current angular velocities
+
+        out:
+            (N,3) float array the torques are written to (a new
+            float64 array is returned if None)
+
+        max_torques:
+            if not None, (3,) or (N,3) array: torques are clipped
+            to [-max_torques,max_torques] (e.g. the max_torques
+            of :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`)
+
+        Returns
+        -------
+
+        a (N,3) array of torques (out, if not None)
+        
+        """
+
+        if out is None:
+            out = np.subtract(references,angles,dtype=np.float64)
+        else:
+            np.subtract(references,angles,out=out)
+        out *= self._kp_array
+        buffer = self._buffer
+        if buffer is None or buffer.shape != out.shape:
+            buffer = self._buffer = np.empty(out.shape)
+        np.multiply(self._kd_array,angular_velocities,out=buffer)
+        out -= buffer
+        if max_torques is not None:
+            max_torques = np.asarray(max_torques,dtype=float)
+            np.clip(out,-max_torques,max_torques,out=out)
+        return out
@@ -0,0 +1,261 @@
+import hashlib,json,math,os
+
+import numpy as np
+
+from .kinematics import inverse_kinematics,best_solutions
+
+
+# attributes of the robot configuration the map depends on
+_GEOMETRY = ("position","rod_length","racket_thickness",
+             "rod_joint_limit","racket_joint_limit")
+
+
+class ReachabilityMap:
+
+    """
+    Dense grid over the racket poses (x, y, angle) of a robot, telling for
+    each cell whether the center of the racket can be placed at the center of
+    the cell with the angle of the cell (within the joint limits) and, if so,
+    the minimal effort joint angles doing it (the solution of
+    :py:func:`roboball2d.robot.kinematics.inverse_kinematics` closest to
+    zero joint angles).
+
+    Maps are computed once (see :py:meth:`build`) and saved as .npy files
+    (joint angles, float32, nan for unreachable cells) which are memory
+    mapped when loaded: opening a map costs no loading, and queries
+    (:py:meth:`reachable`, :py:meth:`joint_angles`) read only the
+    queried cells. See :py:meth:`get` to reuse the map of a robot
+    configuration (maps are keyed by a hash of the configuration and grid).
+
+    Queries are answered with the nearest cell: x and y values out of the
+    grid are unreachable, angles are wrapped to [-pi,pi).
+
+    e.g.::
+
+        reachability = ReachabilityMap.get(DefaultRobotConfig(),"/tmp/maps")
+        reachable = reachability.reachable(xs,ys,angles)
+
+    Attributes
+    ----------
+
+    key: `str`
+        hash of the robot configuration and of the grid
+
+    joint_angles_grid: (X,Y,A,3) array
+        joint angles of each cell (memory mapped, read only)
+
+    x_range, y_range: `tuple`
+        (min,max) values of the centers of the cells
+
+    """
+
+    __slots__=["key","joint_angles_grid","x_range","y_range",
+               "_origin","_steps","_shape"]
+
+    def __init__(self, path):
+
+        """
+        Loads (memory maps) a map created by :py:meth:`build`
+
+        Parameters
+        ----------
+
+        path: `str`
+            path to the .npy file of the map
+        """
+
+        self.joint_angles_grid = np.load(path,mmap_mode="r")
+        with open(self._meta_path(path)) as f:
+            meta = json.load(f)
+        self.key = meta["key"]
+        self.x_range = tuple(meta["x_range"])
+        self.y_range = tuple(meta["y_range"])
+        self._shape = np.array(self.joint_angles_grid.shape[:3])
+        self._origin,self._steps = self._grid(self.x_range,self.y_range,
+                                              self._shape)
+
+    @staticmethod
+    def _meta_path(path):
+        return os.path.splitext(path)[0]+".json"
+
+    @staticmethod
+    def _grid(x_range, y_range, shape):
+        # first cell center and step of each axis (the
+        # angle axis covers [-pi,pi), with no end point)
+        def _step(value_range,nb):
+            return (value_range[1]-value_range[0])/max(nb-1,1)
+        origin = np.array([x_range[0],y_range[0],-math.pi])
+        steps = np.array([_step(x_range,shape[0]),
+                          _step(y_range,shape[1]),
+                          2.0*math.pi/shape[2]])
+        return origin,steps
+
+    @staticmethod
+    def default_ranges(robot_config):
+
+        """
+        Returns the x and y ranges covering the positions the center
+        of the racket can reach (above the ground)
+        """
+
+        reach = 2.0*robot_config.rod_length + 0.5*robot_config.racket_thickness
+        return ((robot_config.position-reach,robot_config.position+reach),
+                (0.0,reach))
+
+    @staticmethod
+    def config_key(robot_config, shape, x_range, y_range):
+
+        """
+        Returns the hash (hexadecimal string) of the values of
+        the robot configuration and of the grid the map depends on
+        """
+
+        values = [ float(getattr(robot_config,attribute))
+                   for attribute in _GEOMETRY ]
+        values += [ int(nb) for nb in shape ]
+        values += [ float(value) for value in tuple(x_range)+tuple(y_range) ]
+        return hashlib.sha1(json.dumps(values).encode()).hexdigest()
+
+    @classmethod
+    def build(cls, path, robot_config, shape=(121,61,72),
+              x_range=None, y_range=None, batch_size=100000):
+
+        """
+        Computes (batched inverse kinematics of the centers of all cells)
+        and saves the map.
+
+        Parameters
+        ----------
+
+        path: `str`
+            path of the .npy file to create (a .json file is created
+            in the same folder, with the same name)
+
+        robot_config:
+            instance of :py:class:`roboball2d.robot.default_robot_config.DefaultRobotConfig`
+
+        shape: `tuple`
+            number of cells along x, y and angle
+
+        x_range, y_range: `tuple`
+            (min,max) values of the centers of the cells,
+            see :py:meth:`default_ranges` for the default values
+
+        batch_size: `int`
+            number of cells computed at once
+
+        Returns
+        -------
+
+        the map (instance of :py:class:`ReachabilityMap`)
+        """
+
+        default_x_range,default_y_range = cls.default_ranges(robot_config)
+        x_range = tuple(default_x_range if x_range is None else x_range)
+        y_range = tuple(default_y_range if y_range is None else y_range)
+        shape = tuple([int(nb) for nb in shape])
+        origin,steps = cls._grid(x_range,y_range,shape)
+
+        grid = np.lib.format.open_memmap(path,mode="w+",dtype=np.float32,
+                                         shape=shape+(3,))
+        flat_grid = grid.reshape(-1,3)
+        nb_cells = int(np.prod(shape))
+        for start in range(0,nb_cells,batch_size):
+            indexes = np.unravel_index(np.arange(start,min(start+batch_size,nb_cells)),
+                                       shape)
+            targets = origin + np.column_stack(indexes)*steps
+            solutions,valid = inverse_kinematics(robot_config,targets)
+            joint_angles,_ = best_solutions(solutions,valid)
+            flat_grid[start:start+len(targets)] = joint_angles
+        grid.flush()
+        del grid
+
+        meta = {"key":cls.config_key(robot_config,shape,x_range,y_range),
+                "robot_config":{ attribute:float(getattr(robot_config,attribute))
+                                 for attribute in _GEOMETRY },
+                "x_range":x_range,
+                "y_range":y_range}
+        with open(cls._meta_path(path),"w") as f:
+            json.dump(meta,f)
+
+        return cls(path)
+
+    @classmethod
+    def get(cls, robot_config, directory, shape=(121,61,72),
+            x_range=None, y_range=None):
+
+        """
+        Returns the map of the robot configuration saved in the directory,
+        building it first if it does not exist yet (the file name is the
+        key of the map, see :py:meth:`config_key`)
+
+        Parameters
+        ----------
+
+        robot_config, shape, x_range, y_range:
+            see :py:meth:`build`
+
+        directory: `str`
+            folder of the maps (created if it does not exist)
+        """
+
+        default_x_range,default_y_range = cls.default_ranges(robot_config)
+        x_range = tuple(default_x_range if x_range is None else x_range)
+        y_range = tuple(default_y_range if y_range is None else y_range)
+        key = cls.config_key(robot_config,shape,x_range,y_range)
+        path = os.path.join(directory,"reachability_"+key+".npy")
+        if os.path.isfile(path) and os.path.isfile(cls._meta_path(path)):
+            return cls(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        return cls.build(path,robot_config,shape,x_range,y_range)
+
+    def cells(self, x, y, angle):
+
+        """
+        Returns the indexes (ix,iy,ia) of the cells nearest to
+        the racket poses, and a mask of the poses in the grid
+
+        Parameters
+        ----------
+
+        x, y, angle:
+            arrays of shape (Q,) (or floats)
+        """
+
+        poses = np.broadcast_arrays(*[ np.atleast_1d(np.asarray(values,dtype=float))
+                                       for values in (x,y,angle) ])
+        indexes = [ np.rint((values-origin)/step).astype(np.int64)
+                    for values,origin,step in zip(poses,self._origin,self._steps) ]
+        indexes[2] %= self._shape[2]
+        inside = ( (indexes[0]>=0) & (indexes[0]<self._shape[0])
+                   & (indexes[1]>=0) & (indexes[1]<self._shape[1]) )
+        for axis in (0,1):
+            indexes[axis] = np.clip(indexes[axis],0,self._shape[axis]-1)
+        return tuple(indexes),inside
+
+    def joint_angles(self, x, y, angle):
+
+        """
+        Returns the minimal effort joint angles, (Q,3) array (nan for
+        unreachable poses), of the cells nearest to the racket poses
+        """
+
+        indexes,inside = self.cells(x,y,angle)
+        joint_angles = np.array(self.joint_angles_grid[indexes],dtype=float)
+        joint_angles[~inside] = np.nan
+        return joint_angles
+
+    def reachable(self, x, y, angle):
+
+        """
+        Returns a (Q,) array of bool, True if the cell
+        nearest to the racket pose is reachable
+        """
+
+        indexes,inside = self.cells(x,y,angle)
+        return inside & ~np.isnan(self.joint_angles_grid[indexes+(0,)])
+
+    def __str__(self):
+        return ("reachability map "+str(self.joint_angles_grid.shape[:3])+
+                " (x: "+str(self.x_range)+", y: "+str(self.y_range)+")")
@@ -0,0 +1,82 @@
+import unittest,asyncio,time
+
+from roboball2d.ball_gun import DropBallGun
+from roboball2d.physics import B2World
+from roboball2d.physics import AsyncB2World
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.ball import BallConfig
+
+
+class ASYNC_WORLD_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_same_as_b2world(self):
+
+        # worlds stepped concurrently (in threads and in
+        # a worker process) should compute the same dynamics
+        # as a B2World
+
+        robot_config = DefaultRobotConfig()
+        ball_config = BallConfig()
+        robot_state = DefaultRobotState(robot_config)
+        ball_gun = DropBallGun(3.0,2.0)
+        torques = [0.5,-0.2,0.1]
+
+        world = B2World(robot_config,ball_config,6.0)
+        world.reset(robot_state,ball_gun)
+        for _ in range(50):
+            expected = world.step(list(torques),relative_torques=True)
+
+        async def _run(async_world):
+            async with async_world:
+                await async_world.reset(robot_state,ball_gun)
+                async for world_state in async_world.iterate(torques,
+                                                             nb_steps=50,
+                                                             relative_torques=True):
+                    pass
+            return world_state
+
+        async def _run_all():
+            worlds = [AsyncB2World(B2World(robot_config,ball_config,6.0)),
+                      AsyncB2World(B2World(robot_config,ball_config,6.0)),
+                      AsyncB2World.in_process(robot_config,ball_config,6.0)]
+            return await asyncio.gather(*[_run(world) for world in worlds])
+
+        for world_state in asyncio.run(_run_all()):
+            self.assertAlmostEqual(world_state.t,expected.t)
+            self.assertEqual(list(world_state.ball.position),
+                             list(expected.ball.position))
+            self.assertEqual(list(world_state.robot.racket.position),
+                             list(expected.robot.racket.position))
+
+    def test_cancelled_call(self):
+
+        # a call cancelled before the world replied should not
+        # shift the replies of the next calls, nor block close
+
+        ball_config = BallConfig()
+        nb_balls = 2000
+        ball_guns = [DropBallGun(3.0,2.0)]*nb_balls
+
+        async def _run(async_world):
+            await async_world.reset(None,ball_guns)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(async_world.step(None),1e-4)
+            world_state = await async_world.reset(None,ball_guns)
+            self.assertEqual(world_state.t,0.0)
+            world_state = await async_world.step(None)
+            self.assertAlmostEqual(world_state.t,0.01)
+            return world_state
+
+        for async_world in (AsyncB2World(B2World([],[ball_config]*nb_balls,6.0)),
+                            AsyncB2World.in_process([],[ball_config]*nb_balls,6.0)):
+            asyncio.run(_run(async_world))
+            start = time.time()
+            async_world.close()
+            self.assertLess(time.time()-start,5.0)
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from roboball2d.ball import BallConfig
+from roboball2d.ball import BallFlightPredictor
+from roboball2d.ball_gun import DefaultBallGun
+from roboball2d.physics import B2World
+
+
+class BALL_FLIGHT_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_same_as_b2world(self):
+
+        # predicted flights (including bounces on the floor)
+        # should match the ones simulated by B2World
+
+        nb_balls,nb_steps = 20,150
+        ball_config = BallConfig()
+        world = B2World([],[ball_config]*nb_balls,6.0)
+        np.random.seed(1)
+        world_state = world.reset(None,[DefaultBallGun(ball_config)]*nb_balls)
+        positions = [ ball.position for ball in world_state.balls ]
+        velocities = [ ball.linear_velocity for ball in world_state.balls ]
+        spins = [ ball.angular_velocity for ball in world_state.balls ]
+
+        simulated = np.zeros((nb_balls,nb_steps,2))
+        hits_floor = np.full(nb_balls,np.nan)
+        for step in range(nb_steps):
+            world_state = world.step(None)
+            simulated[:,step] = [ ball.position for ball in world_state.balls ]
+            for index,hit in enumerate(world_state.balls_hits_floor):
+                if hit is not None and np.isnan(hits_floor[index]):
+                    hits_floor[index] = hit
+
+        predictor = BallFlightPredictor(ball_config,visible_area_width=6.0)
+        prediction = predictor.predict(positions,velocities,
+                                       np.arange(1,nb_steps+1)/100.0,spins)
+
+        self.assertEqual(prediction.positions.shape,(nb_balls,nb_steps,2))
+        self.assertFalse(np.isnan(hits_floor).any())
+        np.testing.assert_allclose(prediction.hits_floor,hits_floor,atol=1e-2)
+        np.testing.assert_allclose(prediction.positions,simulated,atol=1e-2)
+
+        # free flight (before the first bounce)
+        first_hit = int(round(np.nanmin(prediction.hits_floor_time)*100.0))
+        np.testing.assert_allclose(prediction.positions[:,:first_hit-1],
+                                   simulated[:,:first_hit-1],atol=1e-5)
+
+        # times between steps are interpolated
+        half = predictor.predict(positions,velocities,[0.015],spins)
+        np.testing.assert_allclose(half.positions[:,0],
+                                   0.5*(simulated[:,0]+simulated[:,1]),atol=1e-5)
@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+
+from roboball2d.ball import BallConfig
+from roboball2d.ball_gun import DefaultBallGun
+from roboball2d.ball_gun import DropBallGun
+from roboball2d.physics import B2World
+
+
+class BALL_GUN_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_shoot_batch(self):
+
+        ball_config = BallConfig()
+        ball_gun = DefaultBallGun(ball_config,seed=3)
+        shots = ball_gun.shoot_batch(1000)
+        self.assertEqual(shots.shape,(1000,6))
+        self.assertTrue((shots[:,0]==ball_gun.initial_pos_x).all())
+        self.assertTrue((shots[:,1]>=4.0*ball_config.radius).all())
+        speeds = np.hypot(shots[:,3],shots[:,4])
+        self.assertLess(abs(speeds.mean()-ball_gun.speed_mean),0.05)
+        phis = np.arctan2(shots[:,4],-shots[:,3])
+        self.assertTrue((phis>=ball_gun.vel_angle_min-1e-9).all())
+        self.assertTrue((phis<=ball_gun.vel_angle_max+1e-9).all())
+
+        # same seed, same shots
+        same = DefaultBallGun(ball_config,seed=3).shoot_batch(1000)
+        self.assertTrue(np.array_equal(shots,same))
+        ball_gun.seed(3)
+        self.assertTrue(np.array_equal(shots,ball_gun.shoot_batch(1000)))
+
+        drop = DropBallGun(2.0,3.0).shoot_batch(2)
+        self.assertTrue(np.array_equal(drop,[[2.0,3.0,0,0,0,0]]*2))
+
+    def test_spawn(self):
+
+        ball_config = BallConfig()
+        children = DefaultBallGun(ball_config,seed=4).spawn(3)
+        shots = [ child.shoot_batch(10) for child in children ]
+        self.assertFalse(np.array_equal(shots[0],shots[1]))
+        # spawning is reproducible
+        again = DefaultBallGun(ball_config,seed=4).spawn(3)
+        for child,child_shots in zip(again,shots):
+            self.assertTrue(np.array_equal(child.shoot_batch(10),child_shots))
+
+        # spawned ball guns keep the class of their parent
+        class _BallGun(DefaultBallGun):
+            __slots__=["extra"]
+        ball_gun = _BallGun(ball_config,seed=5)
+        ball_gun.extra = 1
+        child = ball_gun.spawn(1)[0]
+        self.assertTrue(type(child) is _BallGun)
+        self.assertEqual(child.extra,1)
+        self.assertTrue(child.seeded)
+
+    def test_seeded_shoot(self):
+
+        # worlds reset with seeded ball guns are reproducible,
+        # whatever the state of the global random generator
+
+        ball_config = BallConfig()
+        positions = []
+        for global_seed in (1,2):
+            np.random.seed(global_seed)
+            world = B2World([],[ball_config]*3,6.0)
+            world_state = world.reset(None,[DefaultBallGun(ball_config,seed=6)]*3)
+            positions.append([ ball.position for ball in world_state.balls ])
+        self.assertTrue(np.array_equal(positions[0],positions[1]))
+        self.assertFalse(np.array_equal(positions[0][0],positions[0][1]))
+
+        # unseeded: global random generator
+        ball_gun = DefaultBallGun(ball_config)
+        self.assertFalse(ball_gun.seeded)
+        np.random.seed(7)
+        shot = ball_gun.shoot()
+        np.random.seed(7)
+        self.assertEqual(shot[0],ball_gun.shoot()[0])
@@ -0,0 +1,132 @@
+import unittest
+
+import numpy as np
+
+from roboball2d.ball_gun import DefaultBallGun
+from roboball2d.ball_gun import DropBallGun
+from roboball2d.physics import B2World
+from roboball2d.physics import BatchedB2World
+from roboball2d.physics import SubprocessB2World
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.ball import BallConfig
+
+
+class BATCHED_WORLD_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_same_as_b2world(self):
+
+        # a batched world should compute the same
+        # dynamics as a B2World stepped with the
+        # same torques
+
+        robot_config = DefaultRobotConfig()
+        ball_config = BallConfig()
+        ball_gun = DropBallGun(3.0,2.0)
+
+        world = B2World(robot_config,ball_config,6.0)
+        world.reset(DefaultRobotState(robot_config),ball_gun)
+
+        batched = BatchedB2World(2,
+                                 robot_config,ball_config,6.0,
+                                 ball_guns=ball_gun,
+                                 robot_reinits=DefaultRobotState(robot_config))
+        batched.reset()
+
+        torques = [0.5,-0.2,0.1]
+        for _ in range(50):
+            world_state = world.step(list(torques),relative_torques=True)
+            state = batched.step(np.array([torques,torques]),
+                                 relative_torques=True)
+
+        for index in range(2):
+            self.assertAlmostEqual(state.t[index],world_state.t)
+            np.testing.assert_allclose(state.balls_position[index,0],
+                                       world_state.ball.position)
+            np.testing.assert_allclose(state.rackets_position[index,0],
+                                       world_state.robot.racket.position)
+            np.testing.assert_allclose(state.joints_angle[index,0],
+                                       [joint.angle for joint
+                                        in world_state.robot.joints])
+
+    def test_auto_reset(self):
+
+        # dropping balls on the floor, the episode
+        # should end (and the world reset) when
+        # the ball hits the floor
+
+        x = 4.0
+        batched = BatchedB2World(3,[],BallConfig(),6.0,
+                                 ball_guns=DropBallGun(x,1.0),
+                                 max_floor_hits=1)
+        batched.reset()
+
+        done = False
+        for _ in range(200):
+            state = batched.step(None)
+            if state.dones.any():
+                done = True
+                break
+
+        self.assertTrue(done)
+        self.assertTrue(state.dones.all())
+        np.testing.assert_allclose(state.balls_hits_floor[:,0],[x]*3)
+        # first state of the new episode
+        np.testing.assert_allclose(state.t,[0.0]*3)
+        np.testing.assert_allclose(state.balls_position[:,0,1],[1.0]*3)
+
+    def test_subprocess_same_as_batched(self):
+
+        # worlds running in subprocesses should compute
+        # the same dynamics as a batched world
+
+        robot_config = DefaultRobotConfig()
+        ball_config = BallConfig()
+        ball_gun = DropBallGun(3.0,2.0)
+        robot_reinit = DefaultRobotState(robot_config)
+
+        batched = BatchedB2World(2,robot_config,ball_config,6.0,
+                                 ball_guns=ball_gun,
+                                 robot_reinits=robot_reinit)
+        with SubprocessB2World(2,robot_config,ball_config,6.0,
+                               ball_guns=ball_gun,
+                               robot_reinits=robot_reinit) as subprocess:
+
+            batched.reset()
+            subprocess.reset()
+            torques = np.array([[0.5,-0.2,0.1],[-0.3,0.2,0.0]])
+            for _ in range(50):
+                state = batched.step(torques,relative_torques=True)
+                subprocess.step_async(torques,relative_torques=True)
+                shared_state = subprocess.step_wait()
+            for attr in ("t","balls_position","rackets_position","joints_angle"):
+                np.testing.assert_allclose(getattr(shared_state,attr),
+                                           getattr(state,attr))
+
+            # no pending step
+            with self.assertRaises(Exception):
+                subprocess.step_wait()
+
+            # closing (on exit) with a pending step
+            subprocess.step_async(torques)
+
+    def test_subprocess_seeded_ball_gun(self):
+
+        # seeded ball guns are spawned: workers shoot different
+        # balls, the same ones for subprocess worlds created with
+        # the same seed
+
+        ball_config = BallConfig()
+        positions = []
+        for _ in range(2):
+            with SubprocessB2World(2,[],ball_config,6.0,
+                                   ball_guns=DefaultBallGun(ball_config,seed=8)) as subprocess:
+                positions.append(subprocess.reset().balls_position.copy())
+        self.assertTrue(np.array_equal(positions[0],positions[1]))
+        self.assertFalse(np.array_equal(positions[0][0],positions[0][1]))
@@ -0,0 +1,74 @@
+import os,shutil,tempfile,unittest
+
+import numpy as np
+
+from roboball2d.ball import BallConfig
+from roboball2d.ball_gun import BounceTable
+from roboball2d.ball_gun import DefaultBallGun
+from roboball2d.physics import B2World
+
+
+class BOUNCE_TABLE_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._folder)
+
+    def test_grid_values(self):
+
+        # values at the grid points should be the ones
+        # of shots simulated by B2World
+
+        ball_config = BallConfig()
+        ball_gun = DefaultBallGun(ball_config)
+        grid = BounceTable.grid(ball_gun,(2,2,3,2))
+        path = os.path.join(self._folder,"table.npy")
+        BounceTable.build(path,ball_config,grid,batch_size=10)
+        table = BounceTable(path)
+        self.assertEqual(table.values.shape,(2,2,3,2,4))
+
+        height,speed,phi,spin = grid[0][1],grid[1][0],grid[2][2],grid[3][1]
+        world = B2World([],[ball_config],6.0)
+
+        class _Gun:
+            def shoot(self):
+                return ([6.0,height],0.0,
+                        [-speed*np.cos(phi),speed*np.sin(phi)],spin)
+
+        world_state = world.reset(None,_Gun())
+        previous = world_state.balls[0].position
+        landing,crossing = None,None
+        for _ in range(300):
+            world_state = world.step(None)
+            position = world_state.balls[0].position
+            if landing is None and world_state.balls_hits_floor[0] is not None:
+                landing = (world_state.balls_hits_floor[0],world_state.t)
+            if crossing is None and position[0] <= 1.0 < previous[0]:
+                ratio = (1.0-previous[0])/(position[0]-previous[0])
+                crossing = (previous[1]+ratio*(position[1]-previous[1]),
+                            world_state.t-(1.0-ratio)*0.01)
+            previous = position
+
+        values = table.lookup_shots([[6.0,height]],
+                                    [[-speed*np.cos(phi),speed*np.sin(phi)]],
+                                    [spin])[0]
+        self.assertIsNotNone(crossing)
+        for value,expected in zip(values,landing+crossing):
+            self.assertAlmostEqual(value,expected,places=6)
+
+    def test_interpolation(self):
+
+        # interpolated values should be between the values
+        # of the grid points
+
+        ball_config = BallConfig()
+        grid = BounceTable.grid(DefaultBallGun(ball_config),(2,2,2,2))
+        path = os.path.join(self._folder,"table.npy")
+        table = BounceTable.build(path,ball_config,grid)
+        queries = [ (axis[0]+axis[1])/2.0 for axis in grid ]
+        landing_x,landing_t = table.landing(*queries)
+        values = table.values[...,0]
+        self.assertTrue(values.min() <= landing_x[0] <= values.max())
+        self.assertAlmostEqual(landing_x[0],values.mean())
@@ -2,9 +2,12 @@ import unittest,time
 
 from roboball2d.ball_gun import DropBallGun
 from roboball2d.physics import B2World
+from roboball2d.physics import PlayArea
 from roboball2d.robot import DefaultRobotConfig
 from roboball2d.robot import DefaultRobotState
 from roboball2d.ball import BallConfig
+from roboball2d.physics.body_kinds import GROUND,BALL
+from roboball2d.physics.default_b2_robot import DefaultB2Robot
 
 
 class BOUNCES_TESTCASE(unittest.TestCase):
@@ -139,7 +142,10 @@ class BOUNCES_TESTCASE(unittest.TestCase):
             bounces = world_state.balls_hits_racket
 
             for index,bounce in enumerate(bounces):
-                if bounce : touched_racket[index]=True
+                # index of the robot which racket was hit
+                if bounce is not None :
+                    self.assertEqual(bounce,0)
+                    touched_racket[index]=True
 
         self.assertTrue(touched_racket[0])
         self.assertTrue(touched_racket[1])
@@ -147,3 +153,197 @@ class BOUNCES_TESTCASE(unittest.TestCase):
         
             
         
+
+    def test_custom_robot_config(self):
+
+        # robot configurations implementing create_b2_robot(world,ground),
+        # which bodies are not tagged, should still report racket hits
+
+        class _RobotConfig(DefaultRobotConfig):
+            def create_b2_robot(self, b2world, ground):
+                return DefaultB2Robot(self, b2world, ground)
+
+        robot_config = _RobotConfig()
+        world = B2World(robot_config,BallConfig(),6.0)
+        world.reset(DefaultRobotState(robot_config),
+                    DropBallGun(robot_config.position,1.0))
+
+        hits = [ world.step(None).ball_hits_racket for _ in range(100) ]
+        self.assertTrue(0 in hits)
+
+    def test_vertical_drops_over_robots(self):
+
+        # 2 robots, a ball dropped over each of them.
+        # Checking the index of the robot which racket
+        # was hit is reported
+
+        robot_configs = [DefaultRobotConfig(),DefaultRobotConfig()]
+        robot_configs[0].position = 2.0
+        robot_configs[1].position = 4.0
+        init_robot_states = [DefaultRobotState(robot_config)
+                             for robot_config in robot_configs]
+
+        ball_guns = [DropBallGun(4.05,2.0),
+                     DropBallGun(1.95,2.0)]
+
+        world = B2World(robot_configs,
+                        [BallConfig() for _ in ball_guns],
+                        6.0)
+
+        world.reset(init_robot_states,
+                    ball_guns)
+
+        hit_rackets = [None]*2
+
+        for _ in range(100):
+            world_state = world.step(None)
+            for index,racket in enumerate(world_state.balls_hits_racket):
+                if racket is not None:
+                    hit_rackets[index]=racket
+
+        self.assertEqual(hit_rackets,[1,0])
+
+    def test_contact_events(self):
+
+        # droping a ball, and checking the contact
+        # with the floor is recorded as an event
+
+        x = 4.0
+        world = B2World([],BallConfig(),6.0,
+                        nb_contact_events=8)
+        world.reset(None,DropBallGun(x,1.0))
+
+        for _ in range(100):
+            world_state = world.step(None)
+            if world_state.ball_hits_floor is not None:
+                break
+
+        events = world_state.contact_events
+        self.assertEqual(events.nb_events,1)
+        self.assertEqual(sorted(events.kinds[0]),[GROUND,BALL])
+        self.assertAlmostEqual(events.points[0,0],x,places=5)
+        self.assertGreater(events.normal_impulses[0],0.0)
+        self.assertAlmostEqual(events.times[0],world_state.t)
+
+        # events are discarded at the next step
+        world_state = world.step(None)
+        self.assertEqual(world_state.contact_events.nb_events,0)
+
+    def test_substeps(self):
+
+        # one step of 10 substeps should be equivalent to
+        # 10 steps, and no bounce should be lost
+
+        x = 4.0
+        worlds = [B2World(DefaultRobotConfig(),BallConfig(),6.0,
+                          steps_per_sec=500.0)
+                  for _ in range(2)]
+        for world in worlds:
+            world.reset(DefaultRobotState(DefaultRobotConfig()),
+                        DropBallGun(x,1.0))
+
+        torques = [0.2,-0.1,0.1]
+        bounces = [None,None]
+        for _ in range(40):
+            for _ in range(10):
+                world_state1 = worlds[0].step(torques,relative_torques=True)
+                if world_state1.ball_hits_floor is not None:
+                    bounces[0] = world_state1.ball_hits_floor
+            world_state2 = worlds[1].step(torques,relative_torques=True,
+                                          n_substeps=10)
+            if world_state2.ball_hits_floor is not None:
+                bounces[1] = world_state2.ball_hits_floor
+
+        self.assertEqual(bounces,[x,x])
+        self.assertAlmostEqual(world_state1.t,world_state2.t)
+        self.assertAlmostEqual(world_state2.applied_time_step,10/500.0)
+        self.assertEqual(list(world_state1.ball.position),
+                         list(world_state2.ball.position))
+        self.assertEqual(list(world_state1.robot.racket.position),
+                         list(world_state2.robot.racket.position))
+
+    def test_play_area(self):
+
+        # a ball leaving the play area and a ball
+        # resting on the floor should be deactivated,
+        # and reactivated on reset
+
+        ball_config = BallConfig()
+        play_area = PlayArea(6.0)
+        play_area.x_max = 5.0
+        play_area.rest_duration = 0.2
+        ball_guns = [DropBallGun(5.5,1.0),
+                     DropBallGun(3.0,ball_config.radius),
+                     DropBallGun(2.0,1.0)]
+
+        world = B2World([],[ball_config]*3,6.0,
+                        play_area=play_area)
+        world.reset(None,ball_guns)
+
+        world_state = world.step(None)
+        self.assertEqual(world_state.balls_active,[False,True,True])
+        position = world_state.balls[0].position
+
+        for _ in range(30):
+            world_state = world.step(None)
+        self.assertEqual(world_state.balls_active,[False,False,True])
+        self.assertEqual(world_state.balls[0].position,position)
+        self.assertEqual(world_state.balls[1].linear_velocity,[0.0,0.0])
+
+        world_state = world.reset(None,[None,ball_guns[1],None])
+        self.assertEqual(world_state.balls_active,[False,True,True])
+
+    def test_time_accumulator(self):
+
+        # passing wall clock times, the world should consume
+        # the elapsed time in fixed time steps (at most max_substeps
+        # per call), i.e. compute the same dynamics as a world
+        # stepped without time stamps
+
+        worlds = [B2World([],BallConfig(),6.0,
+                          max_substeps=4),
+                  B2World([],BallConfig(),6.0)]
+        for world in worlds:
+            world.reset(None,DropBallGun(4.0,1.0))
+
+        # 0, 2 and 3 time steps, then a hiccup
+        # (capped to 4 time steps)
+        expected = [(0,0.0),(2,0.5),(3,0.0),(4,0.0)]
+        for current_time,(nb_steps,alpha) in zip([10.0,10.025,10.05,11.0],
+                                                 expected):
+            world_state1 = worlds[0].step(None,current_time=current_time)
+            for _ in range(nb_steps):
+                world_state2 = worlds[1].step(None)
+            self.assertAlmostEqual(world_state1.interpolation_alpha,alpha)
+            self.assertAlmostEqual(world_state1.applied_time_step,nb_steps*0.01)
+
+        self.assertAlmostEqual(world_state1.t,0.09)
+        self.assertEqual(list(world_state1.ball.position),
+                         list(world_state2.ball.position))
+
+    def test_wall_clock_time(self):
+
+        # without max_substeps, the simulation time should advance
+        # by the time elapsed since the previous step
+
+        world = B2World([],BallConfig(),6.0)
+        world.reset(None,DropBallGun(4.0,1.0))
+        for current_time in (1000.0,1000.02,1000.05):
+            world_state = world.step(None,current_time=current_time)
+        self.assertAlmostEqual(world_state.t,0.05)
+        self.assertAlmostEqual(world_state.applied_time_step,0.03)
+
+    def test_ball_gun_spin(self):
+
+        # the spin (angular velocity) shot by the ball
+        # gun should be applied to the ball
+
+        class _SpinningBallGun:
+            def shoot(self):
+                return [4.0,1.0],0.0,[0.0,0.0],3.0
+
+        world = B2World([],BallConfig(),6.0)
+        world_state = world.reset(None,_SpinningBallGun())
+        self.assertAlmostEqual(world_state.balls[0].angular_velocity,3.0,places=5)
+        world_state = world.step(None)
+        self.assertAlmostEqual(world_state.balls[0].angular_velocity,3.0,places=5)
@@ -0,0 +1,133 @@
+import os,shutil,tempfile,unittest
+
+import numpy as np
+
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.robot import forward_kinematics
+from roboball2d.robot import inverse_kinematics
+from roboball2d.robot import InverseKinematics
+from roboball2d.robot import ReachabilityMap
+
+
+class KINEMATICS_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_forward_kinematics(self):
+
+        # batched kinematics should match the ones
+        # computed by DefaultRobotState
+
+        robot_config = DefaultRobotConfig()
+        robot_config.position = 1.7
+        random = np.random.RandomState(0)
+        angles = random.uniform(-2.0,2.0,(20,3))
+        velocities = random.uniform(-3.0,3.0,(20,3))
+        kinematics = forward_kinematics(robot_config,angles,velocities)
+        batch = DefaultRobotState.batch(robot_config,angles,velocities)
+
+        for index in range(len(angles)):
+            expected = DefaultRobotState(robot_config,
+                                         list(angles[index]),
+                                         list(velocities[index]))
+            for state in (batch[index],
+                          DefaultRobotState.from_kinematics(robot_config,
+                                                            kinematics,index)):
+                self.assertEqual(state.angles,list(angles[index]))
+                for item,expected_item in zip(state.rods+[state.racket],
+                                              expected.rods+[expected.racket]):
+                    self.assertTrue(np.allclose(item.position,expected_item.position))
+                    self.assertAlmostEqual(item.angle,expected_item.angle)
+                    self.assertTrue(np.allclose(item.linear_velocity,
+                                                expected_item.linear_velocity))
+                    self.assertAlmostEqual(item.angular_velocity,
+                                           expected_item.angular_velocity)
+                for joint,expected_joint in zip(state.joints,expected.joints):
+                    self.assertTrue(np.allclose(joint.anchor,expected_joint.anchor))
+
+        # refilled in place
+        out = forward_kinematics(robot_config,angles[::-1],out=kinematics)
+        self.assertIs(out,kinematics)
+        self.assertTrue((kinematics.angular_velocities==0.0).all())
+        self.assertTrue(np.allclose(kinematics.anchors[:,0],[1.7,0.0]))
+
+    def test_inverse_kinematics(self):
+
+        robot_config = DefaultRobotConfig()
+        random = np.random.RandomState(1)
+        limits = np.array([robot_config.rod_joint_limit,
+                           robot_config.rod_joint_limit,
+                           robot_config.racket_joint_limit])
+        angles = random.uniform(-1.0,1.0,(100,3))*limits
+        kinematics = forward_kinematics(robot_config,angles)
+        targets = np.column_stack((kinematics.positions[:,2],
+                                   kinematics.angles[:,2]))
+
+        # one of the solutions is the original joint angles
+        solutions,valid = inverse_kinematics(robot_config,targets)
+        errors = np.abs(solutions-angles[:,None,:]).max(axis=2)
+        found = np.argmin(errors,axis=1)
+        self.assertTrue((errors.min(axis=1)<1e-9).all())
+        self.assertTrue(valid[np.arange(len(angles)),found].all())
+
+        # best solutions reach the targets
+        solver = InverseKinematics(robot_config)
+        best,best_valid = solver.solve(targets,angles)
+        self.assertTrue(best_valid.all())
+        self.assertTrue(np.allclose(best,angles))
+        reached = forward_kinematics(robot_config,best)
+        self.assertTrue(np.allclose(reached.positions[:,2],targets[:,:2]))
+
+        # cache
+        self.assertEqual(solver.misses,len(targets))
+        solver.solve(targets)
+        self.assertEqual(solver.hits,len(targets))
+        # (quantized targets share the solutions)
+        target = np.round(targets[:1],3)
+        solver.solve(target+2e-4)
+        self.assertEqual(solver.hits,len(targets)+1)
+        self.assertEqual(solver.misses,len(targets))
+
+        # out of reach
+        best,best_valid = solver.solve([[robot_config.position,2.0,0.0]])
+        self.assertFalse(best_valid[0])
+        self.assertTrue(np.isnan(best).all())
+
+    def test_reachability_map(self):
+
+        folder = tempfile.mkdtemp()
+        try:
+            robot_config = DefaultRobotConfig()
+            reachability = ReachabilityMap.get(robot_config,folder,(21,11,12))
+            self.assertEqual(len(os.listdir(folder)),2)
+
+            # reachable cells: the joint angles place the
+            # racket at the center of the cell
+            grid = reachability.joint_angles_grid
+            reachable = ~np.isnan(grid[...,0])
+            self.assertTrue(reachable.any() and not reachable.all())
+            indexes = np.argwhere(reachable)
+            centers = reachability._origin+indexes*reachability._steps
+            joint_angles = reachability.joint_angles(*centers.T)
+            self.assertTrue(reachability.reachable(*centers.T).all())
+            reached = forward_kinematics(robot_config,joint_angles)
+            self.assertTrue(np.allclose(reached.positions[:,2],centers[:,:2],atol=1e-5))
+
+            # out of the grid
+            self.assertFalse(reachability.reachable(robot_config.position,5.0,0.0)[0])
+
+            # same configuration: same map, other configuration: new map
+            same = ReachabilityMap.get(robot_config,folder,(21,11,12))
+            self.assertEqual(same.key,reachability.key)
+            self.assertEqual(len(os.listdir(folder)),2)
+            robot_config.racket_joint_limit = 0.1
+            other = ReachabilityMap.get(robot_config,folder,(21,11,12))
+            self.assertNotEqual(other.key,reachability.key)
+            self.assertEqual(len(os.listdir(folder)),4)
+        finally:
+            shutil.rmtree(folder)
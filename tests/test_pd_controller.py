@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import PDController
+
+
+class PD_CONTROLLER_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_get_batch(self):
+
+        random = np.random.RandomState(0)
+        references,angles,velocities = random.uniform(-1.0,1.0,(3,10,3))
+
+        # same as get
+        controller = PDController()
+        torques = controller.get_batch(references,angles,velocities)
+        for index in range(10):
+            expected = controller.get(references[index],angles[index],
+                                      velocities[index])
+            self.assertTrue(np.allclose(torques[index],expected))
+
+        # per robot gains, out buffer and saturation
+        kp = random.uniform(0.5,2.0,(10,3))
+        kd = random.uniform(0.0,0.5,(10,3))
+        controller = PDController(kp,kd)
+        max_torques = DefaultRobotConfig().max_torques
+        out = np.zeros((10,3))
+        torques = controller.get_batch(references,angles,velocities,
+                                       out=out,max_torques=max_torques)
+        self.assertIs(torques,out)
+        expected = np.clip(kp*(references-angles)-kd*velocities,
+                           -np.array(max_torques),max_torques)
+        self.assertTrue(np.allclose(torques,expected))
+
+        # integer inputs
+        torques = PDController().get_batch(np.ones((2,3),dtype=int),
+                                           np.zeros((2,3),dtype=int),
+                                           np.zeros((2,3),dtype=int))
+        self.assertEqual(torques.dtype,np.float64)
+        self.assertTrue(np.allclose(torques,[[2.0,1.0,0.5]]*2))
@@ -0,0 +1,54 @@
+import unittest,time
+
+from roboball2d.ball_gun import DropBallGun
+from roboball2d.physics import B2World
+from roboball2d.physics import RealTimeRunner
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.ball import BallConfig
+
+
+class REAL_TIME_RUNNER_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_run(self):
+
+        # the runner should step the world in real time,
+        # using the latest torques, and publish world states
+        # which are not modified by further steps
+
+        robot_config = DefaultRobotConfig()
+        for mode in ("objects","arrays"):
+
+            world = B2World(robot_config,BallConfig(),6.0,
+                            steps_per_sec=200.0,
+                            world_state_mode=mode)
+            world.reset(DefaultRobotState(robot_config),
+                        DropBallGun(3.0,2.0))
+
+            start = time.perf_counter()
+            with RealTimeRunner(world,relative_torques=True) as runner:
+                runner.set_torques([0.5,0.0,0.0])
+                time.sleep(0.3)
+                world_state = runner.get_world_state()
+                t = world_state.t
+                angle = world_state.robot.joints[0].angle
+                time.sleep(0.1)
+            elapsed = time.perf_counter()-start
+
+            # (bounds not depending on the load of the machine:
+            # the runner never steps faster than real time)
+            stats = runner.get_stats()
+            self.assertGreater(stats.nb_steps,1)
+            self.assertLessEqual(stats.nb_steps,int(elapsed*200.0)+1)
+            self.assertGreater(stats.latency_p99,0.0)
+            self.assertGreaterEqual(stats.latency_p99,stats.latency_p50)
+            self.assertEqual(world_state.t,t)
+            self.assertEqual(world_state.robot.joints[0].angle,angle)
+            self.assertGreater(runner.get_world_state().t,t)
+            self.assertNotEqual(angle,0.0)
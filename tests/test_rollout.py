@@ -0,0 +1,71 @@
+import unittest,math
+
+import numpy as np
+
+from roboball2d.ball_gun import DropBallGun
+from roboball2d.physics import B2World
+from roboball2d.physics import rollout
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.robot import PDController
+from roboball2d.ball import BallConfig
+
+
+class ROLLOUT_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_same_as_step(self):
+
+        # a rollout should provide the same trajectory as
+        # successive calls to step, and terminate when the
+        # ball hits the floor
+
+        robot_config = DefaultRobotConfig()
+        ball_config = BallConfig()
+        ball_gun = DropBallGun(2.5,2.0)
+        init_robot_state = DefaultRobotState(robot_config)
+        references = [-math.pi/8.0]*3
+        controller = PDController()
+
+        world = B2World(robot_config,ball_config,6.0,nb_contact_events=4)
+        trajectory = rollout(world,lambda observation: references,1000,
+                             ball_gun,init_robot_state,
+                             controller=controller,relative_torques=True)
+
+        self.assertTrue(trajectory.terminated)
+        self.assertTrue(trajectory.nb_steps < 1000)
+        self.assertEqual(trajectory.contact_events.nb_events,1)
+
+        world = B2World(robot_config,ball_config,6.0)
+        world_state = world.reset(init_robot_state,ball_gun)
+        for step in range(trajectory.nb_steps):
+            angles = [joint.angle for joint in world_state.robot.joints]
+            np.testing.assert_allclose(trajectory.channel("joint_angles")[step,0],angles)
+            torques = controller.get(references,angles,
+                                     [joint.angular_velocity for joint
+                                      in world_state.robot.joints])
+            world_state = world.step(torques,relative_torques=True)
+        np.testing.assert_allclose(trajectory.channel("position")[-1,0],
+                                   world_state.ball.position)
+        self.assertEqual(trajectory.balls_hits_floor[trajectory.nb_steps-1,0],
+                         world_state.ball_hits_floor)
+
+        # without termination, and reusing the arrays
+        nb_steps = trajectory.nb_steps
+        world = B2World(robot_config,ball_config,6.0)
+        longer = rollout(world,lambda observation: [0.1,0.,0.],nb_steps+10,
+                         ball_gun,init_robot_state,terminate_on_floor_hit=False)
+        self.assertEqual(longer.nb_steps,nb_steps+10)
+        self.assertFalse(longer.terminated)
+        np.testing.assert_allclose(longer.torques[:,0],[[0.1,0.,0.]]*(nb_steps+10))
+        observations = longer.observations.copy()
+        world = B2World(robot_config,ball_config,6.0)
+        self.assertTrue(rollout(world,lambda observation: [0.1,0.,0.],nb_steps+10,
+                                ball_gun,init_robot_state,terminate_on_floor_hit=False,
+                                out=longer) is longer)
+        np.testing.assert_array_equal(longer.observations,observations)
@@ -0,0 +1,274 @@
+import unittest,pickle
+
+import numpy as np
+
+from roboball2d.ball_gun import DropBallGun
+from roboball2d.physics import B2World
+from roboball2d.physics.step_profiler import PHASES
+from roboball2d.robot import DefaultRobotConfig
+from roboball2d.robot import DefaultRobotState
+from roboball2d.ball import BallConfig
+
+
+class WORLD_STATE_TESTCASE(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _get_worlds(self,mode):
+
+        # two worlds, one returning instances of WorldState
+        # and the other one returning world states of the
+        # specified mode
+
+        robot_config = DefaultRobotConfig()
+        ball_configs = [BallConfig(),BallConfig()]
+        ball_guns = [DropBallGun(1.05,2.0),
+                     DropBallGun(3.0,1.0)]
+        init_robot_state = DefaultRobotState(robot_config)
+
+        worlds = [B2World(robot_config,ball_configs,6.0),
+                  B2World(robot_config,ball_configs,6.0,
+                          world_state_mode=mode)]
+        for world in worlds:
+            world.reset(init_robot_state,ball_guns)
+
+        return worlds
+
+    def _assert_same(self,ws1,ws2):
+
+        self.assertEqual(ws1.t,ws2.t)
+        self.assertEqual(ws1.balls_hits_floor,ws2.balls_hits_floor)
+        self.assertEqual(ws1.balls_hits_racket,ws2.balls_hits_racket)
+        for ball1,ball2 in zip(ws1.balls,ws2.balls):
+            np.testing.assert_allclose(ball1.position,ball2.position)
+            np.testing.assert_allclose(ball1.linear_velocity,
+                                       ball2.linear_velocity)
+        for joint1,joint2 in zip(ws1.robot.joints,ws2.robot.joints):
+            self.assertAlmostEqual(joint1.angle,joint2.angle)
+            self.assertAlmostEqual(joint1.angular_velocity,
+                                   joint2.angular_velocity)
+            self.assertAlmostEqual(joint1.desired_torque,
+                                   joint2.desired_torque)
+        np.testing.assert_allclose(ws1.robot.racket.position,
+                                   ws2.robot.racket.position)
+
+    def test_array_world_state(self):
+
+        # array world states should provide the same values
+        # as world states
+
+        worlds = self._get_worlds("arrays")
+
+        for _ in range(150):
+            ws1,ws2 = [world.step([0.3,-0.1,0.2],relative_torques=True)
+                       for world in worlds]
+            self._assert_same(ws1,ws2)
+
+        # named views
+        np.testing.assert_allclose(ws2.balls.position[1],
+                                   ws1.balls[1].position)
+        np.testing.assert_allclose(ws2.robots.joint_angles[0],
+                                   [joint.angle for joint in ws1.robot.joints])
+
+        # item views are read only (the buffer is not)
+        with self.assertRaises(ValueError):
+            ws2.balls[1].position[0] = 0.0
+        with self.assertRaises(ValueError):
+            ws2.robot.racket.linear_velocity[0] = 0.0
+        self.assertTrue(ws2.balls.position.flags.writeable)
+
+        # the buffer is refilled in place
+        copy = ws2.copy()
+        ws3 = worlds[1].step([0.3,-0.1,0.2],relative_torques=True)
+        self.assertTrue(ws3 is ws2)
+        self.assertNotEqual(copy.t,ws3.t)
+
+        # pickling
+        ws4 = pickle.loads(pickle.dumps(ws3))
+        np.testing.assert_allclose(ws4.buffer,ws3.buffer)
+        self.assertEqual(ws4.robot.joints[1].angle,
+                         ws3.robot.joints[1].angle)
+
+    def test_bulk_world_state(self):
+
+        # bulk mode should compute the same dynamics and
+        # provide the same values as world states
+
+        worlds = self._get_worlds("bulk")
+
+        for _ in range(150):
+            ws1,ws2 = [world.step([0.3,-0.1,0.2],relative_torques=True)
+                       for world in worlds]
+            self._assert_same(ws1,ws2)
+        self.assertEqual(ws1.balls_active,ws2.balls_active)
+
+        # after reset
+        ws1,ws2 = [world.reset(None,[DropBallGun(2.0,1.0),None])
+                   for world in worlds]
+        self._assert_same(ws1,ws2)
+
+    def test_lazy_world_state(self):
+
+        # lazy world states should provide the same values
+        # as world states
+
+        worlds = self._get_worlds("lazy")
+
+        for _ in range(150):
+            ws1,ws2 = [world.step([0.3,-0.1,0.2],relative_torques=True)
+                       for world in worlds]
+            self._assert_same(ws1,ws2)
+            self.assertEqual(ws1.applied_time_step,ws2.applied_time_step)
+            for joint1,joint2 in zip(ws1.robot.joints,ws2.robot.joints):
+                self.assertAlmostEqual(joint1.torque,joint2.torque)
+
+        # the instance is refreshed in place,
+        # materialized copies are stable
+        copy = ws2.materialize()
+        self.assertEqual(copy.balls[1].position,ws2.balls[1].position)
+        ws3 = worlds[1].step([0.3,-0.1,0.2],relative_torques=True)
+        self.assertTrue(ws3 is ws2)
+        self.assertNotEqual(copy.t,ws3.t)
+        self.assertNotEqual(copy.balls[1].position,ws3.balls[1].position)
+
+    def test_step_into(self):
+
+        # step_into should compute the same world
+        # states as step
+
+        worlds = self._get_worlds("objects")
+        out = worlds[1].create_array_state()
+        torques = np.array([[0.3,-0.1,0.2]])
+
+        for _ in range(150):
+            ws1 = worlds[0].step([0.3,-0.1,0.2],relative_torques=True)
+            ws2 = worlds[1].step_into(torques,out,relative_torques=True)
+            self._assert_same(ws1,ws2)
+
+        self.assertTrue(ws2 is out)
+
+        # as step, at least one substep
+        t = out.t
+        with self.assertRaises(Exception):
+            worlds[1].step_into(torques,out,n_substeps=0)
+        self.assertEqual(out.t,t)
+
+        # refilling another state with the current one
+        filled = worlds[0].fill_array_state(worlds[1].create_array_state())
+        self._assert_same(ws1,filled)
+        with self.assertRaises(Exception):
+            worlds[1].fill_array_state(ws1)
+
+    def test_snapshot_restore(self):
+
+        # restoring a snapshot should set the world back
+        # to the captured state (up to Box2D warm starting,
+        # which is not part of the snapshot)
+
+        world = self._get_worlds("objects")[0]
+        for _ in range(30):
+            world.step([0.3,-0.1,0.2],relative_torques=True)
+
+        snapshot = world.snapshot()
+        self.assertFalse(snapshot.bodies.flags.writeable)
+        snapshot = pickle.loads(pickle.dumps(snapshot))
+
+        np.random.seed(1)
+        ws1 = world.step([-0.2,0.4,0.1],relative_torques=True)
+        random1 = np.random.rand()
+
+        world.restore(snapshot)
+        np.random.seed(1)
+        ws2 = world.step([-0.2,0.4,0.1],relative_torques=True)
+        random2 = np.random.rand()
+
+        self.assertEqual(ws1.t,ws2.t)
+        self.assertEqual(random1,random2)
+        for ball1,ball2 in zip(ws1.balls,ws2.balls):
+            np.testing.assert_allclose(ball1.position,ball2.position,atol=1e-5)
+        for joint1,joint2 in zip(ws1.robot.joints,ws2.robot.joints):
+            self.assertAlmostEqual(joint1.angle,joint2.angle,places=5)
+
+        # the random generator state is restored
+        world.restore(snapshot)
+        random3 = np.random.rand()
+        world.restore(snapshot)
+        self.assertEqual(np.random.rand(),random3)
+
+    def test_profiling(self):
+
+        # profiling should not change the simulation, and
+        # should measure each step
+
+        worlds = self._get_worlds("arrays")
+        profiler = worlds[1].enable_profiling()
+
+        for _ in range(100):
+            ws1,ws2 = [world.step([0.3,-0.1,0.2],relative_torques=True)
+                       for world in worlds]
+            self._assert_same(ws1,ws2)
+
+        self.assertEqual(profiler.counts[-1],100)
+        for phase in ("torques","apply_torques","drag","box2d","world_state"):
+            self.assertEqual(profiler.counts[PHASES.index(phase)],100)
+        self.assertEqual(sum(profiler.contacts_histogram),100)
+        self.assertTrue(profiler.percentile("step",0.99)>0)
+        self.assertTrue("box2d" in worlds[1].profile_report())
+
+        # disabled: measures are kept but not updated
+        worlds[1].disable_profiling()
+        worlds[1].step([0.3,-0.1,0.2],relative_torques=True)
+        self.assertEqual(profiler.counts[-1],100)
+
+        # step_into is measured as well
+        profiler.reset()
+        out = worlds[1].create_array_state()
+        torques = np.array([[0.3,-0.1,0.2]])
+        for _ in range(10):
+            worlds[1].step_into(torques,out,relative_torques=True)
+        self.assertEqual(profiler.counts[-1],0)
+        worlds[1].enable_profiling()
+        for _ in range(10):
+            worlds[1].step_into(torques,out,relative_torques=True)
+        for phase in ("torques","apply_torques","drag","box2d","world_state","step"):
+            self.assertEqual(profiler.counts[PHASES.index(phase)],10)
+
+        # the class of the world is kept (e.g. subclasses)
+        class _World(B2World):
+            __slots__=[]
+        world = _World(DefaultRobotConfig(),BallConfig(),6.0)
+        world.enable_profiling()
+        self.assertTrue(type(world) is _World)
+
+    def test_simulate(self):
+
+        # simulate should record the same states as
+        # successive calls to step
+
+        worlds = self._get_worlds("objects")
+        torques = np.random.RandomState(0).uniform(-1.0,1.0,(100,1,3))
+
+        record = worlds[1].simulate(torques,relative_torques=True)
+        for step in range(100):
+            ws = worlds[0].step(torques[step].tolist(),relative_torques=True)
+            self.assertEqual(ws.t,record.t[step])
+            np.testing.assert_allclose(record["position"][step,1],
+                                       ws.balls[1].position)
+            np.testing.assert_allclose(record["joint_angles"][step,0],
+                                       [joint.angle for joint in ws.robot.joints])
+
+        # reusing the record, for a subset of channels
+        worlds = self._get_worlds("objects")
+        partial = worlds[0].simulate(torques,record=["position"],
+                                     relative_torques=True)
+        first = partial["position"].copy()
+        self.assertTrue(worlds[1].simulate(torques,record=["position"],
+                                           relative_torques=True,
+                                           out=partial) is partial)
+        np.testing.assert_array_equal(partial["position"],first)
+        np.testing.assert_array_equal(partial["position"],record["position"])
+        self.assertEqual(partial.channels,("position",))